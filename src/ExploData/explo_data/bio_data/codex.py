@@ -3,12 +3,15 @@
 # Source: https://github.com/Silarn/EDMC-ExploData
 # Licensed under the [GNU Public License (GPL)](http://www.gnu.org/licenses/gpl-2.0.html) version 2 or later.
 
-from sqlalchemy import select
+from typing import Any, Iterable, Mapping, Optional
+
+from sqlalchemy.orm import Session
 
 from ExploData.explo_data import db
 from ExploData.explo_data.bio_data.genus import data as bio_genus
 from ExploData.explo_data.bio_data.species import data as bio_types
 from ExploData.explo_data.db import CodexScans
+from ExploData.explo_data.statements import CODEX_SCAN_ID
 
 bio_codex_map = {
     '$Codex_Ent_Aleoids_Genus_Name;': {
@@ -242,23 +245,96 @@ def parse_variant(name: str) -> tuple[str, str, str]:
     return '', '', ''
 
 
-def set_codex(commander: int, biological: str, region: int) -> None:
+def star_color_class(star_type: str) -> str:
+    """
+    Reduce a journal star type to the star class used by the bio color tables.
+    Giant variants drop their suffix (K_OrangeGiant -> K), and white dwarf and Wolf-Rayet subtypes are grouped
+    under their parent class (DAV -> D, WNC -> W).
+
+    :param star_type: The star type as stored in the database
+    :return: The star class key used by the color tables
+    """
+
+    star_class = star_type.split('_')[0]
+    if star_class.startswith('D'):
+        return 'D'
+    if star_class.startswith('W'):
+        return 'W'
+    return star_class
+
+
+def build_color_index() -> tuple[dict[str, tuple[tuple[str, str, str], ...]],
+                                 dict[str, tuple[tuple[str, str, str], ...]]]:
+    """
+    Compile the nested genus color tables into reverse lookup tables. Each species is resolved with the same
+    fallback rules used by parse_variant: species-level star colors override the genus star colors, and species
+    which have their own genus entry only use that entry's star colors.
+
+    :return: Tuple of the star class index and the element index, each mapping to (genus, species, color) tuples
+    """
+
+    star_index: dict[str, list[tuple[str, str, str]]] = {}
+    element_index: dict[str, list[tuple[str, str, str]]] = {}
+    for genus, species_set in bio_types.items():
+        genus_colors: Mapping[str, Any] = bio_genus.get(genus, {}).get('colors', {})
+        for species in sorted(species_set):
+            species_colors: Mapping[str, Any] = genus_colors.get('species', {}).get(species, {})
+            if species in bio_genus:
+                star_colors = bio_genus[species].get('colors', {}).get('star', {})
+            else:
+                star_colors = {**genus_colors.get('star', {}), **species_colors.get('star', {})}
+            for star_class, color in star_colors.items():
+                star_index.setdefault(star_class, []).append((genus, species, color))
+            for element, color in species_colors.get('element', {}).items():
+                element_index.setdefault(element, []).append((genus, species, color))
+
+    return ({key: tuple(value) for key, value in star_index.items()},
+            {key: tuple(value) for key, value in element_index.items()})
+
+
+bio_star_color_index, bio_element_color_index = build_color_index()
+
+
+def predict_colors(star_types: Iterable[str], materials: Iterable[str]) -> dict[str, dict[str, set[str]]]:
+    """
+    Find every color each species could take on a body, given the types of its parent stars and its materials.
+
+    :param star_types: The star types of the body's parent stars
+    :param materials: The materials present on the body
+    :return: Mapping of genus to species to the set of possible colors
+    """
+
+    colors: dict[str, dict[str, set[str]]] = {}
+    matches: list[tuple[str, str, str]] = []
+    for star_class in {star_color_class(star_type) for star_type in star_types}:
+        matches.extend(bio_star_color_index.get(star_class, ()))
+    for material in materials:
+        matches.extend(bio_element_color_index.get(material, ()))
+    for genus, species, color in matches:
+        colors.setdefault(genus, {}).setdefault(species, set()).add(color)
+    return colors
+
+
+def set_codex(commander: int, biological: str, region: int, session: Optional[Session] = None) -> None:
     """
     Helper function to set codex data in the database
 
     :param commander: The active Commander's database ID
     :param biological: The full codex ID from a CodexEntry event
     :param region: The calculated region ID of the current system
+    :param session: Optional active Session to write with, such as a batch Session holding the write lock.
+                    A new Session is used and closed if not provided.
     """
 
     if region is None:
         return
 
-    session = db.get_session()
-    entry: CodexScans = session.scalar(select(CodexScans).where(CodexScans.commander_id == commander)
-                                       .where(CodexScans.biological == biological).where(CodexScans.region == region))
-    if not entry:
+    own_session = session is None
+    if own_session:
+        session = db.get_session()
+    if not session.scalar(CODEX_SCAN_ID, {'commander_id': commander, 'biological': biological, 'region': region}):
         entry = CodexScans(commander_id=commander, biological=biological, region=region)
         session.add(entry)
         session.commit()
-    session.close()
+    if own_session:
+        session.close()
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+# ExploData module plugin for EDMC
+# Source: https://github.com/Silarn/EDMC-ExploData
+# Licensed under the [GNU Public License (GPL)](http://www.gnu.org/licenses/gpl-2.0.html) version 2 or later.
+
+from typing import NamedTuple, Optional
+
+from sqlalchemy import and_, select
+
+from ExploData.explo_data import db
+from ExploData.explo_data.bio_data.codex import predict_colors
+from ExploData.explo_data.bio_data.genus import data as bio_genus
+from ExploData.explo_data.db import FloraScans, Planet, PlanetFlora, PlanetGas, Star
+
+
+class FloraBio(NamedTuple):
+    """ Known flora on a body with the active commander's scan progress """
+    genus: str
+    species: str
+    color: str
+    scan_count: int
+    distance: int
+
+
+class BodyBio(NamedTuple):
+    """ Snapshot of the bio related data for a single planet """
+    id: int
+    name: str
+    body_id: int
+    bio_signals: int
+    atmosphere: str
+    star_types: tuple[str, ...]
+    materials: frozenset[str]
+    gasses: dict[str, float]
+    flora: tuple[FloraBio, ...]
+    colors: dict[str, dict[str, set[str]]]
+
+
+def get_colony_distance(genus: str, species: str = '') -> int:
+    """
+    Get the minimum distance between colonies for a given genus or species
+
+    :param genus: The genus identifier
+    :param species: The species identifier, used for species which carry their own genus data
+    :return: The colony distance in meters, or 0 if the genus is unknown
+    """
+
+    if species in bio_genus:
+        return bio_genus[species]['distance']
+    return bio_genus.get(genus, {}).get('distance', 0)
+
+
+def predict_system_bio(system_id: int, commander_id: Optional[int] = None) -> dict[str, BodyBio]:
+    """
+    Build the bio data for every planet in a system with a fixed number of queries, regardless of body count.
+    Color predictions are only computed for bodies with biological signals or known flora.
+
+    :param system_id: The database ID of the system
+    :param commander_id: The active commander's database ID, used for flora scan progress
+    :return: Mapping of planet name to the compiled BodyBio data
+    """
+
+    with db.get_engine().connect() as connection:
+        planets = connection.execute(
+            select(Planet.id, Planet.name, Planet.body_id, Planet.bio_signals, Planet.atmosphere,
+                   Planet.parent_stars, Planet.materials).where(Planet.system_id == system_id)
+        ).all()
+        star_types: dict[str, str] = {
+            name: star_type for name, star_type in connection.execute(
+                select(Star.name, Star.type).where(Star.system_id == system_id)
+            )
+        }
+        gasses: dict[int, dict[str, float]] = {}
+        for planet_id, gas_name, percent in connection.execute(
+                select(PlanetGas.planet_id, PlanetGas.gas_name, PlanetGas.percent)
+                .join(Planet, Planet.id == PlanetGas.planet_id).where(Planet.system_id == system_id)
+        ):
+            gasses.setdefault(planet_id, {})[gas_name] = percent
+        flora: dict[int, list[FloraBio]] = {}
+        for planet_id, genus, species, color, count in connection.execute(
+                select(PlanetFlora.planet_id, PlanetFlora.genus, PlanetFlora.species, PlanetFlora.color,
+                       FloraScans.count)
+                .join(Planet, Planet.id == PlanetFlora.planet_id)
+                .outerjoin(FloraScans, and_(FloraScans.flora_id == PlanetFlora.id,
+                                            FloraScans.commander_id == commander_id))
+                .where(Planet.system_id == system_id)
+        ):
+            flora.setdefault(planet_id, []).append(
+                FloraBio(genus, species, color, count or 0, get_colony_distance(genus, species))
+            )
+
+    results: dict[str, BodyBio] = {}
+    for planet_id, name, body_id, bio_signals, atmosphere, parent_stars, materials in planets:
+        parents = tuple(star_types[star] for star in parent_stars.split(',') if star_types.get(star))
+        material_set = frozenset(materials.split(',')) if materials else frozenset()
+        body_flora = tuple(flora.get(planet_id, ()))
+        colors = predict_colors(parents, material_set) if bio_signals or body_flora else {}
+        results[name] = BodyBio(planet_id, name, body_id, bio_signals, atmosphere, parents, material_set,
+                                gasses.get(planet_id, {}), body_flora, colors)
+    return results
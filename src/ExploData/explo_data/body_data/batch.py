@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+# ExploData module plugin for EDMC
+# Source: https://github.com/Silarn/EDMC-ExploData
+# Licensed under the [GNU Public License (GPL)](http://www.gnu.org/licenses/gpl-2.0.html) version 2 or later.
+
+from typing import Any, Mapping
+
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from ..db import Planet, PlanetGas, PlanetRing, PlanetStatus, Star, StarRing, StarStatus
+from ..notifications import note_change
+
+PLANET_COLUMNS: tuple[str, ...] = (
+    'type', 'distance', 'atmosphere', 'volcanism', 'mass', 'rotation', 'orbital_period', 'gravity', 'temp',
+    'pressure', 'radius', 'parent_stars', 'materials', 'landable', 'terraform_state'
+)
+STAR_COLUMNS: tuple[str, ...] = (
+    'type', 'subclass', 'luminosity', 'distance', 'mass', 'rotation', 'orbital_period'
+)
+
+
+class BodyBatch:
+    """
+    Row batches for the bodies of a single system, keyed by short body name. Row values use the column names of
+    the Planet and Star tables, so a batch can be written with a handful of bulk upserts.
+    """
+
+    def __init__(self, system_name: str):
+        self.system_name: str = system_name
+        self.stars: dict[str, dict[str, Any]] = {}
+        self.star_rings: dict[str, dict[str, str]] = {}
+        self.planets: dict[str, dict[str, Any]] = {}
+        self.planet_gasses: dict[str, dict[str, float]] = {}
+        self.planet_rings: dict[str, dict[str, str]] = {}
+
+    def add_star(self, name: str, body_id: int, **values: Any) -> dict[str, Any]:
+        row = self.stars.setdefault(name, {'name': name, 'body_id': body_id})
+        row.update(values)
+        return row
+
+    def add_star_ring(self, star: str, name: str, ring_type: str) -> None:
+        self.star_rings.setdefault(star, {})[name] = ring_type
+
+    def add_planet(self, name: str, body_id: int, **values: Any) -> dict[str, Any]:
+        row = self.planets.setdefault(name, {'name': name, 'body_id': body_id})
+        row.update(values)
+        return row
+
+    def add_planet_gas(self, planet: str, gas: str, percent: float) -> None:
+        self.planet_gasses.setdefault(planet, {})[gas] = percent
+
+    def add_planet_ring(self, planet: str, name: str, ring_type: str) -> None:
+        self.planet_rings.setdefault(planet, {})[name] = ring_type
+
+    def __len__(self) -> int:
+        return len(self.stars) + len(self.planets)
+
+
+def merge_list(current: str, new: str) -> str:
+    """
+    Merge two comma separated value lists, as stored for parent stars and materials
+
+    :param current: The stored value list
+    :param new: The value list to merge in
+    :return: The sorted union of both lists
+    """
+
+    values = {value for value in current.split(',') + new.split(',') if value}
+    return ','.join(sorted(values))
+
+
+def apply_body_batch(session: Session, system_id: int, batch: BodyBatch, overwrite: bool = False) -> None:
+    """
+    Write a body batch with bulk upserts. Nothing is committed, so the caller controls the transaction.
+    Unless overwrite is set, bodies which have been scanned in a journal are left untouched, as journal data is
+    fresher than third party data.
+
+    :param session: The active Session
+    :param system_id: The database ID of the system the bodies belong to
+    :param batch: The body batch to apply
+    :param overwrite: Overwrite journal sourced body data
+    """
+
+    apply_body_batches(session, {system_id: batch}, overwrite)
+
+
+def apply_body_batches(session: Session, batches: Mapping[int, BodyBatch], overwrite: bool = False) -> None:
+    """
+    Write the body batches of several systems with shared bulk upserts. The statement count doesn't depend on the
+    number of systems, which matters for bulk imports as SQLite upserts aren't cached by SQLAlchemy.
+
+    :param session: The active Session
+    :param batches: The body batches to apply, keyed by system database ID
+    :param overwrite: Overwrite journal sourced body data
+    """
+
+    if any(batch.planets for batch in batches.values()):
+        _apply_planets(session, batches, overwrite)
+    if any(batch.stars for batch in batches.values()):
+        _apply_stars(session, batches, overwrite)
+
+
+def _apply_planets(session: Session, batches: Mapping[int, BodyBatch], overwrite: bool) -> None:
+    names = {name for batch in batches.values() for name in batch.planets}
+    existing: dict[tuple[int, str], tuple[int, int, str, str]] = {
+        (system_id, name): (planet_id, body_id, parent_stars, materials)
+        for planet_id, system_id, name, body_id, parent_stars, materials in
+        session.execute(select(Planet.id, Planet.system_id, Planet.name, Planet.body_id, Planet.parent_stars,
+                               Planet.materials)
+                        .where(Planet.system_id.in_(batches.keys())).where(Planet.name.in_(names)))
+    }
+    scanned: set[int] = set()
+    if not overwrite and existing:
+        scanned = set(session.scalars(
+            select(PlanetStatus.planet_id).where(PlanetStatus.planet_id.in_([row[0] for row in existing.values()]))
+            .where(PlanetStatus.scan_state > 0)
+        ))
+
+    rows: list[dict[str, Any]] = []
+    for system_id, batch in batches.items():
+        for name, values in batch.planets.items():
+            row = {column: values[column] for column in PLANET_COLUMNS if column in values}
+            row.update(system_id=system_id, name=name, body_id=values['body_id'])
+            if (system_id, name) in existing:
+                planet_id, body_id, parent_stars, materials = existing[(system_id, name)]
+                if planet_id in scanned:
+                    continue
+                row['body_id'] = body_id
+                row['parent_stars'] = merge_list(parent_stars, row.get('parent_stars', ''))
+                row['materials'] = merge_list(materials, row.get('materials', ''))
+            rows.append(row)
+    if not rows:
+        return
+
+    _upsert(session, Planet, rows, ['system_id', 'name', 'body_id'])
+    planet_ids: dict[tuple[int, str], int] = {
+        (system_id, name): planet_id for planet_id, system_id, name in session.execute(
+            select(Planet.id, Planet.system_id, Planet.name).where(Planet.system_id.in_(batches.keys()))
+            .where(Planet.name.in_({row['name'] for row in rows}))
+        )
+    }
+    written = {(row['system_id'], row['name']) for row in rows}
+
+    gas_rows = [{'planet_id': planet_ids[(system_id, name)], 'gas_name': gas, 'percent': percent}
+                for system_id, batch in batches.items()
+                for name, gasses in batch.planet_gasses.items() if (system_id, name) in written
+                for gas, percent in gasses.items()]
+    if gas_rows:
+        _upsert(session, PlanetGas, gas_rows, ['planet_id', 'gas_name'])
+    ring_rows = [{'planet_id': planet_ids[(system_id, name)], 'name': ring, 'type': ring_type}
+                 for system_id, batch in batches.items()
+                 for name, rings in batch.planet_rings.items() if (system_id, name) in written
+                 for ring, ring_type in rings.items()]
+    if ring_rows:
+        _upsert(session, PlanetRing, ring_rows, ['planet_id', 'name'])
+    _note_bodies(session, 'planet', rows, planet_ids, gas_rows, ring_rows)
+
+
+def _apply_stars(session: Session, batches: Mapping[int, BodyBatch], overwrite: bool) -> None:
+    names = {name for batch in batches.values() for name in batch.stars}
+    existing: dict[tuple[int, str], tuple[int, int]] = {
+        (system_id, name): (star_id, body_id) for star_id, system_id, name, body_id in
+        session.execute(select(Star.id, Star.system_id, Star.name, Star.body_id)
+                        .where(Star.system_id.in_(batches.keys())).where(Star.name.in_(names)))
+    }
+    scanned: set[int] = set()
+    if not overwrite and existing:
+        scanned = set(session.scalars(
+            select(StarStatus.star_id).where(StarStatus.star_id.in_([row[0] for row in existing.values()]))
+            .where(StarStatus.scan_state > 0)
+        ))
+
+    rows: list[dict[str, Any]] = []
+    for system_id, batch in batches.items():
+        for name, values in batch.stars.items():
+            row = {column: values[column] for column in STAR_COLUMNS if column in values}
+            row.update(system_id=system_id, name=name, body_id=values['body_id'])
+            if (system_id, name) in existing:
+                star_id, body_id = existing[(system_id, name)]
+                if star_id in scanned:
+                    continue
+                row['body_id'] = body_id
+            rows.append(row)
+    if not rows:
+        return
+
+    _upsert(session, Star, rows, ['system_id', 'name', 'body_id'])
+    star_ids: dict[tuple[int, str], int] = {
+        (system_id, name): star_id for star_id, system_id, name in session.execute(
+            select(Star.id, Star.system_id, Star.name).where(Star.system_id.in_(batches.keys()))
+            .where(Star.name.in_({row['name'] for row in rows}))
+        )
+    }
+    written = {(row['system_id'], row['name']) for row in rows}
+
+    ring_rows = [{'star_id': star_ids[(system_id, name)], 'name': ring, 'type': ring_type}
+                 for system_id, batch in batches.items()
+                 for name, rings in batch.star_rings.items() if (system_id, name) in written
+                 for ring, ring_type in rings.items()]
+    if ring_rows:
+        _upsert(session, StarRing, ring_rows, ['star_id', 'name'])
+    _note_bodies(session, 'star', rows, star_ids, [], ring_rows)
+
+
+def _note_bodies(session: Session, body_type: str, rows: list[dict[str, Any]], body_ids: Mapping[tuple[int, str], int],
+                 gas_rows: list[dict[str, Any]], ring_rows: list[dict[str, Any]]) -> None:
+    """ Note the written bodies of each system for change notifications """
+
+    attributes = {column for row in rows for column in row if column not in ('system_id', 'name')}
+    if gas_rows:
+        attributes.add('gasses')
+    if ring_rows:
+        attributes.add('rings')
+    systems: dict[int, list[int]] = {}
+    for row in rows:
+        systems.setdefault(row['system_id'], []).append(body_ids[(row['system_id'], row['name'])])
+    for system_id, ids in systems.items():
+        note_change(session, 'bodies', system_id, ids, attributes, body_type=body_type)
+
+
+def _upsert(session: Session, table: type, rows: list[dict[str, Any]], keys: list[str]) -> None:
+    """
+    Bulk insert rows, updating the given columns on unique key conflicts. Rows are grouped by their column set,
+    as each executemany call needs a uniform parameter layout.
+    """
+
+    groups: dict[tuple[str, ...], list[dict[str, Any]]] = {}
+    for row in rows:
+        groups.setdefault(tuple(sorted(row.keys())), []).append(row)
+    for columns, group in groups.items():
+        stmt = insert(table)
+        updates = {column: stmt.excluded[column] for column in columns if column not in keys}
+        if updates:
+            stmt = stmt.on_conflict_do_update(index_elements=keys, set_=updates)
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=keys)
+        session.execute(stmt, group)
@@ -5,10 +5,15 @@
 
 from typing import Self, Optional
 
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from sqlalchemy import select, delete
+from sqlalchemy.sql.base import ExecutableOption
+from ..bio_data.codex import predict_colors
 from ..db import Planet, System, PlanetFlora, PlanetGeo, PlanetGas, PlanetRing, PlanetStatus, Waypoint, FloraScans, \
     Star, StarRing, StarStatus, NonBody, NonBodyStatus
+from ..notifications import note_change
+from ..statements import PLANET_BY_NAME, STAR_BY_NAME, NON_BODY_BY_NAME, FLORA_SCAN, FLORA_SCAN_COUNT, PLANET_STATUS, \
+    STAR_STATUS, NON_BODY_STATUS
 
 
 class PlanetData:
@@ -21,7 +26,7 @@ class PlanetData:
 
     @classmethod
     def from_journal(cls, system: System, name: str, body_id: int, session: Session):
-        data: Planet = session.scalar(select(Planet).where(Planet.name == name).where(Planet.system_id == system.id))
+        data: Planet = session.scalar(PLANET_BY_NAME, {'system_id': system.id, 'name': name})
         if not data:
             data = Planet(name=name, body_id=body_id, system_id=system.id)
             session.add(data)
@@ -53,6 +58,9 @@ class PlanetData:
         statuses = list(filter(lambda item: item.commander_id == commander_id, statuses))
         if len(statuses):
             status = statuses[0]
+        elif status := self._session.scalar(PLANET_STATUS, {'body_id': self._data.id, 'commander_id': commander_id}):
+            # The loaded statuses were filtered to another commander
+            self._data.statuses.append(status)
         else:
             status = PlanetStatus(planet_id=self._data.id, commander_id=commander_id)
             self._data.statuses.append(status)
@@ -188,6 +196,15 @@ class PlanetData:
         self.commit()
         return self
 
+    def get_parent_star_types(self) -> list[str]:
+        parents = set(self.get_parent_stars())
+        if not parents:
+            return []
+        return [star.type for star in self._system.stars if star.name in parents and star.type]
+
+    def predicted_colors(self) -> dict[str, dict[str, set[str]]]:
+        return predict_colors(self.get_parent_star_types(), self.get_materials())
+
     def get_flora(self, genus: str = None, species: str = None, create: bool = False) -> list[PlanetFlora] | None:
         if genus:
             flora_list: list[PlanetFlora] = []
@@ -223,8 +240,8 @@ class PlanetData:
     def set_flora_species_scan(self, genus: str, species: str, was_logged: Optional[bool], scan: int, commander: int) -> Self:
         flora = self.get_flora(genus, species, create=True)[0]
         flora.species = species
-        stmt = select(FloraScans).where(FloraScans.flora_id == flora.id).where(FloraScans.commander_id == commander)
-        scan_data: Optional[FloraScans] = self._session.scalar(stmt)
+        scan_data: Optional[FloraScans] = self._session.scalar(FLORA_SCAN, {'flora_id': flora.id,
+                                                                            'commander_id': commander})
         if not scan_data:
             scan_data = FloraScans(flora_id=flora.id, commander_id=commander)
             self._session.add(scan_data)
@@ -233,6 +250,8 @@ class PlanetData:
         if scan == 3:
             stmt = delete(Waypoint).where(Waypoint.commander_id == commander).where(Waypoint.flora_id == flora.id)
             self._session.execute(stmt)
+            note_change(self._session, 'body_status', self._system.id, [self._data.id], ['waypoints'], commander,
+                        'planet')
         scan_data.was_logged = was_logged
         self.commit()
         return self
@@ -246,10 +265,9 @@ class PlanetData:
     def add_flora_waypoint(self, genus: str, species: str, lat_long: tuple[float, float], commander: int, scan: bool = False) -> Self:
         flora = self.get_flora(genus, species)[0]
         if flora:
-            scans: FloraScans = self._session.scalar(
-                select(FloraScans).where(FloraScans.flora_id == flora.id).where(FloraScans.commander_id == commander)
-            )
-            if not scans or scans.count != 3:
+            count: Optional[int] = self._session.scalar(FLORA_SCAN_COUNT, {'flora_id': flora.id,
+                                                                          'commander_id': commander})
+            if count != 3:
                 waypoint = Waypoint()
                 waypoint.flora_id = flora.id
                 waypoint.commander_id = commander
@@ -313,6 +331,7 @@ class PlanetData:
 
     def clear_flora(self) -> Self:
         self._session.execute(delete(PlanetFlora).where(PlanetFlora.planet_id == self._data.id))
+        note_change(self._session, 'bodies', self._system.id, [self._data.id], ['flora'], body_type='planet')
         self.commit()
         return self
 
@@ -426,7 +445,8 @@ class PlanetData:
         self._session.refresh(self._data)
 
     def __del__(self) -> None:
-        self.commit()
+        if self._session.new or self._session.dirty or self._session.deleted:
+            self.commit()
 
 
 class NonBodyData:
@@ -439,9 +459,7 @@ class NonBodyData:
 
     @classmethod
     def from_journal(cls, system: System, name: str, body_id: int, session: Session):
-        data: NonBody = session.scalar(
-            select(NonBody).where(NonBody.name == name).where(NonBody.system_id == system.id)
-        )
+        data: NonBody = session.scalar(NON_BODY_BY_NAME, {'system_id': system.id, 'name': name})
         if not data:
             data = NonBody()
             data.name = name
@@ -463,6 +481,9 @@ class NonBodyData:
         statuses = list(filter(lambda item: item.commander_id == commander_id, statuses))
         if len(statuses):
             status = statuses[0]
+        elif status := self._session.scalar(NON_BODY_STATUS, {'body_id': self._data.id, 'commander_id': commander_id}):
+            # The loaded statuses were filtered to another commander
+            self._data.statuses.append(status)
         else:
             status = NonBodyStatus(non_body_id=self._data.id, commander_id=commander_id)
             self._data.statuses.append(status)
@@ -527,7 +548,8 @@ class NonBodyData:
         self._session.commit()
 
     def __del__(self) -> None:
-        self.commit()
+        if self._session.new or self._session.dirty or self._session.deleted:
+            self.commit()
 
 
 class StarData:
@@ -540,9 +562,7 @@ class StarData:
 
     @classmethod
     def from_journal(cls, system: System, name: str, body_id: int, session: Session):
-        data: Star = session.scalar(
-            select(Star).where(Star.name == name).where(Star.system_id == system.id)
-        )
+        data: Star = session.scalar(STAR_BY_NAME, {'system_id': system.id, 'name': name})
         if not data:
             data = Star()
             data.name = name
@@ -564,6 +584,9 @@ class StarData:
         statuses = list(filter(lambda item: item.commander_id == commander_id, statuses))
         if len(statuses):
             status = statuses[0]
+        elif status := self._session.scalar(STAR_STATUS, {'body_id': self._data.id, 'commander_id': commander_id}):
+            # The loaded statuses were filtered to another commander
+            self._data.statuses.append(status)
         else:
             status = StarStatus(star_id=self._data.id, commander_id=commander_id)
             self._session.add(status)
@@ -679,32 +702,99 @@ class StarData:
         self._session.commit()
 
     def __del__(self) -> None:
-        self.commit()
+        if self._session.new or self._session.dirty or self._session.deleted:
+            self.commit()
+
 
+def planet_load_options(commander_id: Optional[int] = None) -> list[ExecutableOption]:
+    """
+    Eager loading options for the planet relationships used by PlanetData. Commander specific relationships are
+    filtered to the given commander when one is passed.
+
+    :param commander_id: Optional commander ID used to filter the status, scan, and waypoint collections
+    :return: List of loader options to apply to a Planet select
+    """
+
+    statuses = Planet.statuses
+    scans = PlanetFlora.scans
+    waypoints = PlanetFlora.waypoints
+    if commander_id is not None:
+        statuses = statuses.and_(PlanetStatus.commander_id == commander_id)
+        scans = scans.and_(FloraScans.commander_id == commander_id)
+        waypoints = waypoints.and_(Waypoint.commander_id == commander_id)
+    return [
+        selectinload(statuses),
+        selectinload(Planet.gasses),
+        selectinload(Planet.floras).selectinload(scans),
+        selectinload(Planet.floras).selectinload(waypoints),
+        selectinload(Planet.geos),
+        selectinload(Planet.rings),
+    ]
+
+
+def load_planets(system: System, session: Session, commander_id: Optional[int] = None) -> dict[str, PlanetData]:
+    """
+    Load all planets in a system with their relationships eager loaded, using a fixed number of queries.
+    Planets already in the session are refreshed, along with their collections.
+    If a commander ID is passed, the loaded collections only include that commander's data. Status lookups for
+    other commanders fall back to a query.
+
+    :param system: The System to load planets for
+    :param session: The active Session
+    :param commander_id: Optional commander ID used to filter commander specific data
+    :return: Mapping of planet name to PlanetData
+    """
 
-def load_planets(system: System, session: Session) -> dict[str, PlanetData]:
     planet_data: dict[str, PlanetData] = {}
     if system and system.id:
-        for planet in system.planets:  # type: Planet
+        stmt = select(Planet).where(Planet.system_id == system.id).options(*planet_load_options(commander_id)) \
+            .execution_options(populate_existing=True)
+        for planet in session.scalars(stmt):  # type: Planet
             planet_data[planet.name] = PlanetData(system, planet, session)
-    session.commit()
     return planet_data
 
 
-def load_non_bodies(system: System, session: Session) -> dict[str, NonBodyData]:
+def load_non_bodies(system: System, session: Session, commander_id: Optional[int] = None) -> dict[str, NonBodyData]:
+    """
+    Load all non-bodies in a system with their statuses eager loaded.
+
+    :param system: The System to load non-bodies for
+    :param session: The active Session
+    :param commander_id: Optional commander ID used to filter the loaded statuses
+    :return: Mapping of non-body name to NonBodyData
+    """
+
     non_body_data: dict[str, NonBodyData] = {}
     if system and system.id:
-        for non_body in system.non_bodies:  # type: NonBody
+        statuses = NonBody.statuses
+        if commander_id is not None:
+            statuses = statuses.and_(NonBodyStatus.commander_id == commander_id)
+        stmt = select(NonBody).where(NonBody.system_id == system.id).options(selectinload(statuses)) \
+            .execution_options(populate_existing=True)
+        for non_body in session.scalars(stmt):  # type: NonBody
             non_body_data[non_body.name] = NonBodyData(system, non_body, session)
     return non_body_data
 
 
-def load_stars(system: System, session: Session) -> dict[str, StarData]:
+def load_stars(system: System, session: Session, commander_id: Optional[int] = None) -> dict[str, StarData]:
+    """
+    Load all stars in a system with their statuses and rings eager loaded.
+
+    :param system: The System to load stars for
+    :param session: The active Session
+    :param commander_id: Optional commander ID used to filter the loaded statuses
+    :return: Mapping of star name to StarData
+    """
+
     star_data: dict[str, StarData] = {}
     if system and system.id:
-        for star in system.stars:  # type: Star
+        statuses = Star.statuses
+        if commander_id is not None:
+            statuses = statuses.and_(StarStatus.commander_id == commander_id)
+        stmt = select(Star).where(Star.system_id == system.id) \
+            .options(selectinload(statuses), selectinload(Star.rings)).execution_options(populate_existing=True)
+        for star in session.scalars(stmt):  # type: Star
             star_data[star.name] = StarData(system, star, session)
-    session.commit()
     return star_data
 
 
@@ -5,4 +5,4 @@
 
 plugin_name: str = 'ExploData'
 plugin_version: str = '1.4.0'
-database_version: int = 10
+database_version: int = 14
@@ -3,13 +3,15 @@
 # Source: https://github.com/Silarn/EDMC-ExploData
 # Licensed under the [GNU Public License (GPL)](http://www.gnu.org/licenses/gpl-2.0.html) version 2 or later.
 import os
+import re
 import threading
+from contextlib import contextmanager
 from sqlite3 import OperationalError
-from typing import Optional
+from typing import Iterator, NamedTuple, Optional
 
 import sqlalchemy.exc
 from sqlalchemy import ForeignKey, String, UniqueConstraint, select, Column, Float, Engine, text, Integer, Boolean, \
-    MetaData, Executable, Result, create_engine, event, DefaultClause
+    MetaData, Executable, Result, create_engine, event, DefaultClause, LargeBinary, func
 from sqlalchemy.dialects.sqlite import insert
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship, scoped_session, sessionmaker, Session
 from sqlalchemy.sql import sqltypes
@@ -40,6 +42,10 @@ class This:
 
 this = This()
 
+# The change revision of the active write transaction. The first stamp of a transaction takes the stored revision plus
+# one, and later stamps in the same transaction reuse it. See apply_revision_triggers.
+REVISION_STAMP: str = "explodata_revision((SELECT CAST(value AS INTEGER) FROM metadata WHERE key = 'revision'))"
+
 
 """
 Define the SQLAlchemy Schemas
@@ -63,6 +69,37 @@ class JournalLog(Base):
     journal: Mapped[str] = mapped_column(String(32), primary_key=True)
 
 
+class JournalCheckpoint(Base):
+    """ Progress of a partially imported journal, written in the same transaction as the lines it covers """
+    __tablename__ = 'journal_checkpoints'
+
+    journal: Mapped[str] = mapped_column(String(32), primary_key=True)
+    offset: Mapped[int] = mapped_column(default=0, server_default=text('0'))
+    timestamp: Mapped[str] = mapped_column(String(32), default='', server_default='')
+    commander: Mapped[Optional[str]] = mapped_column(String(22))
+    system: Mapped[Optional[str]] = mapped_column(String(64))
+
+
+# Journal manifest status values
+JOURNAL_PENDING: int = 0
+JOURNAL_PARTIAL: int = 1  # A checkpoint is stored
+JOURNAL_IMPORTED: int = 2
+
+
+class JournalManifest(Base):
+    """
+    Journal files seen in the journal directory, refreshed before each import so unchanged files are skipped without
+    reading them. The timestamp is parsed from the file name (or its creation time) and orders the import.
+    """
+    __tablename__ = 'journal_manifest'
+
+    journal: Mapped[str] = mapped_column(String(64), primary_key=True)
+    size: Mapped[int] = mapped_column(default=0, server_default=text('0'))
+    mtime: Mapped[float] = mapped_column(default=0.0, server_default=text('0.0'))
+    timestamp: Mapped[str] = mapped_column(String(32), default='', server_default='')
+    status: Mapped[int] = mapped_column(default=0, server_default=text('0'))  # One of the JOURNAL_ status values
+
+
 class Commander(Base):
     __tablename__ = 'commanders'
 
@@ -82,6 +119,7 @@ class System(Base):
     region: Mapped[Optional[int]]
     body_count: Mapped[int] = mapped_column(default=1, server_default=text('1'))
     non_body_count: Mapped[int] = mapped_column(default=0, server_default=text('0'))
+    revision: Mapped[int] = mapped_column(default=text(REVISION_STAMP), server_default=text('0'), index=True)
 
     statuses: Mapped[list['SystemStatus']] = relationship(backref='status', passive_deletes=True)
     planets: Mapped[list['Planet']] = relationship(backref='planet', passive_deletes=True)
@@ -98,6 +136,7 @@ class SystemStatus(Base):
     honked: Mapped[bool] = mapped_column(default=False, server_default=text('FALSE'))
     fully_scanned: Mapped[bool] = mapped_column(default=False, server_default=text('FALSE'))
     fully_mapped: Mapped[bool] = mapped_column(default=False, server_default=text('FALSE'))
+    revision: Mapped[int] = mapped_column(default=text(REVISION_STAMP), server_default=text('0'), index=True)
     __table_args__ = (UniqueConstraint('system_id', 'commander_id', name='_system_commander_constraint'),
                       )
 
@@ -119,6 +158,7 @@ class Star(Base):
     type: Mapped[str] = mapped_column(default='', server_default='')
     subclass: Mapped[int] = mapped_column(default=0, server_default=text('0'))
     luminosity: Mapped[str] = mapped_column(default='', server_default='')
+    revision: Mapped[int] = mapped_column(default=text(REVISION_STAMP), server_default=text('0'), index=True)
     __table_args__ = (UniqueConstraint('system_id', 'name', 'body_id', name='_system_name_id_constraint'),
                       )
 
@@ -144,6 +184,7 @@ class StarStatus(Base):
     discovered: Mapped[bool] = mapped_column(default=False, server_default=text('FALSE'))
     was_discovered: Mapped[bool] = mapped_column(default=False, server_default=text('FALSE'))
     scan_state: Mapped[int] = mapped_column(default=0, server_default=text('0'))
+    revision: Mapped[int] = mapped_column(default=text(REVISION_STAMP), server_default=text('0'), index=True)
     __table_args__ = (UniqueConstraint('star_id', 'commander_id', name='_star_commander_constraint'),
                       )
 
@@ -173,6 +214,7 @@ class Planet(Base):
     materials: Mapped[str] = mapped_column(default='', server_default='')
     landable: Mapped[bool] = mapped_column(default=False, server_default=text('FALSE'))
     terraform_state: Mapped[str] = mapped_column(default='', server_default='')
+    revision: Mapped[int] = mapped_column(default=text(REVISION_STAMP), server_default=text('0'), index=True)
 
     statuses: Mapped[list['PlanetStatus']] = relationship(backref='status', passive_deletes=True)
     gasses: Mapped[list['PlanetGas']] = relationship(backref='gas', passive_deletes=True)
@@ -198,6 +240,7 @@ class PlanetStatus(Base):
     was_footfalled: Mapped[Optional[bool]] = mapped_column(default=False, nullable=True)
     efficient: Mapped[bool] = mapped_column(default=False, server_default=text('FALSE'))
     scan_state: Mapped[int] = mapped_column(default=0, server_default=text('0'))
+    revision: Mapped[int] = mapped_column(default=text(REVISION_STAMP), server_default=text('0'), index=True)
     __table_args__ = (UniqueConstraint('planet_id', 'commander_id', name='_planet_commander_constraint'),
                       )
 
@@ -223,6 +266,7 @@ class PlanetFlora(Base):
     genus: Mapped[str]
     species: Mapped[str] = mapped_column(default='', server_default='')
     color: Mapped[str] = mapped_column(default='', server_default='')
+    revision: Mapped[int] = mapped_column(default=text(REVISION_STAMP), server_default=text('0'), index=True)
 
     scans: Mapped[list['FloraScans']] = relationship(backref='scan', passive_deletes=True)
     waypoints: Mapped[list['Waypoint']] = relationship(backref='waypoint', passive_deletes=True)
@@ -262,6 +306,7 @@ class FloraScans(Base):
     flora_id: Mapped[int] = mapped_column(ForeignKey('planet_flora.id', ondelete="CASCADE"))
     count: Mapped[int] = mapped_column(default=0, server_default=text('0'))
     was_logged: Mapped[Optional[bool]] = mapped_column(default=False, nullable=True)
+    revision: Mapped[int] = mapped_column(default=text(REVISION_STAMP), server_default=text('0'), index=True)
     __table_args__ = (UniqueConstraint('commander_id', 'flora_id', name='_cmdr_flora_constraint'),
                       )
 
@@ -275,6 +320,7 @@ class Waypoint(Base):
     type: Mapped[str] = mapped_column(default='tag', server_default='tag')
     latitude: Mapped[float]
     longitude: Mapped[float]
+    revision: Mapped[int] = mapped_column(default=text(REVISION_STAMP), server_default=text('0'), index=True)
 
 
 class NonBody(Base):
@@ -284,6 +330,7 @@ class NonBody(Base):
     system_id: Mapped[int] = mapped_column(ForeignKey('systems.id', ondelete="CASCADE"))
     name: Mapped[str]
     body_id: Mapped[int]
+    revision: Mapped[int] = mapped_column(default=text(REVISION_STAMP), server_default=text('0'), index=True)
 
     statuses: Mapped[list['NonBodyStatus']] = relationship(backref='status', passive_deletes=True)
 
@@ -302,6 +349,7 @@ class NonBodyStatus(Base):
     mapped: Mapped[bool] = mapped_column(default=False, server_default=text('FALSE'))
     was_mapped: Mapped[bool] = mapped_column(default=False, server_default=text('FALSE'))
     efficient: Mapped[bool] = mapped_column(default=False, server_default=text('FALSE'))
+    revision: Mapped[int] = mapped_column(default=text(REVISION_STAMP), server_default=text('0'), index=True)
 
     __table_args__ = (UniqueConstraint('non_body_id', 'commander_id', name='_nonbody_commander_constraint'),
                       )
@@ -314,9 +362,184 @@ class CodexScans(Base):
     commander_id: Mapped[int] = mapped_column(ForeignKey('commanders.id', ondelete="CASCADE"))
     region: Mapped[int]
     biological: Mapped[str] = mapped_column(default='', server_default='')
+    revision: Mapped[int] = mapped_column(default=text(REVISION_STAMP), server_default=text('0'), index=True)
     __table_args__ = (UniqueConstraint('commander_id', 'region', 'biological', name='_cmdr_bio_region_constraint'),)
 
 
+class SystemSummary(Base):
+    """ Exploration totals of a system for a commander, kept up to date by triggers on the underlying tables """
+    __tablename__ = 'system_summary'
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    system_id: Mapped[int] = mapped_column(ForeignKey('systems.id', ondelete="CASCADE"))
+    commander_id: Mapped[int] = mapped_column(ForeignKey('commanders.id', ondelete="CASCADE"))
+    planet_count: Mapped[int] = mapped_column(default=0, server_default=text('0'))
+    bio_signals: Mapped[int] = mapped_column(default=0, server_default=text('0'))
+    geo_signals: Mapped[int] = mapped_column(default=0, server_default=text('0'))
+    stars_discovered: Mapped[int] = mapped_column(default=0, server_default=text('0'))
+    planets_discovered: Mapped[int] = mapped_column(default=0, server_default=text('0'))
+    non_bodies_discovered: Mapped[int] = mapped_column(default=0, server_default=text('0'))
+    first_discoveries: Mapped[int] = mapped_column(default=0, server_default=text('0'))
+    planets_mapped: Mapped[int] = mapped_column(default=0, server_default=text('0'))
+    planets_efficient: Mapped[int] = mapped_column(default=0, server_default=text('0'))
+    first_mapped: Mapped[int] = mapped_column(default=0, server_default=text('0'))
+    non_bodies_mapped: Mapped[int] = mapped_column(default=0, server_default=text('0'))
+    footfalls: Mapped[int] = mapped_column(default=0, server_default=text('0'))
+    species_confirmed: Mapped[int] = mapped_column(default=0, server_default=text('0'))
+    __table_args__ = (UniqueConstraint('system_id', 'commander_id', name='_summary_system_commander_constraint'),
+                      )
+
+
+class RegionSummary(Base):
+    """ Exploration totals of a galactic region for a commander, rolled up from the system summaries by triggers """
+    __tablename__ = 'region_summary'
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    region: Mapped[int]  # 0 for systems without a known region
+    commander_id: Mapped[int] = mapped_column(ForeignKey('commanders.id', ondelete="CASCADE"))
+    systems: Mapped[int] = mapped_column(default=0, server_default=text('0'))
+    planet_count: Mapped[int] = mapped_column(default=0, server_default=text('0'))
+    bio_signals: Mapped[int] = mapped_column(default=0, server_default=text('0'))
+    geo_signals: Mapped[int] = mapped_column(default=0, server_default=text('0'))
+    stars_discovered: Mapped[int] = mapped_column(default=0, server_default=text('0'))
+    planets_discovered: Mapped[int] = mapped_column(default=0, server_default=text('0'))
+    non_bodies_discovered: Mapped[int] = mapped_column(default=0, server_default=text('0'))
+    first_discoveries: Mapped[int] = mapped_column(default=0, server_default=text('0'))
+    planets_mapped: Mapped[int] = mapped_column(default=0, server_default=text('0'))
+    planets_efficient: Mapped[int] = mapped_column(default=0, server_default=text('0'))
+    first_mapped: Mapped[int] = mapped_column(default=0, server_default=text('0'))
+    non_bodies_mapped: Mapped[int] = mapped_column(default=0, server_default=text('0'))
+    footfalls: Mapped[int] = mapped_column(default=0, server_default=text('0'))
+    species_confirmed: Mapped[int] = mapped_column(default=0, server_default=text('0'))
+    codex_entries: Mapped[int] = mapped_column(default=0, server_default=text('0'))
+    __table_args__ = (UniqueConstraint('region', 'commander_id', name='_summary_region_commander_constraint'),
+                      )
+
+
+class EDSMCache(Base):
+    """ Compressed EDSM bodies responses with their HTTP validators """
+    __tablename__ = 'edsm_cache'
+
+    system: Mapped[str] = mapped_column(String(64), primary_key=True)
+    data: Mapped[bytes] = mapped_column(LargeBinary)
+    size: Mapped[int] = mapped_column(default=0, server_default=text('0'))
+    fetched: Mapped[float] = mapped_column(default=0.0, server_default=text('0.0'))
+    etag: Mapped[Optional[str]]
+    last_modified: Mapped[Optional[str]]
+    payload_hash: Mapped[str] = mapped_column(String(64), default='', server_default='')
+    applied_hash: Mapped[str] = mapped_column(String(64), default='', server_default='')
+
+
+"""
+Change revisions
+"""
+
+# Tables stamped with the global change revision on every insert and update
+REVISION_TABLES: list[type[Base]] = [System, SystemStatus, Star, StarStatus, Planet, PlanetStatus, PlanetFlora,
+                                     FloraScans, Waypoint, NonBody, NonBodyStatus, CodexScans]
+
+# Child tables whose writes stamp the parent row instead. For tracked children, this only applies to deletes.
+REVISION_PARENTS: dict[type[Base], tuple[type[Base], str]] = {
+    StarRing: (Star, 'star_id'),
+    PlanetGas: (Planet, 'planet_id'),
+    PlanetGeo: (Planet, 'planet_id'),
+    PlanetRing: (Planet, 'planet_id'),
+    PlanetFlora: (Planet, 'planet_id'),
+    Waypoint: (PlanetFlora, 'flora_id'),
+}
+
+# Joins from each tracked table to the table holding its system_id
+REVISION_SYSTEM_JOINS: dict[type[Base], list[type[Base]]] = {
+    StarStatus: [Star],
+    PlanetStatus: [Planet],
+    PlanetFlora: [Planet],
+    FloraScans: [PlanetFlora, Planet],
+    Waypoint: [PlanetFlora, Planet],
+    NonBodyStatus: [NonBody],
+}
+
+
+class Changes(NamedTuple):
+    """ Rows changed since a revision. Rows are lists of ids keyed by table name, for tables with changes. """
+    revision: int
+    rows: dict[str, list[int]]
+
+
+"""
+System summaries
+"""
+
+
+class SummarySource(NamedTuple):
+    """
+    A commander specific table counted into the system summaries. Expressions use {row} for the counted row.
+    Counts are summed expressions, usually booleans.
+    """
+    table: str
+    system: str
+    counts: dict[str, str]
+
+
+SUMMARY_SOURCES: list[SummarySource] = [
+    SummarySource('system_status', '{row}.system_id', {}),
+    SummarySource('star_status', '(SELECT system_id FROM stars WHERE id = {row}.star_id)', {
+        'stars_discovered': '{row}.discovered',
+        'first_discoveries': '({row}.discovered AND NOT {row}.was_discovered)',
+    }),
+    SummarySource('planet_status', '(SELECT system_id FROM planets WHERE id = {row}.planet_id)', {
+        'planets_discovered': '{row}.discovered',
+        'first_discoveries': '({row}.discovered AND NOT {row}.was_discovered)',
+        'planets_mapped': '{row}.mapped',
+        'planets_efficient': '{row}.efficient',
+        'first_mapped': '({row}.mapped AND NOT {row}.was_mapped)',
+        'footfalls': '{row}.footfall',
+    }),
+    SummarySource('non_body_status', '(SELECT system_id FROM non_bodies WHERE id = {row}.non_body_id)', {
+        'non_bodies_discovered': '{row}.discovered',
+        'non_bodies_mapped': '{row}.mapped',
+    }),
+    SummarySource('flora_scans', '(SELECT p.system_id FROM planet_flora AS f JOIN planets AS p ON p.id = f.planet_id '
+                                 'WHERE f.id = {row}.flora_id)', {
+        'species_confirmed': '({row}.count >= 3)',
+    }),
+]
+
+
+class SummaryCascade(NamedTuple):
+    """
+    A table whose deletes cascade to counted rows. The cascade runs after the deleted row is gone, when the counted
+    rows can no longer find their system, so they are counted out beforehand. Conditions use {row} for the counted
+    row and OLD for the deleted row.
+    """
+    table: str
+    system: str
+    sources: dict[str, str]
+
+
+SUMMARY_CASCADES: list[SummaryCascade] = [
+    SummaryCascade('stars', 'OLD.system_id', {'star_status': '{row}.star_id = OLD.id'}),
+    SummaryCascade('planets', 'OLD.system_id', {
+        'planet_status': '{row}.planet_id = OLD.id',
+        'flora_scans': '{row}.flora_id IN (SELECT id FROM planet_flora WHERE planet_id = OLD.id)',
+    }),
+    SummaryCascade('non_bodies', 'OLD.system_id', {'non_body_status': '{row}.non_body_id = OLD.id'}),
+    SummaryCascade('planet_flora', '(SELECT system_id FROM planets WHERE id = OLD.planet_id)',
+                   {'flora_scans': '{row}.flora_id = OLD.id'}),
+]
+
+
+# System wide totals, summed from the planets of the system into every commander's summary
+SUMMARY_PLANET_TOTALS: dict[str, str] = {
+    'planet_count': '1',
+    'bio_signals': '{row}.bio_signals',
+    'geo_signals': '{row}.geo_signals',
+}
+
+# System summary counts rolled up into the region summaries
+REGION_SUMMARY_COLUMNS: list[str] = [column.name for column in SystemSummary.__table__.columns
+                                     if column.name not in ('id', 'system_id', 'commander_id')]
+
+
 """
 Database migration functions
 """
@@ -407,10 +630,9 @@ def run_statement(engine: Engine, statement: Executable) -> Result:
     :param statement: The SQLAlchemy statement to be executed
     """
 
-    connection = engine.connect()
-    result = connection.execute(statement)
-    connection.commit()
-    connection.close()
+    with engine.connect() as connection:
+        result = connection.execute(statement)
+        connection.commit()
     return result
 
 
@@ -424,6 +646,8 @@ def affix_schemas(engine: Engine) -> None:
 
     modify_table(engine, Metadata)
     modify_table(engine, JournalLog)
+    modify_table(engine, JournalCheckpoint)
+    modify_table(engine, JournalManifest)
     modify_table(engine, Commander)
     modify_table(engine, System)
     modify_table(engine, SystemStatus, [System, Commander])
@@ -441,6 +665,9 @@ def affix_schemas(engine: Engine) -> None:
     modify_table(engine, CodexScans, [Commander])
     modify_table(engine, NonBody, [System])
     modify_table(engine, NonBodyStatus, [NonBody, Commander])
+    modify_table(engine, EDSMCache)
+    modify_table(engine, SystemSummary, [System, Commander])
+    modify_table(engine, RegionSummary, [Commander])
 
 
 def migrate(engine: Engine) -> bool:
@@ -526,6 +753,15 @@ DELETE FROM planets WHERE ROWID IN (
                 add_column(engine, 'planet_status', Column('was_footfalled', Boolean(), nullable=True))
                 add_column(engine, 'flora_scans', Column('was_logged', Boolean(), nullable=True))
                 run_query(engine, 'DELETE FROM journal_log')
+            if int(version['value']) < 11:
+                for table in REVISION_TABLES:
+                    add_column(engine, table.__tablename__,
+                               Column('revision', Integer(), nullable=False, server_default=text('0')))
+            if int(version['value']) < 12:
+                rebuild_system_summaries(engine)
+            if int(version['value']) < 13:
+                rebuild_region_summaries(engine)
+            if int(version['value']) < 14:
                 affix_schemas(engine)  # This should be run on the latest migration
     except ValueError as ex:
         run_statement(engine, insert(Metadata).values(key='version', value=database_version)
@@ -541,6 +777,248 @@ DELETE FROM planets WHERE ROWID IN (
     return True
 
 
+def apply_revision_triggers(engine: Engine) -> None:
+    """
+    Create the triggers which stamp the change revision onto written rows, along with the revision indexes.
+    Table rebuilds drop both, so this is run after every migration check.
+    Each write transaction takes one revision, and stores it in the metadata table with its first stamp. Inserts
+    through SQLAlchemy set the revision with the column default, so the insert triggers only write to rows inserted
+    without one. Updates which don't change any data are not stamped, and a row is stamped once per transaction.
+
+    :param engine: The SQLAlchemy engine
+    """
+
+    run_statement(engine, insert(Metadata).values(key='revision', value='0').on_conflict_do_nothing())
+    record = (f"UPDATE metadata SET value = {REVISION_STAMP} "
+              f"WHERE key = 'revision' AND CAST(value AS INTEGER) < {REVISION_STAMP}")
+
+    def changed(table: type[Base]) -> str:
+        return ' OR '.join(f'NEW.`{column.name}` IS NOT OLD.`{column.name}`' for column in table.__table__.columns
+                           if column.name not in ('id', 'revision'))
+
+    def stamp(table: type[Base], row: str, key: str) -> str:
+        return (f'{record}; UPDATE `{table.__tablename__}` SET revision = {REVISION_STAMP} '
+                f'WHERE id = {row}.{key} AND revision IS NOT {REVISION_STAMP};')
+
+    def create_trigger(connection, name: str, action: str, table: type[Base], condition: str, body: str) -> None:
+        connection.exec_driver_sql(f'DROP TRIGGER IF EXISTS `{name}`')
+        connection.exec_driver_sql(f'CREATE TRIGGER `{name}` AFTER {action} ON `{table.__tablename__}` '
+                                   f'{f"WHEN {condition} " if condition else ""}BEGIN {body} END')
+
+    with engine.connect() as connection:
+        for table in REVISION_TABLES:
+            name = table.__tablename__
+            create_trigger(connection, f'{name}_revision_insert', 'INSERT', table, '', stamp(table, 'NEW', 'id'))
+            create_trigger(connection, f'{name}_revision_update', 'UPDATE', table, changed(table),
+                           stamp(table, 'NEW', 'id'))
+            for index in table.__table__.indexes:
+                index.create(connection, checkfirst=True)
+        for table, (parent, key) in REVISION_PARENTS.items():
+            name = table.__tablename__
+            actions = ['DELETE'] if table in REVISION_TABLES else ['INSERT', 'UPDATE', 'DELETE']
+            for action in actions:
+                create_trigger(connection, f'{name}_parent_revision_{action.lower()}', action, table,
+                               changed(table) if action == 'UPDATE' else '',
+                               stamp(parent, 'OLD' if action == 'DELETE' else 'NEW', key))
+        connection.commit()
+
+
+def _summary_delta(expressions: dict[str, str], new: Optional[str], old: Optional[str]) -> str:
+    """ Build the SET clause adding the change between an old and a new row to summary counts """
+
+    deltas = []
+    for column, expression in expressions.items():
+        delta = ' - '.join(filter(None, [expression.format(row=new) if new else '0',
+                                         expression.format(row=old) if old else None]))
+        deltas.append(f'{column} = {column} + ({delta})')
+    return ', '.join(deltas)
+
+
+def apply_summary_triggers(engine: Engine) -> None:
+    """
+    Create the triggers which keep the system summaries up to date. Every write to a counted row applies the change
+    to a single summary row, within the same transaction. Table rebuilds drop the triggers, so this is run after
+    every migration check.
+
+    :param engine: The SQLAlchemy engine
+    """
+
+    totals = ', '.join(f"{column} = (SELECT COALESCE(SUM({expression.format(row='p')}), 0) FROM planets AS p "
+                       f"WHERE p.system_id = NEW.system_id)" for column, expression in SUMMARY_PLANET_TOTALS.items())
+    with engine.connect() as connection:
+        connection.exec_driver_sql(f'CREATE TRIGGER IF NOT EXISTS system_summary_init AFTER INSERT ON system_summary '
+                                   f'BEGIN UPDATE system_summary SET {totals} WHERE id = NEW.id; END')
+        for source in SUMMARY_SOURCES:
+            for action, new, old in (('INSERT', 'NEW', None), ('UPDATE', 'NEW', 'OLD'), ('DELETE', None, 'OLD')):
+                if action != 'INSERT' and not source.counts:
+                    continue
+                row = new or old
+                system = source.system.format(row=row)
+                body = ''
+                if new:
+                    body += (f'INSERT INTO system_summary (system_id, commander_id) '
+                             f'SELECT {system}, {row}.commander_id WHERE {system} IS NOT NULL AND NOT EXISTS '
+                             f'(SELECT 1 FROM system_summary WHERE system_id = {system} '
+                             f'AND commander_id = {row}.commander_id); ')
+                if source.counts:
+                    body += (f'UPDATE system_summary SET {_summary_delta(source.counts, new, old)} '
+                             f'WHERE system_id = {system} AND commander_id = {row}.commander_id; ')
+                columns = ''
+                if action == 'UPDATE':
+                    watched = sorted({column for expression in source.counts.values()
+                                      for column in re.findall(r'{row}\.(\w+)', expression)})
+                    columns = f' OF {", ".join(watched)}'
+                connection.exec_driver_sql(
+                    f'CREATE TRIGGER IF NOT EXISTS {source.table}_summary_{action.lower()} '
+                    f'AFTER {action}{columns} ON {source.table} BEGIN {body}END'
+                )
+        for action, new, old in (('INSERT', 'NEW', None), ('UPDATE', 'NEW', 'OLD'), ('DELETE', None, 'OLD')):
+            columns = ' OF bio_signals, geo_signals' if action == 'UPDATE' else ''
+            connection.exec_driver_sql(
+                f'CREATE TRIGGER IF NOT EXISTS planets_summary_{action.lower()} AFTER {action}{columns} ON planets '
+                f'BEGIN UPDATE system_summary SET {_summary_delta(SUMMARY_PLANET_TOTALS, new, old)} '
+                f'WHERE system_id = {new or old}.system_id; END'
+            )
+        sources = {source.table: source for source in SUMMARY_SOURCES}
+        for cascade in SUMMARY_CASCADES:
+            body = ''
+            for table, condition in cascade.sources.items():
+                counts = ', '.join(f"{column} = {column} - (SELECT COALESCE(SUM({expression.format(row='s')}), 0) "
+                                   f"FROM {table} AS s WHERE {condition.format(row='s')} "
+                                   f"AND s.commander_id = system_summary.commander_id)"
+                                   for column, expression in sources[table].counts.items())
+                body += f'UPDATE system_summary SET {counts} WHERE system_id = {cascade.system}; '
+            connection.exec_driver_sql(f'CREATE TRIGGER IF NOT EXISTS {cascade.table}_summary_cascade '
+                                       f'BEFORE DELETE ON {cascade.table} BEGIN {body}END')
+        connection.commit()
+
+
+def rebuild_system_summaries(engine: Engine) -> None:
+    """
+    Recount every system summary from the underlying tables
+
+    :param engine: The SQLAlchemy engine
+    """
+
+    columns = list(dict.fromkeys(column for source in SUMMARY_SOURCES for column in source.counts))
+    selects = []
+    for source in SUMMARY_SOURCES:
+        values = ', '.join(f"{source.counts[column].format(row='s')} AS {column}" if column in source.counts
+                           else f'0 AS {column}' for column in columns)
+        selects.append(f"SELECT {source.system.format(row='s')} AS system_id, s.commander_id AS commander_id, "
+                       f"{values} FROM {source.table} AS s")
+    totals = ', '.join(f"(SELECT COALESCE(SUM({expression.format(row='p')}), 0) FROM planets AS p "
+                       f"WHERE p.system_id = c.system_id)" for expression in SUMMARY_PLANET_TOTALS.values())
+    with engine.connect() as connection:
+        connection.exec_driver_sql('DELETE FROM system_summary')
+        connection.exec_driver_sql(
+            f'INSERT INTO system_summary (system_id, commander_id, {", ".join(SUMMARY_PLANET_TOTALS)}, '
+            f'{", ".join(columns)}) '
+            f'SELECT c.system_id, c.commander_id, {totals}, {", ".join(f"c.{column}" for column in columns)} FROM ('
+            f'SELECT system_id, commander_id, {", ".join(f"SUM({column}) AS {column}" for column in columns)} '
+            f'FROM ({" UNION ALL ".join(selects)}) WHERE system_id IS NOT NULL GROUP BY system_id, commander_id'
+            f') AS c'
+        )
+        connection.commit()
+
+
+def _region_summary_row(region: str, commander: str) -> str:
+    """ Build the statement creating a missing region summary row """
+
+    return (f'INSERT INTO region_summary (region, commander_id) SELECT {region}, {commander} '
+            f'WHERE {region} IS NOT NULL AND NOT EXISTS '
+            f'(SELECT 1 FROM region_summary WHERE region = {region} AND commander_id = {commander}); ')
+
+
+def _region_system_totals(system: str, sign: str) -> str:
+    """ Build the SET clause adding or removing every commander's summary of a system to their region summaries """
+
+    totals = {'systems': 'COUNT(*)', **{column: f'COALESCE(SUM(s.{column}), 0)' for column in REGION_SUMMARY_COLUMNS}}
+    return ', '.join(f'{column} = {column} {sign} (SELECT {expression} FROM system_summary AS s '
+                     f'WHERE s.system_id = {system} AND s.commander_id = region_summary.commander_id)'
+                     for column, expression in totals.items())
+
+
+def apply_region_summary_triggers(engine: Engine) -> None:
+    """
+    Create the triggers which roll the system summaries and codex scans up into the region summaries. Changes to a
+    system summary are applied to its region's row, and systems changing region move their totals across.
+    Table rebuilds drop the triggers, so this is run after every migration check.
+
+    :param engine: The SQLAlchemy engine
+    """
+
+    counts = {'systems': '1', **{column: f'{{row}}.{column}' for column in REGION_SUMMARY_COLUMNS}}
+    with engine.connect() as connection:
+        for action, new, old in (('INSERT', 'NEW', None), ('UPDATE', 'NEW', 'OLD'), ('DELETE', None, 'OLD')):
+            row = new or old
+            region = f'(SELECT COALESCE(region, 0) FROM systems WHERE id = {row}.system_id)'
+            body = _region_summary_row(region, f'{row}.commander_id') if new else ''
+            body += (f'UPDATE region_summary SET {_summary_delta(counts, new, old)} '
+                     f'WHERE region = {region} AND commander_id = {row}.commander_id; ')
+            connection.exec_driver_sql(f'CREATE TRIGGER IF NOT EXISTS system_summary_region_{action.lower()} '
+                                       f'AFTER {action} ON system_summary BEGIN {body}END')
+
+        commanders = 'commander_id IN (SELECT commander_id FROM system_summary WHERE system_id = {row}.id)'
+        connection.exec_driver_sql(
+            f'CREATE TRIGGER IF NOT EXISTS systems_region_update AFTER UPDATE OF region ON systems '
+            f'WHEN COALESCE(OLD.region, 0) != COALESCE(NEW.region, 0) BEGIN '
+            f'UPDATE region_summary SET {_region_system_totals("OLD.id", "-")} '
+            f'WHERE region = COALESCE(OLD.region, 0) AND {commanders.format(row="OLD")}; '
+            f'INSERT INTO region_summary (region, commander_id) SELECT COALESCE(NEW.region, 0), s.commander_id '
+            f'FROM system_summary AS s WHERE s.system_id = NEW.id AND NOT EXISTS (SELECT 1 FROM region_summary AS r '
+            f'WHERE r.region = COALESCE(NEW.region, 0) AND r.commander_id = s.commander_id); '
+            f'UPDATE region_summary SET {_region_system_totals("NEW.id", "+")} '
+            f'WHERE region = COALESCE(NEW.region, 0) AND {commanders.format(row="NEW")}; END'
+        )
+        # Deleting a system cascades to its summaries after the system row is gone, so they are counted out first
+        connection.exec_driver_sql(
+            f'CREATE TRIGGER IF NOT EXISTS systems_region_delete BEFORE DELETE ON systems BEGIN '
+            f'UPDATE region_summary SET {_region_system_totals("OLD.id", "-")} '
+            f'WHERE region = COALESCE(OLD.region, 0) AND {commanders.format(row="OLD")}; END'
+        )
+
+        codex = {'codex_entries': '1'}
+        for action, new, old in (('INSERT', 'NEW', None), ('UPDATE', 'NEW', 'OLD'), ('DELETE', None, 'OLD')):
+            body = ''
+            if old:
+                body += (f'UPDATE region_summary SET {_summary_delta(codex, None, old)} '
+                         f'WHERE region = OLD.region AND commander_id = OLD.commander_id; ')
+            if new:
+                body += _region_summary_row('NEW.region', 'NEW.commander_id')
+                body += (f'UPDATE region_summary SET {_summary_delta(codex, new, None)} '
+                         f'WHERE region = NEW.region AND commander_id = NEW.commander_id; ')
+            columns = ' OF region, commander_id' if action == 'UPDATE' else ''
+            connection.exec_driver_sql(f'CREATE TRIGGER IF NOT EXISTS codex_scans_region_{action.lower()} '
+                                       f'AFTER {action}{columns} ON codex_scans BEGIN {body}END')
+        connection.commit()
+
+
+def rebuild_region_summaries(engine: Engine) -> None:
+    """
+    Recount every region summary from the system summaries and codex scans
+
+    :param engine: The SQLAlchemy engine
+    """
+
+    columns = ['systems', *REGION_SUMMARY_COLUMNS, 'codex_entries']
+    systems = ', '.join(['1 AS systems', *(f's.{column} AS {column}' for column in REGION_SUMMARY_COLUMNS),
+                         '0 AS codex_entries'])
+    codex = ', '.join(['0 AS systems', *(f'0 AS {column}' for column in REGION_SUMMARY_COLUMNS),
+                       '1 AS codex_entries'])
+    with engine.connect() as connection:
+        connection.exec_driver_sql('DELETE FROM region_summary')
+        connection.exec_driver_sql(
+            f'INSERT INTO region_summary (region, commander_id, {", ".join(columns)}) '
+            f'SELECT region, commander_id, {", ".join(f"SUM({column})" for column in columns)} FROM ('
+            f'SELECT COALESCE(y.region, 0) AS region, s.commander_id AS commander_id, {systems} '
+            f'FROM system_summary AS s JOIN systems AS y ON y.id = s.system_id UNION ALL '
+            f'SELECT c.region AS region, c.commander_id AS commander_id, {codex} FROM codex_scans AS c'
+            f') GROUP BY region, commander_id'
+        )
+        connection.commit()
+
+
 """
 Database initialization
 """
@@ -552,6 +1030,17 @@ def set_sqlite_pragma(dbapi_connection, connection_record) -> None:
     Event listener to set foreign keys on for the sqlite database any time the Engine opens a connection
     """
 
+    revision: list[Optional[int]] = [None]
+
+    def transaction_revision(stored: Optional[int]) -> int:
+        if revision[0] is None:
+            revision[0] = (stored or 0) + 1
+        return revision[0]
+
+    # Used by the revision stamps. Reset as each transaction begins, see reset_revision.
+    dbapi_connection.create_function('explodata_revision', 1, transaction_revision)
+    connection_record.info['revision'] = revision
+
     cursor = dbapi_connection.cursor()
     cursor.execute("PRAGMA foreign_keys=ON")
     cursor.execute("PRAGMA journal_mode=WAL")
@@ -560,6 +1049,17 @@ def set_sqlite_pragma(dbapi_connection, connection_record) -> None:
     cursor.close()
 
 
+@event.listens_for(Engine, "begin")
+def reset_revision(connection) -> None:
+    """
+    Event listener to give each transaction its own change revision
+    """
+
+    revision = connection.info.get('revision')
+    if revision:
+        revision[0] = None
+
+
 def init() -> bool:
     """
     Initialize the database and run migrations (if needed)
@@ -580,6 +1080,10 @@ def init() -> bool:
         result = migrate(this.sql_engine)
         if not result:
             this.migration_failed = True
+        else:
+            apply_revision_triggers(this.sql_engine)
+            apply_summary_triggers(this.sql_engine)
+            apply_region_summary_triggers(this.sql_engine)
         this.sql_session_factory = scoped_session(sessionmaker(bind=this.sql_engine))
     return this.migration_failed
 
@@ -610,6 +1114,44 @@ def get_session() -> Session:
     return this.sql_session_factory()
 
 
+class BatchSession(Session):
+    """
+    Session used for batch transactions. Commits only flush and expire loaded state (as a commit would), and closing
+    only clears the identity map, so the existing per-event commit and close calls don't end the batch.
+    Use savepoints to isolate failures.
+    """
+
+    def commit(self) -> None:
+        self.flush()
+        self.expire_all()
+
+    def close(self) -> None:
+        self.expunge_all()
+
+
+@contextmanager
+def batch_session() -> Iterator[BatchSession]:
+    """
+    Get a Session which writes a batch of work in a single database transaction. The write lock is taken up front
+    (BEGIN IMMEDIATE) and the batch is committed once it's done, or rolled back if an exception escapes.
+
+    :return: Context manager yielding the batch Session
+    """
+
+    with this.sql_engine.connect() as connection:
+        connection.exec_driver_sql('BEGIN IMMEDIATE')
+        session = BatchSession(bind=connection, join_transaction_mode='rollback_only')
+        try:
+            yield session
+            session.flush()
+            Session.close(session)
+            connection.commit()
+        except Exception:
+            Session.close(session)
+            connection.rollback()
+            raise
+
+
 def get_engine() -> Engine:
     """
     Get the active SQLAlchemy Engine
@@ -618,3 +1160,128 @@ def get_engine() -> Engine:
     """
 
     return this.sql_engine
+
+
+def get_revision() -> int:
+    """
+    Get the current change revision
+
+    :return: The revision of the latest stamped write
+    """
+
+    value = run_statement(this.sql_engine, select(Metadata.value).where(Metadata.key == 'revision')).scalar()
+    return int(value) if value else 0
+
+
+def get_changes_since(revision: int, system_id: Optional[int] = None) -> Changes:
+    """
+    Get the rows written since the given revision. Pass the returned revision to the next call to pick up where this
+    one left off. Deleted flora and body child rows (gasses, geos, rings) are reported as a change to their parent.
+
+    :param revision: The last revision seen by the caller
+    :param system_id: Optional system ID to limit changes to. Codex scans are matched by the system's region.
+    :return: Changes with the current revision and the changed row ids
+    """
+
+    current = get_revision()
+    rows: dict[str, list[int]] = {}
+    if current <= revision:
+        return Changes(current, rows)
+    with this.sql_engine.connect() as connection:
+        for table in REVISION_TABLES:
+            statement = select(table.id).where(table.revision > revision, table.revision <= current)
+            if system_id is not None:
+                if table is System:
+                    statement = statement.where(System.id == system_id)
+                elif table is CodexScans:
+                    statement = statement.where(CodexScans.region == select(System.region)
+                                                .where(System.id == system_id).scalar_subquery())
+                else:
+                    joins = REVISION_SYSTEM_JOINS.get(table, [])
+                    for join in joins:
+                        statement = statement.join(join)
+                    statement = statement.where((joins[-1] if joins else table).system_id == system_id)
+            ids = list(connection.execute(statement).scalars())
+            if ids:
+                rows[table.__tablename__] = ids
+    return Changes(current, rows)
+
+
+def get_system_summary(system_id: int, commander_id: int) -> Optional[SystemSummary]:
+    """
+    Get the exploration totals of a system for a commander
+
+    :param system_id: The system ID
+    :param commander_id: The commander ID
+    :return: The detached summary, or None if the commander has no data for the system
+    """
+
+    with Session(this.sql_engine) as session:
+        return session.scalar(select(SystemSummary).where(SystemSummary.system_id == system_id)
+                              .where(SystemSummary.commander_id == commander_id))
+
+
+def rebuild_summaries() -> None:
+    """
+    Recount the system and region summaries from the underlying tables. Triggers keep both up to date, so this is
+    only needed to repair them, such as after bulk writes made outside of this module.
+    """
+
+    rebuild_system_summaries(this.sql_engine)
+    rebuild_region_summaries(this.sql_engine)
+
+
+def get_region_summaries(commander_id: int) -> list[RegionSummary]:
+    """
+    Get the exploration totals of every region the commander has data for
+
+    :param commander_id: The commander ID
+    :return: List of detached region summaries, ordered by region ID. Region 0 holds systems without a known region.
+    """
+
+    with Session(this.sql_engine) as session:
+        return list(session.scalars(select(RegionSummary).where(RegionSummary.commander_id == commander_id)
+                                    .where((RegionSummary.systems > 0) | (RegionSummary.codex_entries > 0))
+                                    .order_by(RegionSummary.region)))
+
+
+def get_region_summary(region: int, commander_id: int) -> Optional[RegionSummary]:
+    """
+    Get the exploration totals of a region for a commander
+
+    :param region: The region ID
+    :param commander_id: The commander ID
+    :return: The detached summary, or None if the commander has no data for the region
+    """
+
+    with Session(this.sql_engine) as session:
+        return session.scalar(select(RegionSummary).where(RegionSummary.region == region)
+                              .where(RegionSummary.commander_id == commander_id))
+
+
+def get_commander_totals(commander_id: int) -> dict[str, int]:
+    """
+    Get the galaxy-wide exploration totals of a commander, summed from the region summaries
+
+    :param commander_id: The commander ID
+    :return: Dictionary of totals keyed by region summary column name
+    """
+
+    columns = ['systems', *REGION_SUMMARY_COLUMNS, 'codex_entries']
+    statement = select(*(func.coalesce(func.sum(getattr(RegionSummary, column)), 0).label(column)
+                         for column in columns)).where(RegionSummary.commander_id == commander_id)
+    return dict(run_statement(this.sql_engine, statement).mappings().one())
+
+
+def get_region_codex(region: int, commander_id: int) -> list[str]:
+    """
+    Get the biological codex entries a commander has logged in a region
+
+    :param region: The region ID
+    :param commander_id: The commander ID
+    :return: List of codex entry names
+    """
+
+    statement = select(CodexScans.biological).where(CodexScans.commander_id == commander_id) \
+        .where(CodexScans.region == region).order_by(CodexScans.biological)
+    return list(run_statement(this.sql_engine, statement).scalars())
@@ -0,0 +1,328 @@
+# -*- coding: utf-8 -*-
+# ExploData module plugin for EDMC
+# Source: https://github.com/Silarn/EDMC-ExploData
+# Licensed under the [GNU Public License (GPL)](http://www.gnu.org/licenses/gpl-2.0.html) version 2 or later.
+
+import gzip
+import json
+import threading
+from pathlib import Path
+from typing import Any, BinaryIO, Iterable, Iterator, Mapping, NamedTuple, Optional
+
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from EDMCLogging import get_plugin_logger
+
+from ExploData.explo_data import const
+from .RegionMap import findRegion, findRegionForBoxel
+from .RegionMapData import regions
+from .db import System, get_session
+from .notifications import note_change
+from .body_data.batch import BodyBatch, apply_body_batches
+from .edsm_parse import build_edsm_batch
+
+Coordinates = tuple[float, float, float]
+BoundingBox = tuple[Coordinates, Coordinates]
+
+
+class This:
+    """Holds globals."""
+
+    def __init__(self):
+        self.import_thread: Optional[threading.Thread] = None
+        self.import_stop: threading.Event = threading.Event()
+        self.import_progress: tuple[int, int] = (0, 0)
+        self.import_counts: tuple[int, int] = (0, 0)
+
+
+this = This()
+logger = get_plugin_logger(const.plugin_name)
+
+
+class DumpSystem(NamedTuple):
+    """ A system read from a dump file, with its raw body records """
+    name: str
+    coords: Optional[Coordinates]
+    filter_coords: Optional[Coordinates]
+    body_count: Optional[int]
+    bodies: list[Mapping[str, Any]]
+
+
+class DumpFilter:
+    """ Region and bounding box filter for dump imports. Systems without usable coordinates are rejected. """
+
+    def __init__(self, region: Optional[int | str] = None, bbox: Optional[BoundingBox] = None):
+        if isinstance(region, str):
+            region = regions.index(region) if region in regions else -1
+        self._region: Optional[int] = region
+        self._bbox: Optional[BoundingBox] = None
+        if bbox:
+            low, high = bbox
+            self._bbox = (tuple(map(min, low, high)), tuple(map(max, low, high)))
+
+    def is_active(self) -> bool:
+        return self._region is not None or self._bbox is not None
+
+    def accepts(self, coords: Optional[Coordinates]) -> bool:
+        if not self.is_active():
+            return True
+        if coords is None:
+            return False
+        if self._bbox:
+            low, high = self._bbox
+            if not all(low[axis] <= coords[axis] <= high[axis] for axis in range(3)):
+                return False
+        if self._region is not None:
+            region = findRegion(*coords)
+            if not region or region[0] != self._region:
+                return False
+        return True
+
+
+def read_records(stream: BinaryIO) -> Iterator[Mapping[str, Any]]:
+    """
+    Read records from a JSON lines file, or a JSON array with one record per line as used by the EDSM and Spansh
+    dumps. Lines are decoded one at a time, so memory use does not depend on the file size.
+
+    :param stream: The binary file stream
+    :return: Iterator of decoded records
+    """
+
+    for line in stream:
+        line = line.strip()
+        if line in (b'', b'[', b']'):
+            continue
+        if line.endswith(b','):
+            line = line[:-1]
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as ex:
+            logger.error(f'Dump JSON decode issue:\n{line[:200]!r}\n', exc_info=ex)
+
+
+def read_systems(records: Iterable[Mapping[str, Any]]) -> Iterator[DumpSystem]:
+    """
+    Group dump records into systems. Galaxy dumps (Spansh) contain a system per record with nested bodies.
+    Body dumps (EDSM) contain a body per record, and consecutive bodies of the same system are grouped.
+    Body dumps carry no coordinates, so the boxel position derived from the system ID64 is used for filtering.
+
+    :param records: The decoded dump records
+    :return: Iterator of DumpSystem tuples
+    """
+
+    current: Optional[DumpSystem] = None
+    for record in records:
+        if 'bodies' in record or 'coords' in record:
+            if current:
+                yield current
+                current = None
+            coords = _get_coords(record)
+            yield DumpSystem(record['name'], coords, coords, record.get('bodyCount'), record.get('bodies') or [])
+        elif 'systemName' in record:
+            if current and current.name != record['systemName']:
+                yield current
+                current = None
+            if not current:
+                coords = _get_coords(record)
+                filter_coords = coords
+                if not filter_coords and record.get('systemId64'):
+                    boxel = findRegionForBoxel(record['systemId64'])
+                    filter_coords = (boxel['x'], boxel['y'], boxel['z'])
+                current = DumpSystem(record['systemName'], coords, filter_coords, None, [])
+            current.bodies.append(record)
+    if current:
+        yield current
+
+
+def _get_coords(record: Mapping[str, Any]) -> Optional[Coordinates]:
+    coords = record.get('coords')
+    if coords:
+        return coords['x'], coords['y'], coords['z']
+    return None
+
+
+def write_systems(session: Session, systems: list[DumpSystem]) -> int:
+    """
+    Write a chunk of dump systems and their bodies. Journal sourced body data is not overwritten.
+    Nothing is committed, so the caller controls the transaction.
+
+    :param session: The active Session
+    :param systems: The systems to write
+    :return: The number of bodies written
+    """
+
+    located: list[dict[str, Any]] = []
+    unlocated: list[dict[str, Any]] = []
+    for system in systems:
+        row: dict[str, Any] = {'name': system.name, 'body_count': system.body_count or 1}
+        if system.coords:
+            region = findRegion(*system.coords)
+            row.update(x=system.coords[0], y=system.coords[1], z=system.coords[2],
+                       region=region[0] if region else None)
+            located.append(row)
+        else:
+            unlocated.append(row)
+    if located:
+        stmt = insert(System)
+        stmt = stmt.on_conflict_do_update(index_elements=['name'], set_={
+            column: stmt.excluded[column] for column in ('x', 'y', 'z', 'region')
+        })
+        session.execute(stmt, located)
+    if unlocated:
+        session.execute(insert(System).on_conflict_do_nothing(index_elements=['name']), unlocated)
+
+    system_ids: dict[str, int] = dict(session.execute(
+        select(System.name, System.id).where(System.name.in_([system.name for system in systems]))
+    ).tuples().all())
+    for system in systems:
+        if system.name in system_ids:
+            note_change(session, 'system', system_ids[system.name], [], ['x', 'y', 'z', 'region'] if system.coords
+                        else ['created'])
+
+    batches: dict[int, BodyBatch] = {}
+    for system in systems:
+        if system.name not in system_ids or not system.bodies:
+            continue
+        batch = build_edsm_batch(system.name, system.bodies)
+        if system_ids[system.name] in batches:
+            _merge_batch(batches[system_ids[system.name]], batch)
+        else:
+            batches[system_ids[system.name]] = batch
+    apply_body_batches(session, batches)
+    return sum(len(batch) for batch in batches.values())
+
+
+def _merge_batch(target: BodyBatch, batch: BodyBatch) -> None:
+    """ Merge a batch into another batch of the same system, as body dumps may split a system's bodies """
+
+    target.stars.update(batch.stars)
+    target.star_rings.update(batch.star_rings)
+    target.planets.update(batch.planets)
+    target.planet_gasses.update(batch.planet_gasses)
+    target.planet_rings.update(batch.planet_rings)
+
+
+def import_dump(path: Path, region: Optional[int | str] = None, bbox: Optional[BoundingBox] = None,
+                event: Optional[threading.Event] = None, chunk_size: int = 250) -> tuple[int, int]:
+    """
+    Stream a gzipped (or plain) EDSM or Spansh dump file into the database. Each chunk of systems is written in
+    a single transaction.
+
+    :param path: The dump file path
+    :param region: Optional region ID or name to filter by
+    :param bbox: Optional bounding box ((x1, y1, z1), (x2, y2, z2)) to filter by
+    :param event: Optional Event used to interrupt the import
+    :param chunk_size: The number of systems written per transaction
+    :return: Tuple of the imported system and body counts, excluding chunks which failed to commit
+    """
+
+    dump_filter = DumpFilter(region, bbox)
+    session = get_session()
+    systems_done = 0
+    bodies_done = 0
+    total = path.stat().st_size
+    with open(path, 'rb') as raw:
+        stream: BinaryIO = gzip.GzipFile(fileobj=raw) if path.suffix == '.gz' else raw
+        chunk: list[DumpSystem] = []
+        for system in read_systems(read_records(stream)):
+            if event and event.is_set():
+                break
+            if not dump_filter.accepts(system.filter_coords):
+                continue
+            chunk.append(system)
+            if len(chunk) >= chunk_size:
+                if (bodies := _commit_chunk(session, chunk)) is not None:
+                    systems_done += len(chunk)
+                    bodies_done += bodies
+                chunk = []
+                this.import_progress = (raw.tell(), total)
+                this.import_counts = (systems_done, bodies_done)
+        if chunk and not (event and event.is_set()):
+            if (bodies := _commit_chunk(session, chunk)) is not None:
+                systems_done += len(chunk)
+                bodies_done += bodies
+        this.import_progress = (raw.tell(), total)
+        this.import_counts = (systems_done, bodies_done)
+    session.close()
+    return systems_done, bodies_done
+
+
+def _commit_chunk(session: Session, chunk: list[DumpSystem]) -> Optional[int]:
+    """
+    Write and commit a chunk of systems. A failed chunk is rolled back and logged.
+
+    :param session: The active Session
+    :param chunk: The systems to write
+    :return: The number of bodies written, or None if the chunk was rolled back
+    """
+
+    try:
+        count = write_systems(session, chunk)
+        session.commit()
+        return count
+    except Exception as ex:
+        session.rollback()
+        logger.error('Dump import chunk failed', exc_info=ex)
+        return None
+
+
+def start_import(path: Path, region: Optional[int | str] = None, bbox: Optional[BoundingBox] = None) -> bool:
+    """
+    Start a dump import on a background thread
+
+    :param path: The dump file path
+    :param region: Optional region ID or name to filter by
+    :param bbox: Optional bounding box ((x1, y1, z1), (x2, y2, z2)) to filter by
+    :return: False if an import is already running
+    """
+
+    if is_importing():
+        return False
+    this.import_stop.clear()
+    this.import_progress = (0, path.stat().st_size)
+    this.import_counts = (0, 0)
+    this.import_thread = threading.Thread(target=_import_worker, name='Dump import worker',
+                                          args=(path, region, bbox))
+    this.import_thread.daemon = True
+    this.import_thread.start()
+    return True
+
+
+def _import_worker(path: Path, region: Optional[int | str], bbox: Optional[BoundingBox]) -> None:
+    try:
+        systems, bodies = import_dump(path, region, bbox, this.import_stop)
+        logger.info(f'Imported {systems} systems and {bodies} bodies from {path.name}')
+    except Exception as ex:
+        logger.error('Dump import failed', exc_info=ex)
+
+
+def is_importing() -> bool:
+    return this.import_thread is not None and this.import_thread.is_alive()
+
+
+def get_progress() -> tuple[int, int]:
+    """
+    Helper function to access the dump import progress as bytes read and total bytes of the dump file.
+    """
+
+    return this.import_progress
+
+
+def get_counts() -> tuple[int, int]:
+    """
+    Helper function to access the imported system and body counts.
+    """
+
+    return this.import_counts
+
+
+def shutdown() -> None:
+    """
+    Dump import shutdown handler. Trigger graceful exit of an active import thread.
+    """
+
+    if is_importing():
+        this.import_stop.set()
+        this.import_thread.join()
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+# ExploData module plugin for EDMC
+# Source: https://github.com/Silarn/EDMC-ExploData
+# Licensed under the [GNU Public License (GPL)](http://www.gnu.org/licenses/gpl-2.0.html) version 2 or later.
+
+import hashlib
+import json
+import threading
+import zlib
+from time import time
+from typing import Mapping, NamedTuple, Optional
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.sqlite import insert
+
+from EDMCLogging import get_plugin_logger
+
+from ExploData.explo_data import const
+from .db import EDSMCache, get_engine
+
+CACHE_FRESH_TIME: int = 60 * 60 * 24  # Serve without revalidation for one day
+CACHE_MAX_AGE: int = 60 * 60 * 24 * 30  # Drop entries which haven't been fetched in 30 days
+CACHE_MAX_SIZE: int = 64 * 1024 * 1024  # Total compressed bytes to keep
+EVICT_INTERVAL: int = 25  # Run eviction after this many stores
+
+
+class This:
+    """Holds globals."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stores: int = 0
+
+
+this = This()
+logger = get_plugin_logger(const.plugin_name)
+
+
+class CacheEntry(NamedTuple):
+    system: str
+    data: bytes
+    fetched: float
+    etag: Optional[str]
+    last_modified: Optional[str]
+    payload_hash: str
+    applied_hash: str
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        return ((now or time()) - self.fetched) < CACHE_FRESH_TIME
+
+    def is_applied(self) -> bool:
+        return self.payload_hash != '' and self.payload_hash == self.applied_hash
+
+    def decode(self) -> Mapping:
+        return json.loads(zlib.decompress(self.data)) or {}
+
+
+def get_entry(system_name: str) -> Optional[CacheEntry]:
+    """
+    Get the cached EDSM response for a system
+
+    :param system_name: The system name
+    :return: The cache entry, or None if the system isn't cached
+    """
+
+    with get_engine().connect() as connection:
+        row = connection.execute(
+            select(EDSMCache.system, EDSMCache.data, EDSMCache.fetched, EDSMCache.etag, EDSMCache.last_modified,
+                   EDSMCache.payload_hash, EDSMCache.applied_hash).where(EDSMCache.system == system_name)
+        ).first()
+    return CacheEntry(*row) if row else None
+
+
+def store(system_name: str, content: bytes, etag: Optional[str], last_modified: Optional[str]) -> str:
+    """
+    Store a raw EDSM response. The applied hash is kept, so an unchanged payload is still recognized as applied.
+
+    :param system_name: The system name
+    :param content: The raw (uncompressed) response body
+    :param etag: The ETag response header, if any
+    :param last_modified: The Last-Modified response header, if any
+    :return: The hash of the stored payload
+    """
+
+    payload_hash = hashlib.sha1(content).hexdigest()
+    data = zlib.compress(content)
+    values = dict(data=data, size=len(data), fetched=time(), etag=etag, last_modified=last_modified,
+                  payload_hash=payload_hash)
+    with get_engine().begin() as connection:
+        connection.execute(
+            insert(EDSMCache).values(system=system_name, **values)
+            .on_conflict_do_update(index_elements=['system'], set_=values)
+        )
+    with this.lock:
+        this.stores += 1
+        run_evict = this.stores % EVICT_INTERVAL == 0
+    if run_evict:
+        evict()
+    return payload_hash
+
+
+def touch(system_name: str) -> None:
+    """
+    Mark a cached response as revalidated (HTTP 304)
+
+    :param system_name: The system name
+    """
+
+    with get_engine().begin() as connection:
+        connection.execute(update(EDSMCache).where(EDSMCache.system == system_name).values(fetched=time()))
+
+
+def mark_applied(system_name: str, payload_hash: str) -> None:
+    """
+    Record that a payload has been written to the body tables
+
+    :param system_name: The system name
+    :param payload_hash: The hash of the applied payload
+    """
+
+    with get_engine().begin() as connection:
+        connection.execute(update(EDSMCache).where(EDSMCache.system == system_name)
+                           .values(applied_hash=payload_hash))
+
+
+def evict(max_age: int = CACHE_MAX_AGE, max_size: int = CACHE_MAX_SIZE) -> int:
+    """
+    Remove expired entries, then remove the oldest entries until the cache fits in the size limit
+
+    :param max_age: Maximum age in seconds since the last fetch
+    :param max_size: Maximum total size of the compressed payloads in bytes
+    :return: The number of evicted entries
+    """
+
+    try:
+        with get_engine().begin() as connection:
+            removed = connection.execute(delete(EDSMCache).where(EDSMCache.fetched < time() - max_age)).rowcount
+            total = connection.scalar(select(func.coalesce(func.sum(EDSMCache.size), 0)))
+            if total > max_size:
+                oldest = []
+                for system_name, size in connection.execute(
+                        select(EDSMCache.system, EDSMCache.size).order_by(EDSMCache.fetched)):
+                    if total <= max_size:
+                        break
+                    oldest.append(system_name)
+                    total -= size
+                connection.execute(delete(EDSMCache).where(EDSMCache.system.in_(oldest)))
+                removed += len(oldest)
+        return removed
+    except Exception as ex:
+        logger.error('EDSM cache eviction failed', exc_info=ex)
+        return 0
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+# ExploData module plugin for EDMC
+# Source: https://github.com/Silarn/EDMC-ExploData
+# Licensed under the [GNU Public License (GPL)](http://www.gnu.org/licenses/gpl-2.0.html) version 2 or later.
+
+import itertools
+import queue
+import threading
+from time import monotonic
+from typing import Callable, Mapping, Optional
+from urllib.parse import quote
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from EDMCLogging import get_plugin_logger
+
+from ExploData.explo_data import const
+from . import edsm_cache
+
+EDSM_BODIES_URL: str = 'https://www.edsm.net/api-system-v1/bodies'
+
+PRIORITY_HIGH: int = 0
+PRIORITY_NORMAL: int = 5
+PRIORITY_PREFETCH: int = 10
+
+logger = get_plugin_logger(const.plugin_name)
+
+
+class EDSMClient:
+    """
+    Queued EDSM bodies client. A single pooled HTTP session is shared by a small set of worker threads, requests are
+    de-duplicated by system name, and request starts are spaced out to respect the EDSM rate limits.
+    The handler is called on the worker thread with the system name and the decoded response (or None on failure).
+    Responses are cached in the database and revalidated with conditional requests once they go stale.
+    """
+
+    def __init__(self, handler: Callable[[str, Optional[Mapping]], None], base_url: str = EDSM_BODIES_URL,
+                 workers: int = 2, interval: float = 0.5, timeout: float = 10.0, use_cache: bool = True):
+        self._handler = handler
+        self._base_url: str = base_url
+        self._use_cache: bool = use_cache
+        self._worker_count: int = max(1, workers)
+        self._interval: float = interval
+        self._timeout: float = timeout
+
+        self._http = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self._worker_count)
+        self._http.mount('https://', adapter)
+        self._http.mount('http://', adapter)
+
+        self._queue: queue.PriorityQueue[tuple[int, int, str]] = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._pending: dict[str, int] = {}
+        self._active: set[str] = set()
+        self._lock = threading.Lock()
+        self._rate_lock = threading.Lock()
+        self._next_request: float = 0.0
+        self._stop = threading.Event()
+        self._workers: list[threading.Thread] = []
+
+    def submit(self, system_name: str, priority: int = PRIORITY_NORMAL) -> bool:
+        """
+        Queue a system for fetching. Systems which are already queued or in flight are not queued again, but a
+        queued system can be raised to a higher priority.
+
+        :param system_name: The name of the system to fetch
+        :param priority: Queue priority, lower values are fetched first
+        :return: True if the request was queued
+        """
+
+        if self._stop.is_set() or not system_name:
+            return False
+        with self._lock:
+            if system_name in self._active:
+                return False
+            if system_name in self._pending and self._pending[system_name] <= priority:
+                return False
+            self._pending[system_name] = priority
+            self._queue.put((priority, next(self._sequence), system_name))
+            self._start_workers()
+        return True
+
+    def fetch(self, system_name: str) -> Optional[Mapping]:
+        """
+        Get a system's bodies on the calling thread. Fresh cached responses are returned without a request,
+        stale responses are revalidated, and a stale response is used as a fallback if the request fails.
+
+        :param system_name: The name of the system to fetch
+        :return: The decoded EDSM response, or None if the request failed
+        """
+
+        entry = edsm_cache.get_entry(system_name) if self._use_cache else None
+        if entry and entry.is_fresh():
+            return entry.decode()
+
+        headers: dict[str, str] = {}
+        if entry and entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry and entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+
+        self._wait_turn()
+        try:
+            response = self._http.get(f'{self._base_url}?systemName={quote(system_name)}', headers=headers,
+                                      timeout=self._timeout)
+            if response.status_code == 304 and entry:
+                edsm_cache.touch(system_name)
+                return entry.decode()
+            response.raise_for_status()
+            data = response.json() or {}
+        except (requests.exceptions.RequestException, ValueError) as ex:
+            logger.debug(f'EDSM request failed for {system_name}', exc_info=ex)
+            return entry.decode() if entry else None
+
+        if self._use_cache and data:
+            edsm_cache.store(system_name, response.content, response.headers.get('ETag'),
+                             response.headers.get('Last-Modified'))
+        return data
+
+    def is_pending(self, system_name: str) -> bool:
+        with self._lock:
+            return system_name in self._pending or system_name in self._active
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending) + len(self._active)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop the worker threads. Queued requests are dropped, in flight requests are allowed to finish.
+
+        :param wait: Wait for the worker threads to exit
+        """
+
+        self._stop.set()
+        with self._lock:
+            self._pending.clear()
+            workers = list(self._workers)
+            for _ in workers:
+                self._queue.put((-1, next(self._sequence), ''))
+        if wait:
+            for worker in workers:
+                worker.join()
+        self._http.close()
+
+    def _start_workers(self) -> None:
+        self._workers = [worker for worker in self._workers if worker.is_alive()]
+        while len(self._workers) < min(self._worker_count, len(self._pending) + len(self._active)):
+            worker = threading.Thread(target=self._worker, name=f'EDSM worker {len(self._workers) + 1}')
+            worker.daemon = True
+            worker.start()
+            self._workers.append(worker)
+
+    def _wait_turn(self) -> None:
+        with self._rate_lock:
+            now = monotonic()
+            start = max(now, self._next_request)
+            self._next_request = start + self._interval
+        if start > now:
+            self._stop.wait(start - now)
+
+    def _worker(self) -> None:
+        while not self._stop.is_set():
+            try:
+                priority, _, system_name = self._queue.get(timeout=30)
+            except queue.Empty:
+                with self._lock:
+                    if self._queue.empty():
+                        self._workers.remove(threading.current_thread())
+                        return
+                continue
+            if self._stop.is_set():
+                return
+            with self._lock:
+                if self._pending.get(system_name) != priority:
+                    continue  # Stale entry left behind by a priority change
+                del self._pending[system_name]
+                self._active.add(system_name)
+            try:
+                self._handler(system_name, self.fetch(system_name))
+            except Exception as ex:
+                logger.error('EDSM response handler failed', exc_info=ex)
+            finally:
+                with self._lock:
+                    self._active.discard(system_name)
@@ -4,11 +4,9 @@
 # Licensed under the [GNU Public License (GPL)](http://www.gnu.org/licenses/gpl-2.0.html) version 2 or later.
 
 import re
-import requests
 import threading
 import tkinter as tk
-from typing import Callable, Mapping, Optional
-from urllib.parse import quote
+from typing import Any, Callable, Iterable, Mapping, Optional
 
 from sqlalchemy import select
 from sqlalchemy.orm import Session
@@ -17,7 +15,9 @@ from EDMCLogging import get_plugin_logger
 
 from ExploData.explo_data import const
 from .db import System, get_session, Star
-from .body_data.struct import PlanetData, StarData
+from . import edsm_cache
+from .edsm_client import EDSMClient, PRIORITY_NORMAL, PRIORITY_PREFETCH
+from .body_data.batch import BodyBatch, apply_body_batch
 from .body_data.edsm import parse_edsm_star_class, parse_edsm_ring_class, map_edsm_type, map_edsm_atmosphere
 
 
@@ -27,7 +27,9 @@ class This:
     def __init__(self):
         self.edsm_fetch_callbacks: dict[str, tk.Frame] = {}
         self.event_callbacks: dict[str, set[Callable]] = {}
-        self.edsm_thread: threading.Thread | None = None
+        self.edsm_client: Optional[EDSMClient] = None
+        self.started_fetches: set[str] = set()  # Systems queued with a start event, which get a finish event
+        self.fetch_lock = threading.Lock()
 
 
 this = This()
@@ -54,133 +56,79 @@ def get_body_name(system_name: str, fullname: str) -> str:
 class EDSMFetch:
     """
     This class is a general purpose container to process EDSM requests.
+    Finish events are only fired when notify is set, so fetches without a start event stay silent.
     """
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, notify: bool = True):
         self._session: Session = session
+        self._notify: bool = notify
         self._system: Optional[System] = None
-        self._edsm_session: str | None = None
         self._edsm_bodies: Mapping | None = None
 
     def edsm_fetch(self, system_name: str) -> None:
-        """ EDSM system data fetch thread initialization """
-    
-        if not this.edsm_thread or not this.edsm_thread.is_alive():
-            fire_start_event()
-            this.edsm_thread = threading.Thread(target=self.edsm_worker, name='EDSM worker', args=(system_name,))
-            this.edsm_thread.daemon = True
-            this.edsm_thread.start()
+        """ Queue an EDSM system data fetch on the shared EDSM client """
+
+        with this.fetch_lock:
+            if not get_client().submit(system_name, PRIORITY_NORMAL):
+                return
+            this.started_fetches.add(system_name)
+        fire_start_event()
 
     def edsm_worker(self, system_name: str) -> None:
-        """ Fetch system data from EDSM on a threaded function """
-    
-        if not self._edsm_session:
-            self._edsm_session = requests.Session()
-    
-        try:
-            r = self._edsm_session.get('https://www.edsm.net/api-system-v1/bodies?systemName=%s' % quote(system_name),
-                                      timeout=10)
-            r.raise_for_status()
-            self._edsm_bodies = r.json() or {}
-        except requests.exceptions.RequestException:
-            self._edsm_bodies = None
-    
-        self.process_edsm_data()
+        """ Fetch system data from EDSM on the calling thread """
 
-    def process_edsm_data(self) -> None:
-        """ Handle data retrieved from EDSM """
-    
-        if self._edsm_bodies is None:
+        self._edsm_bodies = get_client().fetch(system_name)
+        self.process_cached_edsm_data(system_name)
+
+    def process_cached_edsm_data(self, system_name: str) -> None:
+        """
+        Handle data retrieved through the EDSM cache. Database writes are skipped if the same payload has
+        already been applied, and a payload is only recorded as applied once its write is committed.
+
+        :param system_name: The requested system name, used as the cache key
+        """
+
+        entry = edsm_cache.get_entry(system_name) if self._edsm_bodies else None
+        if entry and entry.is_applied():
+            if self._notify:
+                fire_finish_event()
             return
-        
+        if self.process_edsm_data() and entry:
+            edsm_cache.mark_applied(system_name, entry.payload_hash)
+
+    def set_edsm_data(self, data: Optional[Mapping]) -> None:
+        """ Set EDSM bodies data retrieved by the EDSM client """
+
+        self._edsm_bodies = data
+
+    def process_edsm_data(self) -> bool:
+        """
+        Handle data retrieved from EDSM. All bodies are written in a single transaction.
+
+        :return: True if the bodies were committed
+        """
+
+        if self._edsm_bodies is None:
+            return False
+
         system_name = self._edsm_bodies.get('name', '')
         self._system = self._session.scalar(select(System).where(System.name == system_name))
         if not self._system:
             self._system = System(name=system_name)
             self._session.add(self._system)
-        self._session.commit()
-    
-        for body in self._edsm_bodies.get('bodies', []):
-            body_short_name = get_body_name(system_name, body['name'])
-            if body['type'] == 'Star':
-                self.add_edsm_star(body)
-            elif body['type'] == 'Planet':
-                self._system = self._session.merge(self._system)
-                try:
-                    planet_data = PlanetData.from_journal(self._system, body_short_name, body['bodyId'], self._session)
-                    planet_type = map_edsm_type(body['subType'])
-                    terraformable = 'Terraformable' if body['terraformingState'] == 'Candidate for terraforming' \
-                        else ''
-                    planet_data.set_type(planet_type) \
-                        .set_distance(body['distanceToArrival']) \
-                        .set_atmosphere(map_edsm_atmosphere(body['atmosphereType'])) \
-                        .set_gravity(body['gravity'] * 9.797759) \
-                        .set_temp(body['surfaceTemperature']) \
-                        .set_mass(body['earthMasses']) \
-                        .set_terraform_state(terraformable) \
-                        .set_landable(body['isLandable']) \
-                        .set_orbital_period(body['orbitalPeriod'] * 86400 if body['orbitalPeriod'] else 0) \
-                        .set_rotation(body['rotationalPeriod'] * 86400)
-                    if body['volcanismType'] == 'No volcanism':
-                        volcanism = ''
-                    else:
-                        volcanism = body['volcanismType'].lower().capitalize() + ' volcanism'
-                    planet_data.set_volcanism(volcanism)
-    
-                    star_search = re.search('^([A-Z]+) .+$', body_short_name)
-                    if star_search:
-                        for star in star_search.group(1):
-                            planet_data.add_parent_star(star)
-                    else:
-                        planet_data.add_parent_star(self._system.name)
-    
-                    if 'materials' in body:
-                        for material in body['materials']:  # type: str
-                            planet_data.add_material(material.lower())
-    
-                    atmosphere_composition: dict[str, float] = body.get('atmosphereComposition', {})
-                    if atmosphere_composition:
-                        for gas, percent in atmosphere_composition.items():
-                            planet_data.add_gas(map_edsm_atmosphere(gas), percent)
-
-                    if 'rings' in body:
-                        for ring in body['rings']:
-                            ring_name = ring['name'][len(body['name'])+1:]
-                            planet_data.add_ring(ring_name, parse_edsm_ring_class(ring['type']))
-    
-                except Exception as e:
-                    logger.error('Error while parsing EDSM', exc_info=e)
+            self._session.flush()
 
-        self._session.commit()
-        fire_finish_event()
-
-    def add_edsm_star(self, body: dict) -> None:
-        """
-        Add a parent star from EDSM API data
-    
-        :param body: The EDSM body data (JSON)
-        """
-
-        self._system = self._session.merge(self._system)
+        batch = build_edsm_batch(system_name, self._edsm_bodies.get('bodies', []))
         try:
-            body_short_name = get_body_name(self._system.name, body['name'])
-            star_data = StarData.from_journal(self._system, body_short_name, body['bodyId'], self._session)
-            if body['spectralClass']:
-                star_data.set_type(body['spectralClass'][:-1])
-                star_data.set_subclass(body['spectralClass'][-1])
-            else:
-                star_data.set_type(parse_edsm_star_class(body['subType']))
-            star_data.set_luminosity(body['luminosity'])
-            star_data.set_distance(body['distanceToArrival'])
-            star_data.set_mass(body['solarMasses'])
-            star_data.set_orbital_period(body['orbitalPeriod'] * 86400 if body['orbitalPeriod'] else 0)
-            star_data.set_rotation(body['rotationalPeriod'] * 86400)
-            for ring_type in ['belts', 'rings']:
-                if ring_type in body:
-                    for belt in body[ring_type]:
-                        ring_name = belt['name'][len(body['name'])+1:]
-                        star_data.add_ring(ring_name, parse_edsm_ring_class(belt['type']))
-        except Exception as e:
-            logger.error('Error while parsing EDSM', exc_info=e)
+            apply_body_batch(self._session, self._system.id, batch)
+            self._session.commit()
+            committed = True
+        except Exception as ex:
+            self._session.rollback()
+            logger.error('Error while saving EDSM data', exc_info=ex)
+            committed = False
+        if self._notify:
+            fire_finish_event()
+        return committed
 
     def get_main_star(self) -> Optional[Star]:
         if self._system and self._system.id:
@@ -188,10 +136,150 @@ class EDSMFetch:
         return None
     
     
+def build_edsm_batch(system_name: str, bodies: Iterable[Mapping[str, Any]]) -> BodyBatch:
+    """
+    Translate EDSM body data into a body batch for bulk upserts
+
+    :param system_name: The name of the system the bodies belong to
+    :param bodies: The EDSM body records (JSON)
+    :return: The translated BodyBatch
+    """
+
+    batch = BodyBatch(system_name)
+    for body in bodies:
+        try:
+            body_short_name = get_body_name(system_name, body['name'])
+            if body['type'] == 'Star':
+                add_edsm_star(batch, body_short_name, body)
+            elif body['type'] == 'Planet':
+                add_edsm_planet(batch, body_short_name, body)
+        except Exception as e:
+            logger.error('Error while parsing EDSM', exc_info=e)
+    return batch
+
+
+def add_edsm_star(batch: BodyBatch, body_short_name: str, body: Mapping[str, Any]) -> None:
+    """
+    Add a star from EDSM API data to a body batch
+
+    :param batch: The target BodyBatch
+    :param body_short_name: The short name of the star
+    :param body: The EDSM body data (JSON)
+    """
+
+    spectral_class: str = body.get('spectralClass') or ''
+    if spectral_class:
+        star_type = spectral_class[:-1]
+        subclass = int(spectral_class[-1]) if spectral_class[-1].isdigit() else 0
+    else:
+        star_type = parse_edsm_star_class(body.get('subType', ''))
+        subclass = 0
+    batch.add_star(body_short_name, body['bodyId'], type=star_type, subclass=subclass,
+                   luminosity=body.get('luminosity') or '', distance=body.get('distanceToArrival') or 0.0,
+                   mass=body.get('solarMasses') or 0.0,
+                   orbital_period=body['orbitalPeriod'] * 86400 if body.get('orbitalPeriod') else 0,
+                   rotation=(body.get('rotationalPeriod') or 0) * 86400)
+    for ring_type in ['belts', 'rings']:
+        if ring_type in body:
+            for belt in body[ring_type]:
+                ring_name = belt['name'][len(body['name'])+1:]
+                batch.add_star_ring(body_short_name, ring_name, parse_edsm_ring_class(belt['type']))
+
+
+def add_edsm_planet(batch: BodyBatch, body_short_name: str, body: Mapping[str, Any]) -> None:
+    """
+    Add a planet from EDSM API data to a body batch
+
+    :param batch: The target BodyBatch
+    :param body_short_name: The short name of the planet
+    :param body: The EDSM body data (JSON)
+    """
+
+    terraformable = 'Terraformable' if body.get('terraformingState') == 'Candidate for terraforming' else ''
+    volcanism_type: str = body.get('volcanismType') or 'No volcanism'
+    if volcanism_type == 'No volcanism':
+        volcanism = ''
+    else:
+        volcanism = volcanism_type.lower().capitalize() + ' volcanism'
+
+    star_search = re.search('^([A-Z]+) .+$', body_short_name)
+    if star_search:
+        parent_stars = ','.join(sorted(set(star_search.group(1))))
+    else:
+        parent_stars = batch.system_name
+
+    batch.add_planet(body_short_name, body['bodyId'], type=map_edsm_type(body.get('subType', '')),
+                     distance=body.get('distanceToArrival') or 0.0,
+                     atmosphere=map_edsm_atmosphere(body.get('atmosphereType') or 'No atmosphere'),
+                     gravity=(body.get('gravity') or 0.0) * 9.797759, temp=body.get('surfaceTemperature'),
+                     mass=body.get('earthMasses') or 0.0, terraform_state=terraformable,
+                     landable=body.get('isLandable', False),
+                     orbital_period=body['orbitalPeriod'] * 86400 if body.get('orbitalPeriod') else 0,
+                     rotation=(body.get('rotationalPeriod') or 0) * 86400, volcanism=volcanism,
+                     parent_stars=parent_stars,
+                     materials=','.join(material.lower() for material in body.get('materials') or {}))
+
+    atmosphere_composition: dict[str, float] = body.get('atmosphereComposition') or {}
+    if atmosphere_composition:
+        for gas, percent in atmosphere_composition.items():
+            batch.add_planet_gas(body_short_name, map_edsm_atmosphere(gas), percent)
+
+    if 'rings' in body:
+        for ring in body['rings']:
+            ring_name = ring['name'][len(body['name'])+1:]
+            batch.add_planet_ring(body_short_name, ring_name, parse_edsm_ring_class(ring['type']))
+
+
+def get_client() -> EDSMClient:
+    """
+    Get the shared EDSM client, creating it on first use
+    """
+
+    if not this.edsm_client:
+        this.edsm_client = EDSMClient(handle_edsm_response)
+    return this.edsm_client
+
+
+def handle_edsm_response(system_name: str, data: Optional[Mapping]) -> None:
+    """
+    EDSM client handler. Runs on an EDSM worker thread and writes the response with a thread-local session.
+    A finish event is fired only if the fetch fired a start event, so prefetches stay silent.
+
+    :param system_name: The requested system name
+    :param data: The decoded EDSM response, or None if the request failed
+    """
+
+    with this.fetch_lock:
+        notify = system_name in this.started_fetches
+        this.started_fetches.discard(system_name)
+    session = get_session()
+    try:
+        fetcher = EDSMFetch(session, notify)
+        fetcher.set_edsm_data(data)
+        fetcher.process_cached_edsm_data(system_name)
+    finally:
+        session.close()
+    if data is None and notify:
+        fire_finish_event()
+
+
 def edsm_fetch(system_name: str) -> None:
     EDSMFetch(get_session()).edsm_fetch(system_name)
 
 
+def prefetch_systems(system_names: Iterable[str]) -> None:
+    """
+    Queue EDSM fetches for a set of systems at low priority, such as the next systems on a plotted route.
+    No start or finish events are fired for prefetched systems.
+
+    :param system_names: The names of the systems to fetch
+    """
+
+    client = get_client()
+    for system_name in system_names:
+        client.submit(system_name, PRIORITY_PREFETCH)
+
+
 def register_edsm_callbacks(frame: tk.Frame, event_name: str, start_func: Optional[Callable],
                                stop_func: Optional[Callable]) -> None:
     """
@@ -227,8 +315,8 @@ def fire_finish_event() -> None:
 
 def shutdown() -> None:
     """
-    Journal import shutdown handler. Trigger graceful exit of any active import threads.
+    EDSM fetch shutdown handler. Drop queued requests and wait for in flight requests to finish.
     """
 
-    if this.edsm_thread and this.edsm_thread.is_alive():
-        this.edsm_thread.join()
+    if this.edsm_client:
+        this.edsm_client.shutdown()
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+# ExploData module plugin for EDMC
+# Source: https://github.com/Silarn/EDMC-ExploData
+# Licensed under the [GNU Public License (GPL)](http://www.gnu.org/licenses/gpl-2.0.html) version 2 or later.
+
+"""
+Journal decode stage for imports. Runs in worker processes, so it only uses the standard library: importing EDMC
+modules (or the rest of the plugin) in a worker would start a second copy of the application state.
+"""
+
+import json
+import re
+from collections import Counter
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Mapping, NamedTuple
+
+# Events handled by JournalParse.process_entry. Other events are counted, but not decoded or passed to the writer.
+JOURNAL_EVENTS: frozenset[str] = frozenset({
+    'loadgame', 'commander', 'newcommander', 'location', 'fsdjump', 'carrierjump', 'navroute', 'navrouteclear',
+    'fsdtarget', 'scan', 'fssdiscoveryscan', 'fssbodysignals', 'saasignalsfound', 'fssallbodiesfound',
+    'saascancomplete', 'scanorganic', 'codexentry', 'disembark'
+})
+EVENT_REGEX = re.compile(rb'"event"\s*:\s*"([^"\\]*)"')
+
+
+class DecodedJournal(NamedTuple):
+    """
+    A journal file decoded from an offset. Each batch holds the file offset it ends at and the (offset after the line,
+    entry) pairs of the handled events. Lines which failed to decode are kept with their offsets for reporting.
+    """
+    offset: int
+    end: int
+    batches: list[tuple[int, list[tuple[int, Mapping[str, Any]]]]]
+    errors: list[tuple[int, bytes]]
+    skipped: Counter[str]
+    decode_time: float
+
+
+def decode_journal(journal: Path, offset: int = 0, batch_size: int = 500) -> DecodedJournal:
+    """
+    Decode the handled events of a journal file. The event name is read from the raw line first, so lines of
+    other events are skipped without decoding them.
+
+    :param journal: The journal file
+    :param offset: The file offset to start from, such as an import checkpoint
+    :param batch_size: Maximum number of entries per batch
+    :return: The decoded journal
+    """
+
+    start = perf_counter()
+    batches: list[tuple[int, list[tuple[int, Mapping[str, Any]]]]] = []
+    batch: list[tuple[int, Mapping[str, Any]]] = []
+    errors: list[tuple[int, bytes]] = []
+    skipped: Counter[str] = Counter()
+    end = offset
+    with open(journal, 'rb') as log:
+        log.seek(offset)
+        for line in log:
+            end += len(line)
+            match = EVENT_REGEX.search(line)
+            if match and match.group(1).decode(errors='replace').lower() not in JOURNAL_EVENTS:
+                skipped[match.group(1).decode(errors='replace')] += 1
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                errors.append((end, line))
+                continue
+            if entry.get('event', '').lower() not in JOURNAL_EVENTS:
+                skipped[entry.get('event', '')] += 1
+                continue
+            batch.append((end, entry))
+            if len(batch) >= batch_size:
+                batches.append((end, batch))
+                batch = []
+    if batch or end > (batches[-1][0] if batches else offset):
+        batches.append((end, batch))
+    return DecodedJournal(offset, end, batches, errors, skipped, perf_counter() - start)
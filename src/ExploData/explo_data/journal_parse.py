@@ -6,21 +6,23 @@
 import concurrent
 import json
 import re
+import sys
 import threading
 import tkinter as tk
-from concurrent.futures import Future
+from collections import Counter
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
 from datetime import datetime
-from os import listdir, cpu_count
+from os import DirEntry, cpu_count, scandir
+from itertools import islice
 from os.path import expanduser
 from pathlib import Path
-from time import sleep
+from time import monotonic, perf_counter
 from threading import Event
-from typing import Any, BinaryIO, Callable, Mapping, Optional
+from typing import Any, BinaryIO, Callable, Iterable, Iterator, Mapping, NamedTuple, Optional
 
-from sqlalchemy import select
-from sqlalchemy.exc import IntegrityError as AlcIntegrityError
+from sqlalchemy import Row, bindparam, delete, select, update
+from sqlalchemy.dialects.sqlite import insert
 from sqlalchemy.orm import Session
-from sqlite3 import IntegrityError
 
 from EDMCLogging import get_plugin_logger
 from config import config
@@ -28,8 +30,12 @@ from .RegionMap import findRegion
 
 from ExploData.explo_data import const
 from .bio_data.codex import parse_variant, set_codex
-from .db import System, Commander, Planet, JournalLog, get_session, SystemStatus, PlanetStatus
+from .db import System, Commander, Planet, JournalLog, JournalCheckpoint, JournalManifest, get_session, batch_session, \
+    SystemStatus, PlanetStatus, SystemSummary, JOURNAL_PENDING, JOURNAL_PARTIAL, JOURNAL_IMPORTED
+from .edsm_parse import prefetch_systems
+from .journal_decode import EVENT_REGEX, DecodedJournal, decode_journal
 from .body_data.struct import PlanetData, StarData, NonBodyData
+from .statements import COMMANDER_BY_NAME, SYSTEM_BY_NAME, PLANET_BY_BODY_ID
 
 JOURNAL_REGEX = re.compile(r'^Journal(Alpha|Beta)?\.[0-9]{2,4}-?[0-9]{2}-?[0-9]{2}T?[0-9]{2}[0-9]{2}[0-9]{2}'
                            r'\.[0-9]{2}\.log$')
@@ -37,6 +43,39 @@ JOURNAL1_REGEX = re.compile(r'^Journal(Alpha|Beta)?\.([0-9]{2})([0-9]{2})([0-9]{
                             r'\.([0-9]){2}\.log$')
 JOURNAL2_REGEX = re.compile(r'^Journal(Alpha|Beta)?\.([0-9]{4})-([0-9]{2})-([0-9]{2})T([0-9]{2})([0-9]{2})([0-9]{2})'
                             r'\.([0-9]{2})\.log$')
+JOURNAL_BATCH_SIZE: int = 500  # Journal lines written per batch transaction
+# Events which need queued scans to be written first, as they change location or depend on body data
+SCAN_FLUSH_EVENTS: set[str] = {
+    'loadgame', 'commander', 'newcommander', 'location', 'fsdjump', 'carrierjump', 'fssdiscoveryscan',
+    'fssbodysignals', 'saasignalsfound', 'fssallbodiesfound', 'saascancomplete', 'scanorganic', 'codexentry',
+    'disembark'
+}
+
+
+class ImportStats(NamedTuple):
+    """ Journal import metrics. Times are in seconds. """
+    files_done: int
+    files_total: int
+    bytes_done: int
+    bytes_total: int
+    events: int
+    events_per_second: float
+    elapsed: float
+    decode_time: float
+    process_time: float
+    commit_time: float
+    commits: int
+    max_commit_latency: float
+    lock_wait: float
+    event_counts: dict[str, int]
+    eta: Optional[float]
+
+
+class JournalFile(NamedTuple):
+    """ A journal file waiting to be imported, with its manifest status """
+    path: Path
+    size: int
+    status: int = JOURNAL_PENDING
 
 
 class This:
@@ -50,6 +89,24 @@ class This:
         self.journal_event: Optional[threading.Event] = None
         self.journal_progress: tuple[int, int] = (0, 0)
         self.journal_error: bool = False
+        self.route_prefetch: int = 0
+        self.decode_processes: int = 0
+
+        self.stats_lock = threading.Lock()
+        self.stats_log_interval: float = 0.0
+        self.stats_logged: float = 0.0
+        self.import_start: float = 0.0
+        self.bytes_done: int = 0
+        self.bytes_read: int = 0
+        self.bytes_total: int = 0
+        self.import_events: int = 0
+        self.decode_time: float = 0.0
+        self.process_time: float = 0.0
+        self.commit_time: float = 0.0
+        self.commits: int = 0
+        self.max_commit_latency: float = 0.0
+        self.lock_wait: float = 0.0
+        self.event_counts: Counter[str] = Counter()
 
         self.journal_processing_callbacks: dict[str, tk.Frame] = {}
         self.event_callbacks: dict[str, set[Callable]] = {}
@@ -63,63 +120,275 @@ class JournalParse:
     """
     This class is a general purpose container to process individual journal files. It's used both by the main
     EDMC journal parser hook and by the threaded journal import function, generally called by other plugins.
+    Live processors also warm the EDSM cache for the plotted route, which is skipped for historic journals.
+    Batch processors can coalesce repeated Scan events for a body, which are then written once per batch or when
+    the location changes. Coalescing relies on savepoints, so it's only used with batch sessions.
+    NavRoute lines in the journal files carry no route, which the game writes to NavRoute.json instead. Live
+    processors reading journal files are given the journal directory to load it from.
     """
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, live: bool = False, coalesce_scans: bool = False,
+                 route_dir: Optional[str] = None):
         self._session: Session = session
+        self._live: bool = live
+        self._route_dir: Optional[str] = route_dir
         self._cmdr: Optional[Commander] = None
         self._system: Optional[System] = None
-
-    def parse_journal(self, journal: Path, event: Event) -> int:
+        self._cmdr_name: Optional[str] = None
+        self._system_name: Optional[str] = None
+        self._route: list[str] = []
+        self._coalesce_scans: bool = coalesce_scans
+        self._pending_scans: dict[tuple[int, int], Mapping[str, Any]] = {}
+        self._pending_context: tuple[str, Optional[str]] = ('', None)
+        self._timestamp: str = ''
+        self._event_counts: Counter[str] = Counter()
+        self._decode_time: float = 0.0
+        self._process_time: float = 0.0
+
+    def parse_journal(self, journal: Path, event: Event, decoder: Optional[Executor] = None,
+                      status: Optional[int] = None) -> int:
         """
-        Function used to kick on a full journal import.
+        Function used to kick on a full journal import. Lines are written in batch transactions, and each batch also
+        stores a checkpoint of the file offset. An interrupted import resumes from the last checkpoint.
+        With a decoder, the file is decoded in a worker process and only the handled events are passed to the writer.
 
         :param journal: The journal file to parse
         :param event: The threaded Event used to interrupt the process
+        :param decoder: Optional process pool used to decode the journal
+        :param status: The manifest status of the journal. Without it, the journal log is checked instead.
         :return: Success or failure of the journal import
         """
         if event.is_set():
             return True
-        found = self._session.scalar(select(JournalLog).where(JournalLog.journal == journal.name))
-        failures = 0
-        if not found:
-            log: BinaryIO = open(journal, 'rb', 0)
-            for line in log:
-                retry = 2
-                while True:
-                    result = self.parse_entry(line)
-                    if result != 0:
-                        failures +=1
-                    if (failures >= 6 and retry == 0) or event.is_set():
-                        return 1
-                    if result == 0 or result == 2:
-                        break
-                    retry -= 1
-                    sleep(.1)
-        else:
-            self._session.expunge(found)
+        if status is None:
+            found = self._session.scalar(select(JournalLog).where(JournalLog.journal == journal.name))
+            if found:
+                self._session.expunge(found)
+                return 2
+            status = JOURNAL_PARTIAL
+        elif status == JOURNAL_IMPORTED:
             return 2
 
-        journal = JournalLog(journal=journal.name)
-        try:
-            self._session.add(journal)
-            self._session.commit()
-        except (IntegrityError, AlcIntegrityError):
-            self._session.expunge(journal)
+        offset = self.load_checkpoint(journal) if status == JOURNAL_PARTIAL else 0
+        record_import_bytes(offset)
+        if decoder:
+            try:
+                decoded: DecodedJournal = decoder.submit(decode_journal, journal, offset, JOURNAL_BATCH_SIZE).result()
+            except Exception as ex:
+                logger.warning(f'Journal decode process failed for {journal.name}, parsing in thread', exc_info=ex)
+            else:
+                for _, line in decoded.errors:
+                    logger.error(f'Journal JSON decode issue:\n{line!r}\n')
+                self._event_counts.update(decoded.skipped)
+                self._decode_time += decoded.decode_time
+                return self.write_batches(journal, offset, decoded.batches, event)
+
+        with open(journal, 'rb', 0) as log:
+            log.seek(offset)
+            return self.write_batches(journal, offset, read_batches(log, offset), event)
+
+    def write_batches(self, journal: Path, offset: int,
+                      batches: Iterable[tuple[int, list[tuple[int, bytes | Mapping[str, Any]]]]], event: Event) -> int:
+        """
+        Write journal batches, each in a batch transaction with a checkpoint. The journal is logged as parsed once all
+        batches are written.
+
+        :param journal: The journal file
+        :param offset: The file offset the batches start from
+        :param batches: Pairs of the offset each batch ends at and its (offset after the line, line or entry) items
+        :param event: The threaded Event used to interrupt the process
+        :return: Success or failure of the journal import
+        """
+
+        failures = 0
+        for batch_end, items in batches:
+            stopped = False
+            batch_start = offset
+            wait_start = perf_counter()
+            with batch_session() as session:
+                lock_wait = perf_counter() - wait_start
+                self.set_session(session)
+                for end, item in items:
+                    # Retries run at once: the batch holds the write lock, so waiting would only stall other writers
+                    for _ in range(3):
+                        result = self.parse_batch_entry(item)
+                        if result == 0 or result == 2:
+                            break
+                        failures += 1
+                        if failures >= 6 or event.is_set():
+                            break
+                    if failures >= 6:
+                        stopped = True
+                        break
+                    offset = end
+                    if event.is_set():
+                        stopped = True
+                        break
+                if not stopped:
+                    offset = batch_end
+                self.flush_scans()
+                self.save_checkpoint(journal, offset)
+                commit_start = perf_counter()
+            record_import_batch(offset - batch_start, lock_wait, perf_counter() - commit_start, *self.take_metrics())
+            if stopped:
+                return 1
+
+        self.log_journal(journal)
         return 0
 
-    def parse_entry(self, line: bytes) -> int:
+    def parse_lines(self, lines: Iterable[bytes | Mapping[str, Any]], journal: Optional[Path] = None,
+                    offset: int = 0) -> list[bytes | Mapping[str, Any]]:
+        """
+        Parse a set of journal lines in a single batch transaction
+
+        :param lines: The lines of the journal file, or their decoded entries
+        :param journal: Optional journal file the lines were read from, to store a checkpoint with the batch
+        :param offset: The journal file offset after the last line
+        :return: The lines which failed to parse, and were not written
+        """
+
+        failed: list[bytes | Mapping[str, Any]] = []
+        with batch_session() as session:
+            self.set_session(session)
+            for line in lines:
+                if self.parse_batch_entry(line) != 0:
+                    failed.append(line)
+            self.flush_scans()
+            if journal:
+                self.save_checkpoint(journal, offset)
+        return failed
+
+    def parse_batch_entry(self, line: bytes | Mapping[str, Any]) -> int:
+        """
+        Parse a single line within a batch transaction. The line is written in a savepoint, so a failure only
+        discards that line. Queued scans the line would write are written first, outside of its savepoint.
+        After a failure, the commander and system are reloaded, as the rollback may have detached them.
+
+        :param line: The line of the journal file, or its decoded entry
+        :return: The parse_entry result
+        """
+
+        if self._pending_scans:
+            if isinstance(line, Mapping):
+                self.flush_scans_before(line.get('event'))
+            else:
+                match = EVENT_REGEX.search(line)
+                self.flush_scans_before(match.group(1).decode(errors='replace') if match else None)
+        savepoint = self._session.begin_nested()
+        result = self.parse_entry(line)
+        if savepoint.is_active:
+            if result == 0:
+                savepoint.commit()
+            else:
+                savepoint.rollback()
+        if result != 0:
+            self.reload_context()
+        return result
+
+    def log_journal(self, journal: Path) -> None:
+        """
+        Record a journal file as fully parsed, so it's skipped by future imports. Its checkpoint is removed.
+
+        :param journal: The journal file
+        """
+
+        with batch_session() as session:
+            session.execute(delete(JournalCheckpoint).where(JournalCheckpoint.journal == journal.name))
+            session.execute(insert(JournalLog).values(journal=journal.name).on_conflict_do_nothing())
+            session.execute(update(JournalManifest).where(JournalManifest.journal == journal.name)
+                            .values(status=JOURNAL_IMPORTED))
+
+    def load_checkpoint(self, journal: Path) -> int:
+        """
+        Load the checkpoint of a partially imported journal. The commander and system active at the checkpoint are
+        restored, as the events which set them were already processed.
+
+        :param journal: The journal file
+        :return: The file offset to resume from
+        """
+
+        checkpoint = self._session.get(JournalCheckpoint, journal.name)
+        if not checkpoint:
+            return 0
+        self._cmdr_name = checkpoint.commander
+        self._system_name = checkpoint.system
+        self._timestamp = checkpoint.timestamp
+        offset = checkpoint.offset
+        self._session.expunge(checkpoint)
+        self.reload_context()
+        return offset
+
+    def save_checkpoint(self, journal: Path, offset: int) -> None:
+        """
+        Store the import progress of a journal file in the active transaction
+
+        :param journal: The journal file
+        :param offset: The file offset after the last processed line
+        """
+
+        values = {
+            'offset': offset,
+            'timestamp': self._timestamp,
+            'commander': self._cmdr_name,
+            'system': self._system_name,
+        }
+        self._session.execute(insert(JournalCheckpoint).values(journal=journal.name, **values)
+                              .on_conflict_do_update(index_elements=['journal'], set_=values))
+        self._session.execute(update(JournalManifest).where(JournalManifest.journal == journal.name)
+                              .where(JournalManifest.status == JOURNAL_PENDING).values(status=JOURNAL_PARTIAL))
+
+    def reload_context(self) -> None:
+        """
+        Load the active commander and system again by name, such as after a rolled back line left them detached or
+        discarded rows they were created with.
+        """
+
+        self._cmdr = self._session.scalar(COMMANDER_BY_NAME, {'name': self._cmdr_name}) if self._cmdr_name else None
+        self._system = self._session.scalar(SYSTEM_BY_NAME, {'name': self._system_name}) if self._system_name else None
+
+    def take_metrics(self) -> tuple[Counter[str], float, float]:
+        """
+        Collect and reset the parse metrics gathered since the last call
+
+        :return: Tuple of the parsed event counts by type, JSON decode time, and processing time
+        """
+
+        metrics = (self._event_counts, self._decode_time, self._process_time)
+        self._event_counts = Counter()
+        self._decode_time = 0.0
+        self._process_time = 0.0
+        return metrics
+
+    def set_session(self, session: Session) -> None:
+        """
+        Swap the active Session, such as for each batch transaction. The current commander and system are carried over.
+
+        :param session: The new Session
+        """
+
+        self._session = session
+        if self._cmdr:
+            self._cmdr = session.merge(self._cmdr)
+        if self._system:
+            self._system = session.merge(self._system)
+
+    def parse_entry(self, line: bytes | Mapping[str, Any]) -> int:
         """
         Parse a single line of a journal file. Load as JSON and pass to the processor.
 
-        :param line: The line of the journal file
+        :param line: The line of the journal file, or an entry already decoded by the decode stage
         :returns: False if an Exception occurs, otherwise true
         """
         if line is None:
             return False
 
         try:
-            entry: Mapping[str, Any] = json.loads(line)
+            start = perf_counter()
+            entry: Mapping[str, Any] = line if isinstance(line, Mapping) else json.loads(line)
+            decoded = perf_counter()
+            self._decode_time += decoded - start
+            self._event_counts[entry.get('event', '')] += 1
             self.process_entry(entry)
+            self._process_time += perf_counter() - decoded
         except json.JSONDecodeError as ex:
             logger.error(f'Journal JSON decode issue:\n{line!r}\n', exc_info=ex)
             return 2
@@ -135,6 +404,9 @@ class JournalParse:
         :param entry: JSON object of the current journal line
         """
         event_type = entry['event'].lower()
+        self._timestamp = entry.get('timestamp', self._timestamp)
+        if self._pending_scans and event_type in SCAN_FLUSH_EVENTS:
+            self.flush_scans()
         match event_type:
             case 'loadgame':
                 self._session.close()
@@ -145,21 +417,28 @@ class JournalParse:
             case 'location' | 'fsdjump' | 'carrierjump':
                 self._session.close()
                 self.set_system(entry['StarSystem'], entry.get('StarPos', None))
+                self.prefetch_route(entry['StarSystem'])
+            case 'navroute':
+                route = entry.get('Route')
+                if route is None and self._route_dir and self._live and this.route_prefetch > 0:
+                    route = load_nav_route(self._route_dir)
+                if route is not None:
+                    self._route = [hop['StarSystem'] for hop in route]
+                    self.prefetch_route(self._route[0] if self._route else '')
+            case 'navrouteclear':
+                self._route = []
+            case 'fsdtarget':
+                if self._live and this.route_prefetch > 0:
+                    prefetch_systems([entry['Name']])
             case 'scan':
                 if not self._system:
                     return
                 self._system = self._session.merge(self._system)
                 self._cmdr = self._session.merge(self._cmdr) if self._cmdr else None
-                if 'StarType' in entry:
-                    self.add_star(entry)
-                elif 'PlanetClass' in entry and entry['PlanetClass']:
-                    self.add_planet(entry)
+                if self._coalesce_scans and 'SystemAddress' in entry:
+                    self.queue_scan(entry)
                 else:
-                    non_body = NonBodyData.from_journal(self._system, self.get_body_name(entry['BodyName']),
-                                                        entry['BodyID'], self._session)
-                    if self._cmdr:
-                        non_body.set_discovered(True, self._cmdr.id).set_was_discovered(entry['WasDiscovered'],
-                                                                                        self._cmdr.id)
+                    self.add_body_scan(entry)
 
             case 'fssdiscoveryscan':
                 if not self._system or not self._cmdr:
@@ -203,12 +482,12 @@ class JournalParse:
                 body.set_mapped(True, self._cmdr.id)\
                     .set_efficient(target >= used, self._cmdr.id)
                 if self.get_system_status().fully_scanned:
-                    count = 0
-                    for planet in self._system.planets:
-                        planet_status = self.get_planet_status(planet)
-                        if planet_status.mapped:
-                            count += 1
-                    if len(self._system.planets) == count:
+                    summary = self._session.execute(
+                        select(SystemSummary.planets_mapped, SystemSummary.planet_count)
+                        .where(SystemSummary.system_id == self._system.id)
+                        .where(SystemSummary.commander_id == self._cmdr.id)
+                    ).first()
+                    if summary and summary.planets_mapped >= summary.planet_count:
                         self.get_system_status().fully_mapped = True
                 self._session.commit()
             case 'scanorganic':
@@ -223,8 +502,8 @@ class JournalParse:
                         return
                     self._system = self._session.merge(self._system)
                     self._cmdr = self._session.merge(self._cmdr) if self._cmdr else None
-                    planet: Planet = self._session.scalar(select(Planet).where(Planet.system_id == self._system.id)
-                                                          .where(Planet.body_id == entry['BodyID']))
+                    planet: Planet = self._session.scalar(PLANET_BY_BODY_ID, {'system_id': self._system.id,
+                                                                              'body_id': entry['BodyID']})
                     if not planet:
                         return
 
@@ -238,15 +517,15 @@ class JournalParse:
                             target_body.add_flora(genus, species, color)
 
                     if self._cmdr and self._system:
-                        set_codex(self._cmdr.id, entry['Name'], self._system.region)
+                        set_codex(self._cmdr.id, entry['Name'], self._system.region, self._session)
             case 'disembark':
                 if entry.get('OnPlanet', False):
                     if not self._system or not self._cmdr:
                         return
                     self._system = self._session.merge(self._system)
                     self._cmdr = self._session.merge(self._cmdr)
-                    planet: Planet = self._session.scalar(select(Planet).where(Planet.system_id == self._system.id)
-                                                          .where(Planet.body_id == entry['BodyID']))
+                    planet: Planet = self._session.scalar(PLANET_BY_BODY_ID, {'system_id': self._system.id,
+                                                                              'body_id': entry['BodyID']})
 
                     if not planet:
                         return
@@ -256,6 +535,83 @@ class JournalParse:
                     if self._cmdr:
                         target_body.set_footfall(True, self._cmdr.id)
 
+    def add_body_scan(self, entry: Mapping[str, Any]) -> None:
+        """
+        Add star, planet, or ring and belt data from a Scan event
+
+        :param entry: The journal event dict (must be a Scan event)
+        """
+
+        if 'StarType' in entry:
+            self.add_star(entry)
+        elif 'PlanetClass' in entry and entry['PlanetClass']:
+            self.add_planet(entry)
+        else:
+            non_body = NonBodyData.from_journal(self._system, self.get_body_name(entry['BodyName']),
+                                                entry['BodyID'], self._session)
+            if self._cmdr:
+                non_body.set_discovered(True, self._cmdr.id).set_was_discovered(entry['WasDiscovered'],
+                                                                                self._cmdr.id)
+
+    def queue_scan(self, entry: Mapping[str, Any]) -> None:
+        """
+        Queue a Scan event, merging it with earlier scans of the same body. Attributes of the latest scan win,
+        while the most detailed scan type is kept.
+
+        :param entry: The journal event dict (must be a Scan event)
+        """
+
+        context = (self._system.name, self._cmdr.name if self._cmdr else None)
+        if self._pending_scans and context != self._pending_context:
+            self.flush_scans()
+        self._pending_context = context
+
+        key = (entry['SystemAddress'], entry['BodyID'])
+        previous = self._pending_scans.get(key)
+        if previous:
+            merged = {**previous, **entry}
+            previous_type = previous.get('ScanType', parse_old_scan_type(previous))
+            if get_scan_type(previous_type) > get_scan_type(entry.get('ScanType', parse_old_scan_type(entry))):
+                merged['ScanType'] = previous_type
+            entry = merged
+        self._pending_scans[key] = entry
+
+    def flush_scans(self) -> None:
+        """
+        Write queued Scan events. Each body is written in its own savepoint, so a failure only discards that body.
+        """
+
+        pending = self._pending_scans
+        self._pending_scans = {}
+        for entry in pending.values():
+            savepoint = self._session.begin_nested()
+            try:
+                self._system = self._session.merge(self._system)
+                self._cmdr = self._session.merge(self._cmdr) if self._cmdr else None
+                self.add_body_scan(entry)
+                if savepoint.is_active:
+                    savepoint.commit()
+            except Exception as ex:
+                logger.error(f'Journal scan write failed for {entry.get("BodyName")}', exc_info=ex)
+                if savepoint.is_active:
+                    savepoint.rollback()
+
+    def flush_scans_before(self, event_type: Optional[str],
+                           context: Optional[tuple[str, Optional[str]]] = None) -> None:
+        """
+        Write queued Scan events ahead of an event which would write them. Called before opening the event's
+        savepoint, so the scans aren't discarded if the event fails.
+
+        :param event_type: The event name, or None if it's unknown
+        :param context: Optional (system, commander) names the event is applied with
+        """
+
+        if not self._pending_scans:
+            return
+        if (event_type is None or event_type.lower() in SCAN_FLUSH_EVENTS
+                or (context is not None and context != self._pending_context)):
+            self.flush_scans()
+
     def get_body_name(self, fullname: str) -> str:
         """
         Remove the base system name from the body name if the body has a unique identifier.
@@ -271,14 +627,32 @@ class JournalParse:
             body_name = fullname
         return body_name
 
+    def prefetch_route(self, current_system: str) -> None:
+        """
+        Queue low priority EDSM fetches for the next systems on the plotted route
+
+        :param current_system: The name of the system the commander is in
+        """
+
+        if not self._live or this.route_prefetch <= 0 or not self._route:
+            return
+        try:
+            start = self._route.index(current_system) + 1
+        except ValueError:
+            start = 0
+        prefetch_systems(self._route[start:start + this.route_prefetch])
+
     def set_cmdr(self, name: str) -> None:
         """
         Submit or create a Commander entry and save it to the local journal processor
         """
+        if self._pending_scans and name != self._pending_context[1]:
+            self.flush_scans()
         self._session.commit()
         self._session.close()
 
-        self._cmdr = self._session.scalar(select(Commander).where(Commander.name == name))
+        self._cmdr = self._session.scalar(COMMANDER_BY_NAME, {'name': name})
+        self._cmdr_name = name
 
         if not self._cmdr:
             self._cmdr = Commander(name=name)
@@ -291,7 +665,10 @@ class JournalParse:
         """
         if not address:
             return
-        self._system = self._session.scalar(select(System).where(System.name == name))
+        if self._pending_scans and name != self._pending_context[0]:
+            self.flush_scans()
+        self._system = self._session.scalar(SYSTEM_BY_NAME, {'name': name})
+        self._system_name = name
         if not self._system:
             self._system = System(name=name)
             self._session.add(self._system)
@@ -435,8 +812,7 @@ class JournalParse:
 
         :param entry: The journal event dict. Must be a ScanOrganic event.
         """
-        planet = self._session.scalar(select(Planet).where(Planet.system_id == self._system.id)
-                                      .where(Planet.body_id == entry['Body']))
+        planet = self._session.scalar(PLANET_BY_BODY_ID, {'system_id': self._system.id, 'body_id': entry['Body']})
         if not planet:
             return
 
@@ -480,14 +856,34 @@ def parse_old_scan_type(entry: Mapping[str, any]) -> str:
         return 'Basic'
 
 
-def parse_journal(journal: Path, event: Event) -> int:
+def read_batches(log: BinaryIO, offset: int) -> Iterator[tuple[int, list[tuple[int, bytes]]]]:
+    """
+    Read a journal file in batches of lines, in the form taken by JournalParse.write_batches
+
+    :param log: The journal file, positioned at the offset
+    :param offset: The file offset to start from
+    :return: Pairs of the offset each batch ends at and its (offset after the line, line) items
+    """
+
+    while lines := list(islice(log, JOURNAL_BATCH_SIZE)):
+        items = []
+        for line in lines:
+            offset += len(line)
+            items.append((offset, line))
+        yield offset, items
+
+
+def parse_journal(journal: Path, event: Event, decoder: Optional[Executor] = None,
+                  status: Optional[int] = None) -> int:
     """
     Kickoff function for importing a journal file. Builds a new JournalParse object and begins parsing.
 
     :param journal: Path object pointing to the journal file
     :param event: Threaded event used to cancel the journal parsing process
+    :param decoder: Optional process pool used to decode the journal
+    :param status: Optional manifest status of the journal, which saves looking it up
     """
-    return JournalParse(get_session()).parse_journal(journal, event)
+    return JournalParse(get_session(), coalesce_scans=True).parse_journal(journal, event, decoder, status)
 
 
 def parse_journals() -> None:
@@ -506,11 +902,39 @@ def parse_journals() -> None:
             this.journal_event.set()
 
 
-def journal_sort(journal: Path) -> datetime:
+def load_nav_route(journal_dir: str) -> Optional[list[Mapping[str, Any]]]:
+    """
+    Read the plotted route from NavRoute.json, which the game writes alongside the journal files
+
+    :param journal_dir: The journal directory
+    :return: The route hops, or None if the file is missing or can't be read
+    """
+
+    try:
+        with open(Path(journal_dir) / 'NavRoute.json', 'rb') as route_file:
+            return json.load(route_file).get('Route')
+    except (OSError, ValueError, AttributeError) as ex:
+        logger.debug('NavRoute.json could not be read', exc_info=ex)
+        return None
+
+
+def get_journal_dir() -> str:
+    """
+    Get the configured EDMC journal directory
+
+    :return: The expanded journal directory path, or an empty string if none is set
+    """
+
+    journal_dir = config.get_str('journaldir')
+    journal_dir = journal_dir if journal_dir else config.default_journal_dir
+    return expanduser(journal_dir)
+
+
+def journal_sort(journal: Path | DirEntry) -> datetime:
     """
     Sort journals by parsing the name
 
-    :param journal:  Journal Path object
+    :param journal:  Journal Path object, or a directory entry from scandir
     :return: datetime for the parsed journal date
     """
 
@@ -527,16 +951,145 @@ def journal_sort(journal: Path) -> datetime:
     return datetime.fromtimestamp(journal.stat().st_ctime)
 
 
+def refresh_manifest(journal_dir: str) -> list[JournalFile]:
+    """
+    Refresh the journal manifest from a single scan of the journal directory. Only new or changed files are parsed
+    for their timestamp and written; files which are gone are removed. New files take their status from the journal
+    log and checkpoints, so a manifest built for an existing database doesn't import everything again.
+
+    :param journal_dir: The journal directory
+    :return: The journals which still need importing, in import order
+    """
+
+    session = get_session()
+    manifest: dict[str, Row] = {row.journal: row for row in session.execute(
+        select(JournalManifest.journal, JournalManifest.size, JournalManifest.mtime, JournalManifest.timestamp,
+               JournalManifest.status)
+    )}
+    changed: list[dict[str, Any]] = []
+    found: set[str] = set()
+    with scandir(journal_dir) as entries:
+        for entry in entries:
+            if not JOURNAL_REGEX.search(entry.name) or not entry.is_file():
+                continue
+            found.add(entry.name)
+            stat = entry.stat()
+            row = manifest.get(entry.name)
+            if row and row.size == stat.st_size and row.mtime == stat.st_mtime:
+                continue
+            timestamp = row.timestamp if row else journal_sort(entry).strftime('%Y-%m-%dT%H:%M:%S.%f')
+            changed.append({'journal': entry.name, 'size': stat.st_size, 'mtime': stat.st_mtime,
+                            'timestamp': timestamp, 'status': row.status if row else JOURNAL_PENDING})
+
+    if any(values['journal'] not in manifest for values in changed):
+        logged = set(session.scalars(select(JournalLog.journal)))
+        partial = set(session.scalars(select(JournalCheckpoint.journal)))
+        for values in changed:
+            if values['journal'] not in manifest:
+                values['status'] = JOURNAL_IMPORTED if values['journal'] in logged else \
+                    JOURNAL_PARTIAL if values['journal'] in partial else JOURNAL_PENDING
+    session.close()
+
+    removed = manifest.keys() - found
+    if changed or removed:
+        with batch_session() as session:
+            if changed:
+                statement = insert(JournalManifest)
+                session.execute(statement.on_conflict_do_update(index_elements=['journal'], set_={
+                    'size': statement.excluded.size, 'mtime': statement.excluded.mtime
+                }), changed)
+            if removed:
+                table = JournalManifest.__table__
+                session.connection().execute(delete(table).where(table.c.journal == bindparam('name')),
+                                             [{'name': name} for name in removed])
+
+    pending = {name: (row.timestamp, row.size, row.status) for name, row in manifest.items()
+               if name in found and row.status != JOURNAL_IMPORTED}
+    for values in changed:
+        pending.pop(values['journal'], None)
+        if values['status'] != JOURNAL_IMPORTED:
+            pending[values['journal']] = (values['timestamp'], values['size'], values['status'])
+    return [JournalFile(Path(journal_dir) / name, size, status)
+            for name, (_, size, status) in sorted(pending.items(), key=lambda item: (item[1][0], item[0]))]
+
+
+def reset_import_stats(bytes_total: int) -> None:
+    """
+    Reset the import metrics for a new journal import
+
+    :param bytes_total: The total size of the journals to import
+    """
+
+    with this.stats_lock:
+        this.import_start = this.stats_logged = monotonic()
+        this.bytes_done = this.bytes_read = this.import_events = this.commits = 0
+        this.bytes_total = bytes_total
+        this.decode_time = this.process_time = this.commit_time = this.max_commit_latency = this.lock_wait = 0.0
+        this.event_counts = Counter()
+
+
+def record_import_bytes(size: int) -> None:
+    """
+    Count journal bytes which were imported previously, such as the part of a journal before its checkpoint
+
+    :param size: The number of bytes
+    """
+
+    with this.stats_lock:
+        this.bytes_done += size
+
+
+def record_import_batch(size: int, lock_wait: float, commit_latency: float, event_counts: Counter[str],
+                        decode_time: float, process_time: float) -> None:
+    """
+    Add the metrics of a committed import batch, and log the import stats if the log interval has passed
+
+    :param size: The number of bytes read
+    :param lock_wait: Time spent waiting for the database write lock
+    :param commit_latency: Time spent committing the batch
+    :param event_counts: Parsed event counts by type
+    :param decode_time: Time spent decoding JSON
+    :param process_time: Time spent processing events
+    """
+
+    with this.stats_lock:
+        this.bytes_done += size
+        this.bytes_read += size
+        this.import_events += event_counts.total()
+        this.event_counts.update(event_counts)
+        this.decode_time += decode_time
+        this.process_time += process_time
+        this.lock_wait += lock_wait
+        this.commit_time += commit_latency
+        this.commits += 1
+        this.max_commit_latency = max(this.max_commit_latency, commit_latency)
+        log_stats = this.stats_log_interval and monotonic() - this.stats_logged >= this.stats_log_interval
+        if log_stats:
+            this.stats_logged = monotonic()
+    if log_stats:
+        log_import_stats()
+
+
+def log_import_stats() -> None:
+    """
+    Write a summary of the journal import metrics to the log
+    """
+
+    stats = get_import_stats()
+    eta = f'{stats.eta:.0f}s' if stats.eta is not None else 'unknown'
+    logger.info(f'Journal import: {stats.bytes_done}/{stats.bytes_total} bytes, {stats.events} events '
+                f'({stats.events_per_second:.0f}/s), decode {stats.decode_time:.1f}s, '
+                f'process {stats.process_time:.1f}s, commit {stats.commit_time:.1f}s over {stats.commits} batches '
+                f'(max {stats.max_commit_latency:.3f}s), lock wait {stats.lock_wait:.1f}s, ETA {eta}')
+
+
 def journal_worker() -> None:
     """
     Main thread to handle journal importing / processing. Creates up to four additional threads to process each journal
     file and commit to the database. Fires events to update the main TKinter display with the current state.
     """
 
-    journal_dir = config.get_str('journaldir')
-    journal_dir = journal_dir if journal_dir else config.default_journal_dir
-
-    journal_dir = expanduser(journal_dir)
+    journal_dir = get_journal_dir()
 
     if journal_dir == '':
         return
@@ -546,17 +1099,25 @@ def journal_worker() -> None:
     this.journal_progress = (0, 0)
     fire_start_event()
 
+    decoder: Optional[Executor] = None
     try:
-        journal_files: list[Path] = [Path(journal_dir) / str(x) for x in listdir(journal_dir) if
-                                     JOURNAL_REGEX.search(x)]
+        journal_files = refresh_manifest(journal_dir)
+        reset_import_stats(sum(journal.size for journal in journal_files))
 
         if journal_files:
-            journal_files = sorted(journal_files, key=journal_sort)
             count = 0
             this.journal_event = threading.Event()
+            if this.decode_processes and getattr(sys, 'frozen', False):
+                # Without freeze_support, a spawned worker starts another copy of EDMC instead of the decode stage
+                logger.warning('Journal decode processes are unavailable in a frozen EDMC build, '
+                               'decoding in the import threads')
+            elif this.decode_processes:
+                decoder = ProcessPoolExecutor(max_workers=this.decode_processes)
             with concurrent.futures.ThreadPoolExecutor(max_workers=min([cpu_count(), 4])) as executor:
-                future_journal: dict[Future, Path] = {executor.submit(parse_journal, journal, this.journal_event):
-                                                      journal for journal in journal_files}
+                future_journal: dict[Future, JournalFile] = {executor.submit(parse_journal, journal.path,
+                                                                             this.journal_event, decoder,
+                                                                             journal.status): journal
+                                                             for journal in journal_files}
                 skipped = 0
                 for future in concurrent.futures.as_completed(future_journal):
                     count += 1
@@ -569,12 +1130,20 @@ def journal_worker() -> None:
                         executor.shutdown(wait=True, cancel_futures=True)
                         break
                     elif future.result() == 2:
+                        # Already logged, count it as done so the progress and ETA reach the total
+                        record_import_bytes(future_journal[future].size)
                         skipped += 1
                     this.journal_progress = (count - skipped, len(journal_files) - skipped)
 
     except Exception as ex:
         logger.error('Journal parsing failed', exc_info=ex)
 
+    if decoder:
+        decoder.shutdown(cancel_futures=True)
+
+    if this.stats_log_interval:
+        log_import_stats()
+
     this.parsing_journals = False
     this.journal_stop = False
     this.journal_event = None
@@ -667,6 +1236,29 @@ def shutdown() -> None:
             this.journal_event.set()
 
 
+def set_route_prefetch(count: int) -> None:
+    """
+    Set how many upcoming systems of the plotted route are prefetched from EDSM by the live journal processor.
+    Disabled (0) by default, so no EDSM requests are made unless a plugin opts in.
+
+    :param count: The number of route systems to prefetch
+    """
+
+    this.route_prefetch = max(0, count)
+
+
+def set_decode_processes(count: int) -> None:
+    """
+    Set how many worker processes decode journal files during imports. The decoded events are written by the import
+    threads as usual. Disabled (0) by default. Frozen EDMC builds never start the processes, as a spawned worker
+    would launch another copy of EDMC, and a failed decode falls back to parsing the journal in the import thread.
+
+    :param count: The number of decode processes
+    """
+
+    this.decode_processes = max(0, count)
+
+
 def has_error() -> bool:
     """
     Helper function to access local data about the journal import error status.
@@ -675,6 +1267,34 @@ def has_error() -> bool:
     return this.journal_error
 
 
+def set_stats_log_interval(seconds: float) -> None:
+    """
+    Periodically log the journal import metrics while importing. Disabled (0) by default.
+
+    :param seconds: Minimum seconds between log lines, or 0 to disable
+    """
+
+    this.stats_log_interval = max(0.0, seconds)
+
+
+def get_import_stats() -> ImportStats:
+    """
+    Helper function to access the journal import metrics. The ETA is estimated from the byte rate of the current
+    import, and is None until the first batch is committed.
+    """
+
+    with this.stats_lock:
+        elapsed = monotonic() - this.import_start if this.import_start else 0.0
+        eta = None
+        if this.bytes_read and elapsed:
+            eta = max(0, this.bytes_total - this.bytes_done) / (this.bytes_read / elapsed)
+        files_done, files_total = this.journal_progress
+        return ImportStats(files_done, files_total, this.bytes_done, this.bytes_total, this.import_events,
+                           this.import_events / elapsed if elapsed else 0.0, elapsed, this.decode_time,
+                           this.process_time, this.commit_time, this.commits, this.max_commit_latency,
+                           this.lock_wait, dict(this.event_counts), eta)
+
+
 def get_progress() -> tuple[int, int]:
     """
     Helper function to access local data about the journal import progress.
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+# ExploData module plugin for EDMC
+# Source: https://github.com/Silarn/EDMC-ExploData
+# Licensed under the [GNU Public License (GPL)](http://www.gnu.org/licenses/gpl-2.0.html) version 2 or later.
+
+import gzip
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from time import monotonic
+from typing import Any, Iterator, Mapping, NamedTuple, Optional, TextIO
+
+from EDMCLogging import get_plugin_logger
+from config import config
+
+from ExploData.explo_data import const
+
+RECORDING_FORMAT: str = 'explodata-recording'
+RECORDING_VERSION: int = 1
+
+
+class RecordedEvent(NamedTuple):
+    """ A journal hook call. The offset is in seconds since the recording started. """
+    offset: float
+    cmdr: str
+    system: str
+    star_pos: Optional[list[float]]
+    entry: Mapping[str, Any]
+
+
+class This:
+    """Holds globals."""
+
+    def __init__(self):
+        self.recording: Optional[TextIO] = None
+        self.path: Optional[Path] = None
+        self.started: float = 0.0
+        self.count: int = 0
+
+
+this = This()
+logger = get_plugin_logger(const.plugin_name)
+
+
+def start_recording(path: Optional[Path] = None) -> Path:
+    """
+    Record every call of the EDMC journal hook, so the session can be replayed outside EDMC with the same event
+    order, timing, and EDMC state. Recordings are gzipped JSON lines.
+
+    :param path: Optional recording file. Defaults to a timestamped file in the EDMC data directory.
+    :return: The recording file path
+    """
+
+    stop_recording()
+    now = datetime.now(timezone.utc)
+    if not path:
+        path = config.app_dir_path / 'explodata_recordings' / f'session-{now.strftime("%Y%m%dT%H%M%S")}.jsonl.gz'
+    path.parent.mkdir(parents=True, exist_ok=True)
+    this.recording = gzip.open(path, 'wt', encoding='utf-8')
+    this.recording.write(json.dumps({'format': RECORDING_FORMAT, 'version': RECORDING_VERSION,
+                                     'plugin_version': const.plugin_version, 'started': now.isoformat()}) + '\n')
+    this.path = path
+    this.started = monotonic()
+    this.count = 0
+    logger.info(f'Recording journal events to {path}')
+    return path
+
+
+def record(cmdr: str, system: str, star_pos: Optional[list[float]], entry: Mapping[str, Any]) -> None:
+    """
+    Write a journal hook call to the active recording
+
+    :param cmdr: The commander name
+    :param system: The system name
+    :param star_pos: The EDMC state StarPos
+    :param entry: The journal entry
+    """
+
+    try:
+        this.recording.write(json.dumps([round(monotonic() - this.started, 6), cmdr, system,
+                                         list(star_pos) if star_pos else None, entry],
+                                        separators=(',', ':')) + '\n')
+        this.count += 1
+    except Exception as ex:
+        logger.error('Journal recording failed, recording stopped', exc_info=ex)
+        stop_recording()
+
+
+def stop_recording() -> Optional[Path]:
+    """
+    Finish the active recording
+
+    :return: The recording file path, or None if nothing was being recorded
+    """
+
+    if not this.recording:
+        return None
+    path = this.path
+    try:
+        this.recording.close()
+    except OSError as ex:
+        logger.error('Failed to close journal recording', exc_info=ex)
+    this.recording = None
+    this.path = None
+    logger.info(f'Recorded {this.count} journal events to {path}')
+    return path
+
+
+def read_recording(path: Path) -> Iterator[RecordedEvent]:
+    """
+    Read the events of a recording
+
+    :param path: The recording file
+    :return: Iterator of the recorded hook calls, in order
+    """
+
+    with gzip.open(path, 'rt', encoding='utf-8') as recording:
+        header = json.loads(recording.readline())
+        if header.get('format') != RECORDING_FORMAT or header.get('version') != RECORDING_VERSION:
+            raise ValueError(f'{path} is not a supported ExploData recording')
+        for line in recording:
+            yield RecordedEvent(*json.loads(line))
+
+
+def is_recording() -> bool:
+    return this.recording is not None
+
+
+def shutdown() -> None:
+    """
+    Journal recorder shutdown handler. Finish the active recording.
+    """
+
+    stop_recording()
@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+# ExploData module plugin for EDMC
+# Source: https://github.com/Silarn/EDMC-ExploData
+# Licensed under the [GNU Public License (GPL)](http://www.gnu.org/licenses/gpl-2.0.html) version 2 or later.
+
+import json
+import threading
+from os import scandir
+from pathlib import Path
+from time import monotonic
+from typing import Any, Mapping, Optional
+
+from EDMCLogging import get_plugin_logger
+
+from ExploData.explo_data import const
+from .db import get_session
+from .journal_parse import JOURNAL_REGEX, JOURNAL_BATCH_SIZE, JournalParse, get_journal_dir, journal_sort
+from .journal_writer import dispatch_events
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+
+POLL_INTERVAL: float = 1.0  # Seconds between file checks when no change notification arrives
+BATCH_DELAY: float = 0.25  # Seconds to wait after a change, so bursts of events share a transaction
+RESCAN_INTERVAL: float = 10.0  # Seconds between journal directory scans while polling
+
+
+class This:
+    """Holds globals."""
+
+    def __init__(self):
+        self.tail_thread: Optional[threading.Thread] = None
+        self.tail_stop: threading.Event = threading.Event()
+        self.tail_wake: threading.Event = threading.Event()
+        self.tail_rescan: bool = True
+        self.observer: Optional[Observer] = None
+        self.journal: Optional[Path] = None
+        self.offset: int = 0
+
+
+this = This()
+logger = get_plugin_logger(const.plugin_name)
+
+
+class JournalChangeHandler(FileSystemEventHandler):
+    """ File watch handler which wakes the tail thread when a journal file is written or created """
+
+    def on_created(self, event) -> None:
+        if JOURNAL_REGEX.search(Path(event.src_path).name):
+            this.tail_rescan = True
+            this.tail_wake.set()
+
+    def on_modified(self, event) -> None:
+        if JOURNAL_REGEX.search(Path(event.src_path).name):
+            this.tail_wake.set()
+
+
+def find_latest_journal(journal_dir: str) -> Optional[Path]:
+    """
+    Find the newest journal file in the journal directory
+
+    :param journal_dir: The journal directory
+    :return: Path of the newest journal, or None if there are none
+    """
+
+    with scandir(journal_dir) as entries:
+        journals = [Path(entry.path) for entry in entries if entry.is_file() and JOURNAL_REGEX.search(entry.name)]
+    return max(journals, key=journal_sort) if journals else None
+
+
+def read_lines(journal: Path, offset: int, limit: int = JOURNAL_BATCH_SIZE) -> tuple[list[bytes], int]:
+    """
+    Read complete lines from a journal file. A partially written last line is left for the next read.
+
+    :param journal: The journal file
+    :param offset: The byte offset to read from
+    :param limit: The maximum number of lines to read
+    :return: Tuple of the lines read and the offset after the last complete line
+    """
+
+    lines: list[bytes] = []
+    with open(journal, 'rb') as log:
+        log.seek(offset)
+        for line in log:
+            if not line.endswith(b'\n'):
+                break
+            lines.append(line)
+            offset += len(line)
+            if len(lines) >= limit:
+                break
+    return lines, offset
+
+
+def start_tail(journal_dir: Optional[str] = None) -> bool:
+    """
+    Start following the active journal file on a background thread. New lines are written in batch transactions,
+    and the EDMC journal hook only wakes the tail instead of writing to the database. Event callbacks fire from the
+    tail once each batch is committed.
+    Change notifications use watchdog when available, with a polling fallback.
+
+    :param journal_dir: Optional journal directory. Defaults to the EDMC journal directory.
+    :return: False if the tail is already running or there is no journal directory
+    """
+
+    if is_tailing():
+        return False
+    journal_dir = journal_dir or get_journal_dir()
+    if not journal_dir:
+        return False
+
+    this.tail_stop.clear()
+    this.tail_rescan = True
+    if Observer:
+        try:
+            this.observer = Observer()
+            this.observer.schedule(JournalChangeHandler(), journal_dir, recursive=False)
+            this.observer.daemon = True
+            this.observer.start()
+        except Exception as ex:
+            logger.warning('Journal file watch unavailable, polling instead', exc_info=ex)
+            this.observer = None
+    this.tail_thread = threading.Thread(target=tail_worker, name='Journal tail worker', args=(journal_dir,))
+    this.tail_thread.daemon = True
+    this.tail_thread.start()
+    return True
+
+
+def tail_worker(journal_dir: str) -> None:
+    """
+    Main journal tail thread. Follows the newest journal file and switches to new journal files as the game
+    creates them. A finished journal is recorded as parsed, so it's skipped by the journal import.
+    Each batch stores a checkpoint, so a restarted tail resumes from the last written line.
+
+    :param journal_dir: The journal directory
+    """
+
+    processor = JournalParse(get_session(), live=True, coalesce_scans=True, route_dir=journal_dir)
+    last_scan = 0.0
+    while not this.tail_stop.is_set():
+        try:
+            if this.tail_rescan or this.journal is None or monotonic() - last_scan > RESCAN_INTERVAL:
+                this.tail_rescan = False
+                last_scan = monotonic()
+                latest = find_latest_journal(journal_dir)
+                if latest and latest != this.journal:
+                    if this.journal:
+                        while read_journal(processor):
+                            pass
+                        processor.log_journal(this.journal)
+                    this.journal = latest
+                    processor.set_session(get_session())
+                    this.offset = processor.load_checkpoint(latest)
+                    get_session().close()
+
+            if this.journal and read_journal(processor):
+                continue
+        except Exception as ex:
+            logger.error('Journal tail failed', exc_info=ex)
+
+        this.tail_wake.clear()
+        if this.tail_wake.wait(POLL_INTERVAL):
+            this.tail_stop.wait(BATCH_DELAY)
+    get_session().close()
+
+
+def read_journal(processor: JournalParse) -> bool:
+    """
+    Write the next batch of complete lines from the active journal. Event callbacks fire once the batch is
+    committed, for the events which were written.
+
+    :param processor: The journal processor
+    :return: True if a full batch was read, so more lines may be waiting
+    """
+
+    lines, offset = read_lines(this.journal, this.offset)
+    if not lines:
+        return False
+    entries: list[Mapping[str, Any]] = []
+    for line in lines:
+        try:
+            entries.append(json.loads(line))
+        except json.JSONDecodeError as ex:
+            logger.error(f'Journal JSON decode issue:\n{line!r}\n', exc_info=ex)
+    failed = processor.parse_lines(entries, this.journal, offset)
+    if failed:
+        logger.warning(f'Journal tail failed to parse {len(failed)} line(s) of {this.journal.name}')
+    this.offset = offset
+    if not this.tail_stop.is_set():
+        failed_ids = {id(entry) for entry in failed}
+        dispatch_events([entry for entry in entries if id(entry) not in failed_ids])
+    return len(lines) >= JOURNAL_BATCH_SIZE
+
+
+def notify() -> None:
+    """
+    Wake the tail thread, such as from the EDMC journal hook when a new event was written
+    """
+
+    this.tail_wake.set()
+
+
+def is_tailing() -> bool:
+    return this.tail_thread is not None and this.tail_thread.is_alive()
+
+
+def shutdown() -> None:
+    """
+    Journal tail shutdown handler. Stop the file watch and wait for the active batch to be written.
+    """
+
+    this.tail_stop.set()
+    this.tail_wake.set()
+    if this.observer:
+        this.observer.stop()
+        this.observer = None
+    if is_tailing():
+        this.tail_thread.join()
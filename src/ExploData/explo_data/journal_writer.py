@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+# ExploData module plugin for EDMC
+# Source: https://github.com/Silarn/EDMC-ExploData
+# Licensed under the [GNU Public License (GPL)](http://www.gnu.org/licenses/gpl-2.0.html) version 2 or later.
+
+import queue
+import threading
+import tkinter as tk
+from collections import deque
+from time import monotonic
+from typing import Any, Mapping, NamedTuple, Optional
+
+from EDMCLogging import get_plugin_logger
+
+from ExploData.explo_data import const
+from .db import batch_session, get_session
+from .journal_parse import JournalParse, fire_event_callbacks
+
+APPLIED_EVENT: str = '<<ExploData_journal_applied>>'
+
+
+class QueuedEvent(NamedTuple):
+    cmdr: str
+    system: str
+    star_pos: list[float]
+    entry: Mapping[str, Any]
+    queued: float
+
+
+class WriterStats(NamedTuple):
+    """ Write-behind queue metrics. Times are in seconds. """
+    queued: int
+    high_water: int
+    enqueued: int
+    written: int
+    failed: int
+    batches: int
+    blocked: int
+    blocked_time: float
+    last_latency: float
+    max_latency: float
+
+
+class This:
+    """Holds globals."""
+
+    def __init__(self):
+        self.writer_thread: Optional[threading.Thread] = None
+        self.queue: Optional[queue.Queue] = None
+        self.batch_size: int = 50
+        self.max_delay: float = 0.1
+        self.coalesce_scans: bool = True
+        self.dispatch_frame: Optional[tk.Frame] = None
+        self.stopping: bool = False
+        self.applied: deque[Mapping[str, Any]] = deque()
+        self.stats_lock = threading.Lock()
+        self.high_water: int = 0
+        self.enqueued: int = 0
+        self.written: int = 0
+        self.failed: int = 0
+        self.batches: int = 0
+        self.blocked: int = 0
+        self.blocked_time: float = 0.0
+        self.last_latency: float = 0.0
+        self.max_latency: float = 0.0
+
+
+this = This()
+logger = get_plugin_logger(const.plugin_name)
+
+
+def start_writer(batch_size: int = 50, max_delay: float = 0.1, queue_size: int = 1000,
+                 coalesce_scans: bool = True) -> bool:
+    """
+    Start the write-behind DB writer. While it runs, the EDMC journal hook only queues events, and the writer thread
+    applies them in batch transactions. Registered event callbacks fire once their event has been committed.
+
+    :param batch_size: The maximum number of events written per transaction
+    :param max_delay: Seconds to wait for more events before writing a batch
+    :param queue_size: The queue bound. A full queue blocks the hook until the writer catches up.
+    :param coalesce_scans: Write repeated Scan events for a body once per batch
+    :return: False if the writer is already running
+    """
+
+    if is_running():
+        return False
+    this.stopping = False
+    this.batch_size = max(1, batch_size)
+    this.max_delay = max(0.0, max_delay)
+    this.coalesce_scans = coalesce_scans
+    this.queue = queue.Queue(maxsize=max(1, queue_size))
+    this.writer_thread = threading.Thread(target=writer_worker, name='Journal writer')
+    this.writer_thread.daemon = True
+    this.writer_thread.start()
+    return True
+
+
+def set_dispatch_frame(frame: tk.Frame) -> None:
+    """
+    Set the TKinter frame used to run event callbacks on the main thread. Without a frame, callbacks run on the
+    writer or journal tail thread.
+
+    :param frame: The EDMC plugin frame
+    """
+
+    this.dispatch_frame = frame
+    frame.bind(APPLIED_EVENT, dispatch_applied)
+
+
+def enqueue(cmdr: str, system: str, star_pos: list[float], entry: Mapping[str, Any]) -> None:
+    """
+    Queue a journal event for the writer thread. Blocks only if the queue is full.
+
+    :param cmdr: The commander name
+    :param system: The system name
+    :param star_pos: The system coordinates
+    :param entry: The journal entry
+    """
+
+    item = QueuedEvent(cmdr, system, list(star_pos), entry, monotonic())
+    try:
+        this.queue.put_nowait(item)
+    except queue.Full:
+        start = monotonic()
+        this.queue.put(item)
+        with this.stats_lock:
+            this.blocked += 1
+            this.blocked_time += monotonic() - start
+    with this.stats_lock:
+        this.enqueued += 1
+        this.high_water = max(this.high_water, this.queue.qsize())
+
+
+def flush(timeout: Optional[float] = None) -> bool:
+    """
+    Flush barrier. Wait until every event queued before this call has been committed.
+
+    :param timeout: Optional maximum wait in seconds
+    :return: False if the timeout expired first
+    """
+
+    if not is_running():
+        return True
+    barrier = threading.Event()
+    this.queue.put(barrier)
+    return barrier.wait(timeout)
+
+
+def writer_worker() -> None:
+    """
+    Main DB writer thread. Coalesces queued events into batches and writes each batch in a single transaction.
+    """
+
+    processor = JournalParse(get_session(), live=True, coalesce_scans=this.coalesce_scans)
+    running = True
+    while running:
+        items = [this.queue.get()]
+        deadline = monotonic() + this.max_delay
+        while len(items) < this.batch_size and isinstance(items[-1], QueuedEvent):
+            try:
+                items.append(this.queue.get(timeout=max(0.0, deadline - monotonic())))
+            except queue.Empty:
+                break
+
+        events = [item for item in items if isinstance(item, QueuedEvent)]
+        if events:
+            write_events(processor, events)
+        for item in items:
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is None:
+                running = False
+    get_session().close()
+
+
+def write_events(processor: JournalParse, events: list[QueuedEvent]) -> None:
+    """
+    Write a batch of events in one transaction, each within a savepoint so a failure only discards its own event.
+    Queued scans are written before the commit, and callbacks are dispatched once the batch is committed, only for
+    the events which were written.
+
+    :param processor: The writer's journal processor
+    :param events: The queued events
+    """
+
+    applied: list[Mapping[str, Any]] = []
+    try:
+        with batch_session() as session:
+            processor.set_session(session)
+            for event in events:
+                processor.flush_scans_before(event.entry.get('event'), (event.system, event.cmdr))
+                savepoint = session.begin_nested()
+                try:
+                    processor.set_cmdr(event.cmdr)
+                    processor.set_system(event.system, event.star_pos)
+                    processor.process_entry(event.entry)
+                    if savepoint.is_active:
+                        savepoint.commit()
+                    applied.append(event.entry)
+                except Exception as ex:
+                    logger.error(f'Journal writer failed to apply {event.entry.get("event")}', exc_info=ex)
+                    if savepoint.is_active:
+                        savepoint.rollback()
+                    processor.reload_context()
+            processor.flush_scans()
+    except Exception as ex:
+        logger.error('Journal writer batch failed', exc_info=ex)
+        applied = []
+    failed = len(events) - len(applied)
+
+    latency = monotonic() - events[0].queued
+    with this.stats_lock:
+        this.written += len(events) - failed
+        this.failed += failed
+        this.batches += 1
+        this.last_latency = latency
+        this.max_latency = max(this.max_latency, latency)
+
+    if this.stopping or not applied:
+        return
+    dispatch_events(applied)
+
+
+def dispatch_events(entries: list[Mapping[str, Any]]) -> None:
+    """
+    Run the event callbacks for committed events. With a dispatch frame, they're handed to the main thread,
+    otherwise they run on the calling thread. Not to be called while the main thread waits on the caller.
+
+    :param entries: The committed journal entries
+    """
+
+    if this.dispatch_frame:
+        this.applied.extend(entries)
+        try:
+            this.dispatch_frame.event_generate(APPLIED_EVENT)
+        except tk.TclError:
+            pass
+    else:
+        for entry in entries:
+            fire_event_callbacks(entry)
+
+
+def dispatch_applied(_event: Optional[tk.Event] = None) -> None:
+    """
+    Run event callbacks for committed events on the main thread
+    """
+
+    while this.applied:
+        fire_event_callbacks(this.applied.popleft())
+
+
+def get_stats() -> WriterStats:
+    """
+    Helper function to access the write-behind queue metrics
+    """
+
+    with this.stats_lock:
+        return WriterStats(this.queue.qsize() if this.queue else 0, this.high_water, this.enqueued, this.written,
+                           this.failed, this.batches, this.blocked, this.blocked_time, this.last_latency,
+                           this.max_latency)
+
+
+def is_running() -> bool:
+    return this.writer_thread is not None and this.writer_thread.is_alive()
+
+
+def shutdown() -> None:
+    """
+    Journal writer shutdown handler. Write all queued events, then stop the writer thread.
+    Callbacks aren't dispatched during shutdown, as the main thread is waiting here.
+    """
+
+    if is_running():
+        this.stopping = True
+        this.queue.put(None)
+        this.writer_thread.join()
@@ -0,0 +1,443 @@
+# -*- coding: utf-8 -*-
+# ExploData module plugin for EDMC
+# Source: https://github.com/Silarn/EDMC-ExploData
+# Licensed under the [GNU Public License (GPL)](http://www.gnu.org/licenses/gpl-2.0.html) version 2 or later.
+
+import queue
+import threading
+import tkinter as tk
+from collections import deque
+from time import monotonic
+from typing import Any, Callable, Iterable, NamedTuple, Optional
+
+from sqlalchemy import Connection, Engine, event, inspect, select
+from sqlalchemy.orm import Session, UOWTransaction
+
+from EDMCLogging import get_plugin_logger
+
+from ExploData.explo_data import const
+from .db import NonBody, Planet, PlanetFlora, Star
+
+DISPATCH_EVENT: str = '<<ExploData_db_changes>>'
+PENDING_KEY: str = 'explodata_changes'
+
+
+class SystemChanged(NamedTuple):
+    """ Columns of a system row changed """
+    system_id: int
+    attributes: frozenset[str]
+
+
+class SystemStatusChanged(NamedTuple):
+    """ A commander's system status changed, such as fully_scanned or fully_mapped """
+    system_id: int
+    commander_id: int
+    attributes: frozenset[str]
+
+
+class BodiesChanged(NamedTuple):
+    """
+    Bodies of a system changed. Body types are 'planet', 'star' and 'non_body'. Besides column names, the attributes
+    include 'created', 'deleted', and the child rows 'flora', 'geos', 'gasses' and 'rings'.
+    """
+    system_id: int
+    body_type: str
+    body_ids: frozenset[int]
+    attributes: frozenset[str]
+
+
+class BodyStatusChanged(NamedTuple):
+    """ A commander's status of bodies changed. Flora scan progress is reported as 'flora_scans' and 'waypoints'. """
+    system_id: int
+    commander_id: int
+    body_type: str
+    body_ids: frozenset[int]
+    attributes: frozenset[str]
+
+
+class CodexChanged(NamedTuple):
+    """ A commander logged new codex entries in the given regions """
+    commander_id: int
+    regions: frozenset[int]
+
+
+Notification = SystemChanged | SystemStatusChanged | BodiesChanged | BodyStatusChanged | CodexChanged
+
+# Pending changes are keyed by (kind, system_id, commander_id, body_type) with the sets of ids and attributes.
+# They only use plain values, so changes noted by either copy of this package can be published by the other.
+ChangeKey = tuple[str, Optional[int], Optional[int], Optional[str]]
+Changes = dict[ChangeKey, tuple[set[int], set[str]]]
+
+# Table name to (kind, body type, parent column, child attribute) of flushed ORM rows
+TABLE_CHANGES: dict[str, tuple[str, Optional[str], str, Optional[str]]] = {
+    'systems': ('system', None, 'id', None),
+    'system_status': ('system_status', None, 'system_id', None),
+    'planets': ('bodies', 'planet', 'id', None),
+    'stars': ('bodies', 'star', 'id', None),
+    'non_bodies': ('bodies', 'non_body', 'id', None),
+    'planet_status': ('body_status', 'planet', 'planet_id', None),
+    'star_status': ('body_status', 'star', 'star_id', None),
+    'non_body_status': ('body_status', 'non_body', 'non_body_id', None),
+    'planet_flora': ('bodies', 'planet', 'planet_id', 'flora'),
+    'planet_geos': ('bodies', 'planet', 'planet_id', 'geos'),
+    'planet_gasses': ('bodies', 'planet', 'planet_id', 'gasses'),
+    'planet_rings': ('bodies', 'planet', 'planet_id', 'rings'),
+    'star_rings': ('bodies', 'star', 'star_id', 'rings'),
+    'flora_scans': ('body_status', 'planet', 'flora_id', 'flora_scans'),
+    'flora_waypoints': ('body_status', 'planet', 'flora_id', 'waypoints'),
+    'codex_scans': ('codex', None, 'region', None),
+}
+
+BODY_TABLES: dict[str, type[Planet | Star | NonBody]] = {'planet': Planet, 'star': Star, 'non_body': NonBody}
+
+
+class This:
+    """Holds globals."""
+
+    def __init__(self):
+        self.subscribers: dict[Callable[[list[Notification]], Any], Optional[tuple[type, ...]]] = {}
+        self.lock = threading.Lock()
+        self.listening: bool = False
+        self.queue: queue.Queue = queue.Queue()
+        self.dispatch_thread: Optional[threading.Thread] = None
+        self.dispatch_frame: Optional[tk.Frame] = None
+        self.max_delay: float = 0.05
+        self.dispatched: deque[Changes] = deque()
+        self.body_systems: dict[tuple[str, int], int] = {}
+
+
+this = This()
+logger = get_plugin_logger(const.plugin_name)
+
+
+def subscribe(func: Callable[[list[Notification]], Any], types: Optional[Iterable[type]] = None) -> None:
+    """
+    Subscribe to database change notifications. The callback receives the coalesced notifications of each committed
+    transaction, outside the thread which wrote them: on the main thread if a dispatch frame is set, otherwise on
+    the notification thread. Transactions committed within the delivery delay are merged into one call.
+
+    :param func: The callback, passed a list of notifications
+    :param types: Optional notification types to subscribe to. Defaults to all of them.
+    """
+
+    with this.lock:
+        this.subscribers[func] = tuple(types) if types else None
+    start_listening()
+
+
+def unsubscribe(func: Callable[[list[Notification]], Any]) -> None:
+    """
+    Remove a change notification subscriber
+
+    :param func: The callback to remove
+    """
+
+    with this.lock:
+        this.subscribers.pop(func, None)
+
+
+def set_dispatch_frame(frame: tk.Frame) -> None:
+    """
+    Set the TKinter frame used to deliver notifications on the main thread
+
+    :param frame: The EDMC plugin frame
+    """
+
+    this.dispatch_frame = frame
+    frame.bind(DISPATCH_EVENT, dispatch_pending)
+
+
+def set_delivery_delay(seconds: float) -> None:
+    """
+    Set how long the notification thread waits for more transactions before delivering. Defaults to 0.05 seconds,
+    which merges the many small commits made while processing a single live event.
+
+    :param seconds: The delay in seconds, or 0 to deliver every transaction as soon as possible
+    """
+
+    this.max_delay = max(0.0, seconds)
+
+
+def start_listening() -> None:
+    """
+    Register the SQLAlchemy event listeners and start the notification thread. Called by the first subscription, so
+    writes carry no overhead until somebody listens.
+    """
+
+    with this.lock:
+        if not this.listening:
+            event.listen(Session, 'after_flush', collect_flush)
+            event.listen(Engine, 'begin', begin_changes)
+            event.listen(Engine, 'savepoint', push_changes)
+            event.listen(Engine, 'release_savepoint', release_changes)
+            event.listen(Engine, 'rollback_savepoint', discard_savepoint_changes)
+            event.listen(Engine, 'commit', publish_changes)
+            event.listen(Engine, 'rollback', discard_changes)
+            this.listening = True
+        if not this.dispatch_thread or not this.dispatch_thread.is_alive():
+            this.dispatch_thread = threading.Thread(target=dispatch_worker, name='ExploData notifications')
+            this.dispatch_thread.daemon = True
+            this.dispatch_thread.start()
+
+
+def note_change(session: Session, kind: str, system_id: Optional[int], ids: Iterable[int],
+                attributes: Iterable[str], commander_id: Optional[int] = None, body_type: Optional[str] = None) -> None:
+    """
+    Note a change made outside the ORM unit of work, such as a Core bulk upsert or delete, for publication with the
+    rest of the transaction. Does nothing until the first subscription.
+
+    :param session: The Session which made the change
+    :param kind: One of 'system', 'system_status', 'bodies', 'body_status' or 'codex'
+    :param system_id: The system ID, or None for codex changes
+    :param ids: The changed body IDs, or regions for codex changes
+    :param attributes: The changed attributes
+    :param commander_id: The commander ID, for status and codex changes
+    :param body_type: The body type, for body changes
+    """
+
+    stack: Optional[list[Changes]] = session.connection().info.get(PENDING_KEY)
+    if stack is not None:
+        _add_change(stack[-1], (kind, system_id, commander_id, body_type), ids, attributes)
+
+
+def _add_change(changes: Changes, key: ChangeKey, ids: Iterable[int], attributes: Iterable[str]) -> None:
+    change_ids, change_attributes = changes.setdefault(key, (set(), set()))
+    change_ids.update(ids)
+    change_attributes.update(attributes)
+
+
+def _merge_changes(target: Changes, changes: Changes) -> None:
+    for key, (ids, attributes) in changes.items():
+        _add_change(target, key, ids, attributes)
+
+
+"""
+SQLAlchemy event listeners
+"""
+
+
+def collect_flush(session: Session, _flush_context: UOWTransaction) -> None:
+    """
+    Collect the ORM rows written by a flush into the pending changes of the session's connection
+    """
+
+    if not this.subscribers:
+        return
+    connection = session.connection()
+    stack: Optional[list[Changes]] = connection.info.get(PENDING_KEY)
+    if stack is None:
+        return
+
+    rows: list[tuple[str, Optional[str], int, Optional[int], str, set[str]]] = []
+    for state_set, marker in ((session.new, 'created'), (session.dirty, None), (session.deleted, 'deleted')):
+        for obj in state_set:
+            change = TABLE_CHANGES.get(getattr(obj, '__tablename__', ''))
+            if not change:
+                continue
+            kind, body_type, parent_column, child = change
+            if marker:
+                attributes = {child or marker}
+            else:
+                state = inspect(obj)
+                attributes = {attribute.key for attribute in state.mapper.column_attrs
+                              if attribute.key != 'revision' and state.attrs[attribute.key].history.has_changes()}
+                if not attributes:
+                    continue
+                if child:
+                    attributes = {child}
+            rows.append((kind, body_type, getattr(obj, parent_column), getattr(obj, 'commander_id', None),
+                         type(obj).__tablename__, attributes))
+    if not rows:
+        return
+
+    flora_planets: dict[int, int] = {}
+    flora_ids = {row[2] for row in rows if row[4] in ('flora_scans', 'flora_waypoints')}
+    if flora_ids:
+        flora_planets = dict(connection.execute(
+            select(PlanetFlora.id, PlanetFlora.planet_id).where(PlanetFlora.id.in_(flora_ids))
+        ).tuples().all())
+    changes = stack[-1]
+    for kind, body_type, parent_id, commander_id, table, attributes in rows:
+        if kind == 'codex':
+            _add_change(changes, (kind, None, commander_id, None), [parent_id], attributes)
+        elif kind in ('system', 'system_status'):
+            _add_change(changes, (kind, parent_id, commander_id, None), [], attributes)
+        else:
+            body_id = flora_planets.get(parent_id) if table in ('flora_scans', 'flora_waypoints') else parent_id
+            system_id = _body_system(connection, body_type, body_id)
+            if system_id is not None:
+                _add_change(changes, (kind, system_id, commander_id, body_type), [body_id], attributes)
+
+
+def _body_system(connection: Connection, body_type: str, body_id: Optional[int]) -> Optional[int]:
+    """ Look up the system of a body. Bodies never move between systems, so the result is cached. """
+
+    if body_id is None:
+        return None
+    key = (body_type, body_id)
+    if key not in this.body_systems:
+        table = BODY_TABLES[body_type]
+        system_id = connection.execute(select(table.system_id).where(table.id == body_id)).scalar()
+        if system_id is None:
+            return None
+        if len(this.body_systems) > 100000:
+            this.body_systems.clear()
+        this.body_systems[key] = system_id
+    return this.body_systems[key]
+
+
+def begin_changes(connection: Connection) -> None:
+    connection.info[PENDING_KEY] = [{}]
+
+
+def push_changes(connection: Connection, _name: str) -> None:
+    stack: Optional[list[Changes]] = connection.info.get(PENDING_KEY)
+    if stack is not None:
+        stack.append({})
+
+
+def release_changes(connection: Connection, _name: str, _context: Any) -> None:
+    stack: Optional[list[Changes]] = connection.info.get(PENDING_KEY)
+    if stack is not None and len(stack) > 1:
+        _merge_changes(stack[-2], stack.pop())
+
+
+def discard_savepoint_changes(connection: Connection, _name: str, _context: Any) -> None:
+    stack: Optional[list[Changes]] = connection.info.get(PENDING_KEY)
+    if stack is not None and len(stack) > 1:
+        stack.pop()
+
+
+def publish_changes(connection: Connection) -> None:
+    """
+    Hand the changes of a committed transaction to the notification thread
+    """
+
+    stack: Optional[list[Changes]] = connection.info.pop(PENDING_KEY, None)
+    if not stack:
+        return
+    changes: Changes = {}
+    for level in stack:
+        _merge_changes(changes, level)
+    if changes and this.subscribers:
+        this.queue.put(changes)
+
+
+def discard_changes(connection: Connection) -> None:
+    connection.info.pop(PENDING_KEY, None)
+
+
+"""
+Notification delivery
+"""
+
+
+def dispatch_worker() -> None:
+    """
+    Notification thread. Merges the transactions queued within the delivery delay, then delivers them to the
+    subscribers, or passes them to the main thread. A flush barrier ends the wait early.
+    """
+
+    while True:
+        items = [this.queue.get()]
+        deadline = monotonic() + this.max_delay
+        while isinstance(items[-1], dict):
+            try:
+                items.append(this.queue.get(timeout=max(0.0, deadline - monotonic())))
+            except queue.Empty:
+                break
+        changes: Changes = {}
+        for item in items:
+            if isinstance(item, dict):
+                _merge_changes(changes, item)
+        if changes:
+            if this.dispatch_frame:
+                this.dispatched.append(changes)
+                try:
+                    this.dispatch_frame.event_generate(DISPATCH_EVENT, when='tail')
+                except tk.TclError:
+                    pass
+            else:
+                deliver(changes)
+        for item in items:
+            if isinstance(item, threading.Event):
+                item.set()
+
+
+def dispatch_pending(_event: Optional[tk.Event] = None) -> None:
+    """
+    Deliver notifications on the main thread
+    """
+
+    while this.dispatched:
+        deliver(this.dispatched.popleft())
+
+
+def deliver(changes: Changes) -> None:
+    """
+    Build the typed notifications for a set of changes and pass them to each subscriber
+
+    :param changes: The coalesced changes
+    """
+
+    notifications = build_notifications(changes)
+    with this.lock:
+        subscribers = list(this.subscribers.items())
+    for func, types in subscribers:
+        selected = [notification for notification in notifications if not types or isinstance(notification, types)]
+        if selected:
+            try:
+                func(selected)
+            except Exception as ex:
+                logger.error('Change notification subscriber failed', exc_info=ex)
+
+
+def build_notifications(changes: Changes) -> list[Notification]:
+    """
+    Convert coalesced changes into typed notifications
+
+    :param changes: The coalesced changes
+    :return: List of notifications
+    """
+
+    notifications: list[Notification] = []
+    for (kind, system_id, commander_id, body_type), (ids, attributes) in changes.items():
+        match kind:
+            case 'system':
+                notifications.append(SystemChanged(system_id, frozenset(attributes)))
+            case 'system_status':
+                notifications.append(SystemStatusChanged(system_id, commander_id, frozenset(attributes)))
+            case 'bodies':
+                notifications.append(BodiesChanged(system_id, body_type, frozenset(ids), frozenset(attributes)))
+            case 'body_status':
+                notifications.append(BodyStatusChanged(system_id, commander_id, body_type, frozenset(ids),
+                                                       frozenset(attributes)))
+            case 'codex':
+                notifications.append(CodexChanged(commander_id, frozenset(ids)))
+    return notifications
+
+
+def flush(timeout: Optional[float] = None) -> bool:
+    """
+    Wait until every transaction committed before this call has been delivered, when delivering on the
+    notification thread.
+
+    :param timeout: Optional maximum wait in seconds
+    :return: False if the timeout expired first
+    """
+
+    if not this.dispatch_thread or not this.dispatch_thread.is_alive():
+        return True
+    barrier = threading.Event()
+    this.queue.put(barrier)
+    return barrier.wait(timeout)
+
+
+def shutdown() -> None:
+    """
+    Notification shutdown handler. Drop the subscribers, so no notifications are delivered during shutdown.
+    """
+
+    with this.lock:
+        this.subscribers.clear()
+    this.dispatched.clear()
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+# ExploData module plugin for EDMC
+# Source: https://github.com/Silarn/EDMC-ExploData
+# Licensed under the [GNU Public License (GPL)](http://www.gnu.org/licenses/gpl-2.0.html) version 2 or later.
+
+import threading
+from bisect import bisect_left
+from collections import deque
+from functools import wraps
+from time import perf_counter
+from typing import Any, Callable, Mapping, NamedTuple, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from EDMCLogging import get_plugin_logger
+
+from ExploData.explo_data import const
+from .db import get_engine
+from .journal_parse import JournalParse
+from .body_data.struct import PlanetData, StarData, NonBodyData
+
+# Upper bounds of the call time histogram buckets, in milliseconds. The last bucket holds anything slower.
+HISTOGRAM_BOUNDS: tuple[float, ...] = (0.1, 0.5, 1.0, 5.0, 10.0, 50.0, 100.0, 500.0, 1000.0)
+# Number of most recent calls of each type the histogram is built from
+HISTOGRAM_WINDOW: int = 1000
+# Struct methods which write data, wrapped while profiling is enabled
+PROFILED_PREFIXES: tuple[str, ...] = ('set_', 'add_', 'clear_', 'commit')
+PROFILED_CLASSES: tuple[type, ...] = (PlanetData, StarData, NonBodyData)
+
+
+class ProfileStats(NamedTuple):
+    """
+    Profile of a call type. Times are in seconds. SQL counts include nested calls.
+    Totals cover every call, while the histogram only covers the last HISTOGRAM_WINDOW calls.
+    """
+    calls: int
+    total_time: float
+    max_time: float
+    statements: int
+    flushes: int
+    commits: int
+    histogram: tuple[int, ...]
+
+
+class CallProfile:
+    """ Running totals of a call type """
+
+    def __init__(self):
+        self.calls: int = 0
+        self.total_time: float = 0.0
+        self.max_time: float = 0.0
+        self.statements: int = 0
+        self.flushes: int = 0
+        self.commits: int = 0
+        self.recent: deque[float] = deque(maxlen=HISTOGRAM_WINDOW)
+
+    def add(self, duration: float, counters: list[int]) -> None:
+        self.calls += 1
+        self.total_time += duration
+        self.max_time = max(self.max_time, duration)
+        self.statements += counters[0]
+        self.flushes += counters[1]
+        self.commits += counters[2]
+        self.recent.append(duration)
+
+    def to_stats(self) -> ProfileStats:
+        histogram = [0] * (len(HISTOGRAM_BOUNDS) + 1)
+        for duration in self.recent:
+            histogram[bisect_left(HISTOGRAM_BOUNDS, duration * 1000)] += 1
+        return ProfileStats(self.calls, self.total_time, self.max_time, self.statements, self.flushes, self.commits,
+                            tuple(histogram))
+
+
+class This:
+    """Holds globals."""
+
+    def __init__(self):
+        self.enabled: bool = False
+        self.lock = threading.Lock()
+        self.profiles: dict[str, CallProfile] = {}
+        self.originals: list[tuple[type, str, Callable]] = []
+        self.local = threading.local()
+
+
+this = This()
+logger = get_plugin_logger(const.plugin_name)
+
+
+def enable_profiling() -> None:
+    """
+    Start profiling journal events and struct writes. Each journal event type and struct method records its wall
+    time and the SQL statements, flushes, and commits it caused. The wrappers and SQL listeners are only installed
+    while profiling is enabled, so there is no cost otherwise.
+    """
+
+    if this.enabled:
+        return
+    _wrap(JournalParse, 'process_entry', _event_key)
+    for cls in PROFILED_CLASSES:
+        for name, value in list(vars(cls).items()):
+            if callable(value) and name.startswith(PROFILED_PREFIXES):
+                _wrap(cls, name, _method_key(f'{cls.__name__}.{name}'))
+    event.listen(get_engine(), 'before_cursor_execute', _count_statement)
+    event.listen(get_engine(), 'commit', _count_commit)
+    event.listen(Session, 'after_flush', _count_flush)
+    this.enabled = True
+
+
+def disable_profiling() -> None:
+    """
+    Stop profiling and remove the wrappers and SQL listeners. Recorded profiles are kept until reset.
+    """
+
+    if not this.enabled:
+        return
+    this.enabled = False
+    event.remove(get_engine(), 'before_cursor_execute', _count_statement)
+    event.remove(get_engine(), 'commit', _count_commit)
+    event.remove(Session, 'after_flush', _count_flush)
+    for cls, name, original in reversed(this.originals):
+        setattr(cls, name, original)
+    this.originals.clear()
+
+
+def is_profiling() -> bool:
+    return this.enabled
+
+
+def get_profile() -> dict[str, ProfileStats]:
+    """
+    Helper function to access the recorded profiles by call type
+    """
+
+    with this.lock:
+        return {key: profile.to_stats() for key, profile in this.profiles.items()}
+
+
+def reset_profile() -> None:
+    with this.lock:
+        this.profiles.clear()
+
+
+def dump_profile(reset: bool = False) -> str:
+    """
+    Format the recorded profiles as a table, slowest total time first, and write it to the log
+
+    :param reset: Clear the profiles after the dump
+    :return: The formatted profile table
+    """
+
+    profile = get_profile()
+    if reset:
+        reset_profile()
+    buckets = [f'<{bound:g}ms' for bound in HISTOGRAM_BOUNDS] + ['slower']
+    lines = [f'{"call":<40} {"calls":>7} {"total s":>9} {"avg ms":>8} {"max ms":>8} {"sql":>7} {"flush":>6} '
+             f'{"commit":>6}  last {HISTOGRAM_WINDOW} calls ({", ".join(buckets)})']
+    for key, stats in sorted(profile.items(), key=lambda item: item[1].total_time, reverse=True):
+        lines.append(f'{key:<40} {stats.calls:>7} {stats.total_time:>9.3f} '
+                     f'{stats.total_time / stats.calls * 1000:>8.2f} {stats.max_time * 1000:>8.2f} '
+                     f'{stats.statements:>7} {stats.flushes:>6} {stats.commits:>6}  '
+                     f'{" ".join(str(count) for count in stats.histogram)}')
+    table = '\n'.join(lines)
+    logger.info(f'ExploData profile:\n{table}')
+    return table
+
+
+def shutdown() -> None:
+    """
+    Profiling shutdown handler. Dump the recorded profiles if profiling is enabled.
+    """
+
+    if this.enabled:
+        dump_profile()
+        disable_profiling()
+
+
+def _event_key(_processor: JournalParse, entry: Mapping[str, Any], *_args, **_kwargs) -> str:
+    return f'event.{entry.get("event", "")}'
+
+
+def _method_key(key: str) -> Callable[..., str]:
+    return lambda *_args, **_kwargs: key
+
+
+def _wrap(cls: type, name: str, get_key: Callable[..., str]) -> None:
+    original = vars(cls)[name]
+    this.originals.append((cls, name, original))
+
+    @wraps(original)
+    def wrapper(*args, **kwargs):
+        stack = _get_stack()
+        counters = [0, 0, 0]
+        stack.append(counters)
+        start = perf_counter()
+        try:
+            return original(*args, **kwargs)
+        finally:
+            duration = perf_counter() - start
+            stack.pop()
+            key = get_key(*args, **kwargs)
+            with this.lock:
+                this.profiles.setdefault(key, CallProfile()).add(duration, counters)
+
+    setattr(cls, name, wrapper)
+
+
+def _get_stack() -> list[list[int]]:
+    stack: Optional[list[list[int]]] = getattr(this.local, 'stack', None)
+    if stack is None:
+        stack = this.local.stack = []
+    return stack
+
+
+def _count(index: int) -> None:
+    for counters in _get_stack():
+        counters[index] += 1
+
+
+def _count_statement(*_args) -> None:
+    _count(0)
+
+
+def _count_flush(*_args) -> None:
+    _count(1)
+
+
+def _count_commit(*_args) -> None:
+    _count(2)
@@ -0,0 +1,329 @@
+# -*- coding: utf-8 -*-
+# ExploData module plugin for EDMC
+# Source: https://github.com/Silarn/EDMC-ExploData
+# Licensed under the [GNU Public License (GPL)](http://www.gnu.org/licenses/gpl-2.0.html) version 2 or later.
+
+"""
+Read-only snapshots of a system and its bodies. Snapshots are immutable tuples, loaded with a single query and
+detached from any Session, so they can be kept and shared between threads. Reading them never runs SQL.
+"""
+
+from typing import Any, NamedTuple, Optional, get_type_hints
+
+from sqlalchemy import Select, bindparam, literal, null, select, type_coerce, union_all
+from sqlalchemy.sql.sqltypes import NullType
+
+from . import db
+from .db import System, SystemStatus, Star, StarRing, StarStatus, Planet, PlanetStatus, PlanetGas, PlanetGeo, \
+    PlanetRing, PlanetFlora, FloraScans, Waypoint, NonBody, NonBodyStatus
+
+
+class RingSnapshot(NamedTuple):
+    name: str
+    type: str
+
+
+class GasSnapshot(NamedTuple):
+    name: str
+    percent: float
+
+
+class WaypointSnapshot(NamedTuple):
+    type: str
+    latitude: float
+    longitude: float
+
+
+class FloraSnapshot(NamedTuple):
+    """ A genus or species on a planet, with the commander's scan progress """
+    id: int
+    genus: str
+    species: str
+    color: str
+    scan_count: int = 0
+    was_logged: Optional[bool] = None
+    waypoints: tuple[WaypointSnapshot, ...] = ()
+
+
+class SystemStatusSnapshot(NamedTuple):
+    honked: bool
+    fully_scanned: bool
+    fully_mapped: bool
+
+
+class StarStatusSnapshot(NamedTuple):
+    discovered: bool
+    was_discovered: bool
+    scan_state: int
+
+
+class PlanetStatusSnapshot(NamedTuple):
+    discovered: bool
+    was_discovered: bool
+    mapped: bool
+    was_mapped: bool
+    footfall: bool
+    was_footfalled: Optional[bool]
+    efficient: bool
+    scan_state: int
+
+
+class NonBodyStatusSnapshot(NamedTuple):
+    discovered: bool
+    was_discovered: bool
+    mapped: bool
+    was_mapped: bool
+    efficient: bool
+
+
+class StarSnapshot(NamedTuple):
+    id: int
+    name: str
+    body_id: int
+    distance: Optional[float]
+    mass: float
+    rotation: float
+    orbital_period: float
+    type: str
+    subclass: int
+    luminosity: str
+    status: Optional[StarStatusSnapshot] = None
+    rings: tuple[RingSnapshot, ...] = ()
+
+
+class PlanetSnapshot(NamedTuple):
+    id: int
+    name: str
+    body_id: int
+    type: str
+    atmosphere: str
+    volcanism: Optional[str]
+    distance: float
+    mass: float
+    rotation: float
+    orbital_period: float
+    gravity: float
+    temp: Optional[float]
+    pressure: Optional[float]
+    radius: float
+    parent_stars: tuple[str, ...]
+    bio_signals: int
+    geo_signals: int
+    materials: frozenset[str]
+    landable: bool
+    terraform_state: str
+    status: Optional[PlanetStatusSnapshot] = None
+    gasses: tuple[GasSnapshot, ...] = ()
+    geos: tuple[str, ...] = ()
+    rings: tuple[RingSnapshot, ...] = ()
+    floras: tuple[FloraSnapshot, ...] = ()
+
+
+class NonBodySnapshot(NamedTuple):
+    id: int
+    name: str
+    body_id: int
+    status: Optional[NonBodyStatusSnapshot] = None
+
+
+class SystemSnapshot(NamedTuple):
+    """
+    A system with all of its bodies. Bodies are ordered by body ID. Status fields hold the data of the commander the
+    snapshot was taken for, and are None if the commander has no data for the object or no commander was given.
+    """
+    id: int
+    name: str
+    x: float
+    y: float
+    z: float
+    region: Optional[int]
+    body_count: int
+    non_body_count: int
+    status: Optional[SystemStatusSnapshot] = None
+    stars: tuple[StarSnapshot, ...] = ()
+    planets: tuple[PlanetSnapshot, ...] = ()
+    non_bodies: tuple[NonBodySnapshot, ...] = ()
+
+    def get_star(self, name: str) -> Optional[StarSnapshot]:
+        return next((star for star in self.stars if star.name == name), None)
+
+    def get_planet(self, name: str) -> Optional[PlanetSnapshot]:
+        return next((planet for planet in self.planets if planet.name == name), None)
+
+    def get_non_body(self, name: str) -> Optional[NonBodySnapshot]:
+        return next((non_body for non_body in self.non_bodies if non_body.name == name), None)
+
+
+class SnapshotSource(NamedTuple):
+    """
+    Rows of one kind in the snapshot query. The columns fill the leading fields of the snapshot type, in order.
+    Commander specific sources are filtered to the commander and left out when no commander is given.
+    """
+    kind: str
+    snapshot: type[NamedTuple]
+    id: Any
+    parent: Any
+    columns: list[Any]
+    statement: Select
+    commander: bool = False
+
+
+SYSTEM_ID = bindparam('system_id')
+COMMANDER_ID = bindparam('commander_id')
+
+SNAPSHOT_SOURCES: list[SnapshotSource] = [
+    SnapshotSource('system', SystemSnapshot, System.id, System.id,
+                   [System.id, System.name, System.x, System.y, System.z, System.region, System.body_count,
+                    System.non_body_count],
+                   select().select_from(System).where(System.id == SYSTEM_ID)),
+    SnapshotSource('system_status', SystemStatusSnapshot, SystemStatus.id, SystemStatus.system_id,
+                   [SystemStatus.honked, SystemStatus.fully_scanned, SystemStatus.fully_mapped],
+                   select().select_from(SystemStatus).where(SystemStatus.system_id == SYSTEM_ID)
+                   .where(SystemStatus.commander_id == COMMANDER_ID), True),
+    SnapshotSource('star', StarSnapshot, Star.id, Star.system_id,
+                   [Star.id, Star.name, Star.body_id, Star.distance, Star.mass, Star.rotation, Star.orbital_period,
+                    Star.type, Star.subclass, Star.luminosity],
+                   select().select_from(Star).where(Star.system_id == SYSTEM_ID)),
+    SnapshotSource('star_status', StarStatusSnapshot, StarStatus.id, StarStatus.star_id,
+                   [StarStatus.discovered, StarStatus.was_discovered, StarStatus.scan_state],
+                   select().select_from(StarStatus).join(Star).where(Star.system_id == SYSTEM_ID)
+                   .where(StarStatus.commander_id == COMMANDER_ID), True),
+    SnapshotSource('star_ring', RingSnapshot, StarRing.id, StarRing.star_id, [StarRing.name, StarRing.type],
+                   select().select_from(StarRing).join(Star).where(Star.system_id == SYSTEM_ID)),
+    SnapshotSource('planet', PlanetSnapshot, Planet.id, Planet.system_id,
+                   [Planet.id, Planet.name, Planet.body_id, Planet.type, Planet.atmosphere, Planet.volcanism,
+                    Planet.distance, Planet.mass, Planet.rotation, Planet.orbital_period, Planet.gravity, Planet.temp,
+                    Planet.pressure, Planet.radius, Planet.parent_stars, Planet.bio_signals, Planet.geo_signals,
+                    Planet.materials, Planet.landable, Planet.terraform_state],
+                   select().select_from(Planet).where(Planet.system_id == SYSTEM_ID)),
+    SnapshotSource('planet_status', PlanetStatusSnapshot, PlanetStatus.id, PlanetStatus.planet_id,
+                   [PlanetStatus.discovered, PlanetStatus.was_discovered, PlanetStatus.mapped, PlanetStatus.was_mapped,
+                    PlanetStatus.footfall, PlanetStatus.was_footfalled, PlanetStatus.efficient,
+                    PlanetStatus.scan_state],
+                   select().select_from(PlanetStatus).join(Planet).where(Planet.system_id == SYSTEM_ID)
+                   .where(PlanetStatus.commander_id == COMMANDER_ID), True),
+    SnapshotSource('planet_gas', GasSnapshot, PlanetGas.id, PlanetGas.planet_id,
+                   [PlanetGas.gas_name, PlanetGas.percent],
+                   select().select_from(PlanetGas).join(Planet).where(Planet.system_id == SYSTEM_ID)),
+    SnapshotSource('planet_geo', str, PlanetGeo.id, PlanetGeo.planet_id, [PlanetGeo.type],
+                   select().select_from(PlanetGeo).join(Planet).where(Planet.system_id == SYSTEM_ID)),
+    SnapshotSource('planet_ring', RingSnapshot, PlanetRing.id, PlanetRing.planet_id,
+                   [PlanetRing.name, PlanetRing.type],
+                   select().select_from(PlanetRing).join(Planet).where(Planet.system_id == SYSTEM_ID)),
+    SnapshotSource('flora', FloraSnapshot, PlanetFlora.id, PlanetFlora.planet_id,
+                   [PlanetFlora.id, PlanetFlora.genus, PlanetFlora.species, PlanetFlora.color],
+                   select().select_from(PlanetFlora).join(Planet).where(Planet.system_id == SYSTEM_ID)),
+    SnapshotSource('flora_scan', tuple, FloraScans.id, FloraScans.flora_id,
+                   [FloraScans.count, FloraScans.was_logged],
+                   select().select_from(FloraScans).join(PlanetFlora).join(Planet)
+                   .where(Planet.system_id == SYSTEM_ID).where(FloraScans.commander_id == COMMANDER_ID), True),
+    SnapshotSource('waypoint', WaypointSnapshot, Waypoint.id, Waypoint.flora_id,
+                   [Waypoint.type, Waypoint.latitude, Waypoint.longitude],
+                   select().select_from(Waypoint).join(PlanetFlora).join(Planet)
+                   .where(Planet.system_id == SYSTEM_ID).where(Waypoint.commander_id == COMMANDER_ID), True),
+    SnapshotSource('non_body', NonBodySnapshot, NonBody.id, NonBody.system_id,
+                   [NonBody.id, NonBody.name, NonBody.body_id],
+                   select().select_from(NonBody).where(NonBody.system_id == SYSTEM_ID)),
+    SnapshotSource('non_body_status', NonBodyStatusSnapshot, NonBodyStatus.id, NonBodyStatus.non_body_id,
+                   [NonBodyStatus.discovered, NonBodyStatus.was_discovered, NonBodyStatus.mapped,
+                    NonBodyStatus.was_mapped, NonBodyStatus.efficient],
+                   select().select_from(NonBodyStatus).join(NonBody).where(NonBody.system_id == SYSTEM_ID)
+                   .where(NonBodyStatus.commander_id == COMMANDER_ID), True),
+]
+
+
+def build_snapshot_statement(commander: bool) -> Select:
+    """
+    Build the snapshot query: a union of every source, padded to the same width. Values are left untyped, since
+    each column position holds values of different types, and are converted when the snapshot is assembled.
+
+    :param commander: Include the commander specific sources
+    :return: The compound select, taking system_id (and commander_id) parameters
+    """
+
+    width = max(len(source.columns) for source in SNAPSHOT_SOURCES)
+    selects = []
+    for source in SNAPSHOT_SOURCES:
+        if source.commander and not commander:
+            continue
+        columns = [type_coerce(column, NullType) for column in [source.id, source.parent, *source.columns]]
+        padding = [null()] * (width - len(source.columns))
+        selects.append(source.statement.add_columns(literal(source.kind), *columns, *padding))
+    return union_all(*selects)
+
+
+SNAPSHOT_STATEMENT: Select = build_snapshot_statement(commander=False)
+SNAPSHOT_COMMANDER_STATEMENT: Select = build_snapshot_statement(commander=True)
+
+# Positions of the boolean fields of each snapshot type, which SQLite returns as integers
+BOOLEAN_FIELDS: dict[type, tuple[int, ...]] = {
+    source.snapshot: tuple(index for index, hint in enumerate(get_type_hints(source.snapshot).values())
+                           if hint in (bool, Optional[bool]))
+    for source in SNAPSHOT_SOURCES if source.snapshot not in (str, tuple)
+}
+
+
+def _values(snapshot: type, row: tuple, size: int) -> list[Any]:
+    """ Get the values of a snapshot query row for a source, converting booleans """
+
+    values = list(row[3:3 + size])
+    for index in BOOLEAN_FIELDS.get(snapshot, ()):
+        if index < size and values[index] is not None:
+            values[index] = bool(values[index])
+    return values
+
+
+def get_system_snapshot(system_id: int, commander_id: Optional[int] = None) -> Optional[SystemSnapshot]:
+    """
+    Load a snapshot of a system and all of its bodies, using a single query
+
+    :param system_id: The system ID
+    :param commander_id: Optional commander ID. Status data and flora scans are only included when one is given.
+    :return: The system snapshot, or None if the system doesn't exist
+    """
+
+    sources = {source.kind: source for source in SNAPSHOT_SOURCES}
+    rows: dict[str, dict[Any, list[Any]]] = {source.kind: {} for source in SNAPSHOT_SOURCES}
+    parameters = {'system_id': system_id}
+    statement = SNAPSHOT_STATEMENT
+    if commander_id is not None:
+        parameters['commander_id'] = commander_id
+        statement = SNAPSHOT_COMMANDER_STATEMENT
+    with db.get_engine().connect() as connection:
+        for row in connection.execute(statement, parameters):
+            source = sources[row[0]]
+            rows[source.kind].setdefault(row[2], []).append(_values(source.snapshot, row, len(source.columns)))
+    if system_id not in rows['system']:
+        return None
+
+    def first(kind: str, parent: int) -> Optional[Any]:
+        values = rows[kind].get(parent)
+        return sources[kind].snapshot(*values[0]) if values else None
+
+    def every(kind: str, parent: int) -> tuple[Any, ...]:
+        snapshot = sources[kind].snapshot
+        return tuple(snapshot(*values) for values in rows[kind].get(parent, []))
+
+    stars = [StarSnapshot(*values, status=first('star_status', values[0]), rings=every('star_ring', values[0]))
+             for values in rows['star'].get(system_id, [])]
+    planets = []
+    for values in rows['planet'].get(system_id, []):
+        planet_id = values[0]
+        floras = []
+        for flora in rows['flora'].get(planet_id, []):
+            count, was_logged = rows['flora_scan'].get(flora[0], [[0, None]])[0]
+            floras.append(FloraSnapshot(*flora, scan_count=count,
+                                        was_logged=None if was_logged is None else bool(was_logged),
+                                        waypoints=every('waypoint', flora[0])))
+        values[14] = tuple(values[14].split(',')) if values[14] else ()
+        values[17] = frozenset(values[17].split(',')) if values[17] else frozenset()
+        planets.append(PlanetSnapshot(*values, status=first('planet_status', planet_id),
+                                      gasses=every('planet_gas', planet_id),
+                                      geos=tuple(geo[0] for geo in rows['planet_geo'].get(planet_id, [])),
+                                      rings=every('planet_ring', planet_id), floras=tuple(floras)))
+    non_bodies = [NonBodySnapshot(*values, status=first('non_body_status', values[0]))
+                  for values in rows['non_body'].get(system_id, [])]
+    return SystemSnapshot(*rows['system'][system_id][0], status=first('system_status', system_id),
+                          stars=tuple(sorted(stars, key=lambda star: star.body_id)),
+                          planets=tuple(sorted(planets, key=lambda planet: planet.body_id)),
+                          non_bodies=tuple(sorted(non_bodies, key=lambda non_body: non_body.body_id)))
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+# ExploData module plugin for EDMC
+# Source: https://github.com/Silarn/EDMC-ExploData
+# Licensed under the [GNU Public License (GPL)](http://www.gnu.org/licenses/gpl-2.0.html) version 2 or later.
+
+"""
+Prebuilt statements for the lookups run on every journal event. Building a select and generating its cache key costs
+more than running these indexed lookups, so the statements are built once with bound parameters and reused.
+Lookups which only need a value or existence check select columns, avoiding the ORM object load.
+
+Execute them with their parameters, e.g. session.scalar(PLANET_BY_NAME, {'system_id': 1, 'name': 'A 1'})
+"""
+
+from sqlalchemy import Select, bindparam, select
+
+from .db import Commander, System, Planet, Star, NonBody, FloraScans, CodexScans, PlanetStatus, StarStatus, \
+    NonBodyStatus
+
+# Body lookups, by name from scans or by body ID from surface events
+PLANET_BY_NAME: Select = select(Planet).where(Planet.system_id == bindparam('system_id')) \
+    .where(Planet.name == bindparam('name'))
+PLANET_BY_BODY_ID: Select = select(Planet).where(Planet.system_id == bindparam('system_id')) \
+    .where(Planet.body_id == bindparam('body_id'))
+STAR_BY_NAME: Select = select(Star).where(Star.system_id == bindparam('system_id')) \
+    .where(Star.name == bindparam('name'))
+NON_BODY_BY_NAME: Select = select(NonBody).where(NonBody.system_id == bindparam('system_id')) \
+    .where(NonBody.name == bindparam('name'))
+
+# Commander status of a body, for collections loaded for another commander
+PLANET_STATUS: Select = select(PlanetStatus).where(PlanetStatus.planet_id == bindparam('body_id')) \
+    .where(PlanetStatus.commander_id == bindparam('commander_id'))
+STAR_STATUS: Select = select(StarStatus).where(StarStatus.star_id == bindparam('body_id')) \
+    .where(StarStatus.commander_id == bindparam('commander_id'))
+NON_BODY_STATUS: Select = select(NonBodyStatus).where(NonBodyStatus.non_body_id == bindparam('body_id')) \
+    .where(NonBodyStatus.commander_id == bindparam('commander_id'))
+
+# Commander and system context
+COMMANDER_BY_NAME: Select = select(Commander).where(Commander.name == bindparam('name'))
+SYSTEM_BY_NAME: Select = select(System).where(System.name == bindparam('name'))
+
+# Flora scan progress for a commander
+FLORA_SCAN: Select = select(FloraScans).where(FloraScans.flora_id == bindparam('flora_id')) \
+    .where(FloraScans.commander_id == bindparam('commander_id'))
+FLORA_SCAN_COUNT: Select = select(FloraScans.count).where(FloraScans.flora_id == bindparam('flora_id')) \
+    .where(FloraScans.commander_id == bindparam('commander_id'))
+
+# Codex entry existence for a commander in a region
+CODEX_SCAN_ID: Select = select(CodexScans.id).where(CodexScans.commander_id == bindparam('commander_id')) \
+    .where(CodexScans.biological == bindparam('biological')).where(CodexScans.region == bindparam('region'))
@@ -10,6 +10,12 @@ from EDMCLogging import get_plugin_logger
 
 import ExploData.explo_data.journal_parse
 import ExploData.explo_data.edsm_parse
+import ExploData.explo_data.dump_import
+import ExploData.explo_data.journal_tail
+import ExploData.explo_data.journal_recorder
+import ExploData.explo_data.journal_writer
+import ExploData.explo_data.notifications
+import ExploData.explo_data.profiling
 import explo_data.const
 from explo_data import db
 from explo_data.journal_parse import JournalParse
@@ -39,7 +45,7 @@ def plugin_start3(plugin_dir: str) -> str:
     """
 
     db.init()
-    this.journal_processor = JournalParse(db.get_session())
+    this.journal_processor = JournalParse(db.get_session(), live=True)
     return 'ExploData'
 
 
@@ -51,6 +57,8 @@ def plugin_app(parent: tk.Frame) -> Optional[tk.Frame]:
     :return: None, as we have no display.
     """
 
+    ExploData.explo_data.journal_writer.set_dispatch_frame(parent)
+    ExploData.explo_data.notifications.set_dispatch_frame(parent)
     return None
 
 
@@ -59,8 +67,14 @@ def plugin_stop():
     EDMC plugin stop function. Closes open threads and database sessions for clean shutdown.
     """
 
+    ExploData.explo_data.journal_recorder.shutdown()
+    ExploData.explo_data.notifications.shutdown()
     ExploData.explo_data.journal_parse.shutdown()
+    ExploData.explo_data.journal_tail.shutdown()
+    ExploData.explo_data.journal_writer.shutdown()
     ExploData.explo_data.edsm_parse.shutdown()
+    ExploData.explo_data.dump_import.shutdown()
+    ExploData.explo_data.profiling.shutdown()
     db.shutdown()
 
 
@@ -70,6 +84,10 @@ def journal_entry(
     """
     EDMC journal entry hook. Primary journal data handler.
     Pass the journal events to the main journal processor, then pass the events to any registered callbacks.
+    If the journal tail is running, it writes the event instead and is only woken up here. The tail fires the
+    callbacks once the event has been committed.
+    If the journal writer is running, the event is queued and callbacks fire once it has been committed.
+    If the journal recorder is running, every call is recorded first.
 
     :param cmdr: The commander name
     :param is_beta: Beta status (unused)
@@ -80,9 +98,20 @@ def journal_entry(
     :return: Result string. Empty means success.
     """
 
+    if ExploData.explo_data.journal_recorder.is_recording():
+        ExploData.explo_data.journal_recorder.record(cmdr, system, state['StarPos'], entry)
+
+    if ExploData.explo_data.journal_tail.is_tailing():
+        ExploData.explo_data.journal_tail.notify()
+        return ''
+
     if not state['StarPos'] or not system or not cmdr:
         return ''
 
+    if ExploData.explo_data.journal_writer.is_running():
+        ExploData.explo_data.journal_writer.enqueue(cmdr, system, state['StarPos'], entry)
+        return ''
+
     this.journal_processor.set_cmdr(cmdr)
     this.journal_processor.set_system(system, state['StarPos'])
     this.journal_processor.process_entry(entry)
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+# ExploData module plugin for EDMC
+# Source: https://github.com/Silarn/EDMC-ExploData
+# Licensed under the [GNU Public License (GPL)](http://www.gnu.org/licenses/gpl-2.0.html) version 2 or later.
+
+"""
+Shared test setup. The EDMC modules are replaced with the stand-ins from tools/edmc_env.py, and each test using the
+database fixture gets its own EDMC data directory and explodata.db. The server fixture is a local EDSM stand-in.
+"""
+
+import json
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from time import monotonic
+from typing import Any, Iterator
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'tools'))
+
+import edmc_env  # noqa: E402
+
+edmc_env.setup(Path(tempfile.mkdtemp(prefix='explodata-tests-')))
+
+
+@pytest.fixture
+def app_dir(tmp_path: Path) -> Path:
+    """ An empty EDMC data directory, with a journal directory, set in the stand-in config """
+
+    from config import config
+
+    (tmp_path / 'journals').mkdir()
+    config.app_dir_path = tmp_path
+    config.settings['journaldir'] = str(tmp_path / 'journals')
+    return tmp_path
+
+
+@pytest.fixture
+def database(app_dir: Path) -> Iterator[Path]:
+    """ A freshly initialized database in the test's data directory """
+
+    from ExploData.explo_data import db
+
+    db.init()
+    yield app_dir
+    db.shutdown()
+    db.this.sql_engine = None
+    db.this.sql_session_factory = None
+    db.this.migration_failed = False
+
+
+@pytest.fixture
+def queries(database: Path) -> Iterator[list[str]]:
+    """ The SQL statements executed on the database engine while the test runs """
+
+    from sqlalchemy import event
+    from ExploData.explo_data import db
+
+    statements: list[str] = []
+
+    def record(_conn, _cursor, statement, _parameters, _context, _executemany) -> None:
+        statements.append(statement)
+
+    event.listen(db.get_engine(), 'before_cursor_execute', record)
+    yield statements
+    event.remove(db.get_engine(), 'before_cursor_execute', record)
+
+
+class StubServer(ThreadingHTTPServer):
+    """
+    Local stand-in for the EDSM bodies endpoint. Requests are recorded, and can be held until released.
+    Responses carry an ETag, and a matching If-None-Match is answered with 304.
+    """
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), StubHandler)
+        self.requests: list[tuple[str, float]] = []
+        self.headers: list[dict[str, str]] = []
+        self.bodies: dict[str, list[dict[str, Any]]] = {}
+        self.release = threading.Event()
+        self.release.set()
+        self.received = threading.Event()
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self.server_address[1]}/api-system-v1/bodies'
+
+    def names(self) -> list[str]:
+        return [name for name, _ in self.requests]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    server: StubServer
+
+    def do_GET(self) -> None:
+        name = parse_qs(urlparse(self.path).query)['systemName'][0]
+        self.server.requests.append((name, monotonic()))
+        self.server.headers.append(dict(self.headers))
+        self.server.received.set()
+        self.server.release.wait(5)
+        body = json.dumps({'name': name, 'bodies': self.server.bodies.get(name, [])}).encode()
+        etag = f'"{hash(body)}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def server() -> Iterator[StubServer]:
+    stub = StubServer()
+    thread = threading.Thread(target=stub.serve_forever, daemon=True)
+    thread.start()
+    yield stub
+    stub.release.set()
+    stub.shutdown()
+    stub.server_close()
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+# ExploData module plugin for EDMC
+# Source: https://github.com/Silarn/EDMC-ExploData
+# Licensed under the [GNU Public License (GPL)](http://www.gnu.org/licenses/gpl-2.0.html) version 2 or later.
+
+from pathlib import Path
+from typing import Any, Optional
+
+import pytest
+
+from ExploData.explo_data import db
+from ExploData.explo_data.bio_data.predict import BodyBio, get_colony_distance, predict_system_bio
+from ExploData.explo_data.body_data.struct import PlanetData, load_planets
+
+BACTERIUM = '$Codex_Ent_Bacterial_Genus_Name;'
+STRATUM = '$Codex_Ent_Stratum_Genus_Name;'
+
+
+@pytest.fixture
+def system(database: Path) -> tuple[int, int, int]:
+    """ A binary system with planets orbiting one or both stars, with flora scanned by two commanders """
+
+    session = db.get_session()
+    alpha, beta = db.Commander(name='Predict CMDR'), db.Commander(name='Predict Other')
+    system = db.System(name='Predict Alpha', x=0.0, y=0.0, z=0.0)
+    session.add_all([alpha, beta, system])
+    session.flush()
+    session.add_all([db.Star(system_id=system.id, name='A', body_id=0, type='K'),
+                     db.Star(system_id=system.id, name='B', body_id=1, type='TTS'),
+                     db.Star(system_id=system.id, name='C', body_id=2)])
+    both = db.Planet(system_id=system.id, name='AB 1', body_id=3, parent_stars='A,B', bio_signals=2,
+                     atmosphere='Thin Carbon dioxide', materials='iron,polonium,tin')
+    both.gasses = [db.PlanetGas(gas_name='CarbonDioxide', percent=99.0), db.PlanetGas(gas_name='SulphurDioxide',
+                                                                                       percent=1.0)]
+    bacterium = db.PlanetFlora(genus=BACTERIUM, species='$Codex_Ent_Bacterial_02_Name;')
+    stratum = db.PlanetFlora(genus=STRATUM)
+    both.floras = [bacterium, stratum]
+    lone = db.Planet(system_id=system.id, name='A 2', body_id=4, parent_stars='A,C', materials='cadmium')
+    lone.floras = [db.PlanetFlora(genus=BACTERIUM)]
+    barren = db.Planet(system_id=system.id, name='A 3', body_id=5, parent_stars='A', materials='iron')
+    orphan = db.Planet(system_id=system.id, name='Orphan', body_id=6, parent_stars='', bio_signals=1)
+    session.add_all([both, lone, barren, orphan])
+    session.flush()
+    session.add_all([db.FloraScans(flora_id=bacterium.id, commander_id=alpha.id, count=3),
+                     db.FloraScans(flora_id=bacterium.id, commander_id=beta.id, count=1),
+                     db.FloraScans(flora_id=stratum.id, commander_id=beta.id, count=2)])
+    session.commit()
+    ids = system.id, alpha.id, beta.id
+    session.close()
+    return ids
+
+
+def scan_count(flora: db.PlanetFlora, commander_id: Optional[int]) -> int:
+    return next((scan.count for scan in flora.scans if scan.commander_id == commander_id), 0)
+
+
+def expected(planet: PlanetData, commander_id: Optional[int]) -> dict[str, Any]:
+    """ The bio data for a planet, built through the per-planet PlanetData path """
+
+    floras = planet.get_flora() or []
+    return {
+        'star_types': sorted(planet.get_parent_star_types()),
+        'materials': planet.get_materials(),
+        'gasses': {gas: planet.get_gas(gas) for gas in ('CarbonDioxide', 'SulphurDioxide', 'Nitrogen')
+                   if planet.get_gas(gas)},
+        'flora': sorted((flora.genus, flora.species, flora.color, scan_count(flora, commander_id),
+                         get_colony_distance(flora.genus, flora.species)) for flora in floras),
+        'colors': planet.predicted_colors() if planet.get_bio_signals() or floras else {},
+    }
+
+
+def actual(body: BodyBio) -> dict[str, Any]:
+    return {
+        'star_types': sorted(body.star_types),
+        'materials': set(body.materials),
+        'gasses': body.gasses,
+        'flora': sorted(tuple(flora) for flora in body.flora),
+        'colors': body.colors,
+    }
+
+
+@pytest.mark.parametrize('commander', ['alpha', 'beta', 'none'])
+def test_matches_planet_data(system: tuple[int, int, int], commander: str) -> None:
+    system_id, alpha, beta = system
+    commander_id = {'alpha': alpha, 'beta': beta, 'none': None}[commander]
+    predicted = predict_system_bio(system_id, commander_id)
+
+    session = db.get_session()
+    planets = load_planets(session.get(db.System, system_id), session)
+    assert sorted(predicted) == sorted(planets)
+    for name, planet in planets.items():
+        assert actual(predicted[name]) == expected(planet, commander_id), name
+        assert predicted[name].body_id == planet._data.body_id
+    session.close()
+
+
+def test_flora_scan_counts(system: tuple[int, int, int]) -> None:
+    system_id, alpha, beta = system
+    assert {flora.genus: flora.scan_count for flora in predict_system_bio(system_id, alpha)['AB 1'].flora} == \
+           {BACTERIUM: 3, STRATUM: 0}
+    assert {flora.genus: flora.scan_count for flora in predict_system_bio(system_id, beta)['AB 1'].flora} == \
+           {BACTERIUM: 1, STRATUM: 2}
+    predicted = predict_system_bio(system_id, alpha)
+    assert predicted['AB 1'].star_types and predicted['AB 1'].colors
+    assert predicted['A 3'].colors == {} and predicted['Orphan'].star_types == ()
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+# ExploData module plugin for EDMC
+# Source: https://github.com/Silarn/EDMC-ExploData
+# Licensed under the [GNU Public License (GPL)](http://www.gnu.org/licenses/gpl-2.0.html) version 2 or later.
+
+from pathlib import Path
+from typing import Any, Iterator
+
+import pytest
+from sqlalchemy import event, select
+
+from ExploData.explo_data import db
+from ExploData.explo_data.body_data.batch import BodyBatch, apply_body_batch
+from ExploData.explo_data.edsm_parse import EDSMFetch
+
+
+def star(system: str, name: str, body_id: int) -> dict[str, Any]:
+    return {'name': f'{system} {name}', 'type': 'Star', 'bodyId': body_id, 'subType': 'K (Yellow-Orange) Star',
+            'spectralClass': 'K5', 'luminosity': 'V', 'distanceToArrival': 0, 'solarMasses': 0.7,
+            'belts': [{'name': f'{system} {name} A Belt', 'type': 'Metal Rich'}]}
+
+
+def planet(system: str, name: str, body_id: int) -> dict[str, Any]:
+    return {'name': f'{system} {name}', 'type': 'Planet', 'bodyId': body_id, 'subType': 'Icy body',
+            'distanceToArrival': 100.0 + body_id, 'atmosphereType': 'Thin Nitrogen', 'isLandable': True,
+            'surfaceTemperature': 80.0, 'atmosphereComposition': {'Nitrogen': 90.0, 'Argon': 10.0},
+            'materials': {'Iron': 20.0, 'Nickel': 15.0},
+            'rings': [{'name': f'{system} {name} A Ring', 'type': 'Icy'}]}
+
+
+def edsm_system(name: str, planets: int) -> dict[str, Any]:
+    return {'name': name, 'bodies': [star(name, 'A', 0), *(planet(name, f'A {number + 1}', number + 1)
+                                                           for number in range(planets))]}
+
+
+@pytest.fixture
+def commits(database: Path) -> Iterator[list[int]]:
+    """ The database transactions committed while the test runs """
+
+    committed: list[int] = []
+
+    def record(_conn) -> None:
+        committed.append(1)
+
+    event.listen(db.get_engine(), 'commit', record)
+    yield committed
+    event.remove(db.get_engine(), 'commit', record)
+
+
+def apply(data: dict[str, Any]) -> bool:
+    session = db.get_session()
+    fetcher = EDSMFetch(session, notify=False)
+    fetcher.set_edsm_data(data)
+    committed = fetcher.process_edsm_data()
+    session.close()
+    return committed
+
+
+@pytest.mark.parametrize('planets', [1, 50])
+def test_fetch_is_one_transaction(queries: list[str], commits: list[int], planets: int) -> None:
+    assert apply(edsm_system('Batch Alpha', planets))
+
+    assert len(commits) == 1
+    writes = [query for query in queries if query.lstrip().startswith('INSERT')]
+    # System, stars, star rings, planets, gasses and planet rings, whatever the body count
+    assert len(writes) <= 8
+    with db.get_session() as session:
+        assert len(session.scalars(select(db.Planet.id)).all()) == planets
+        assert len(session.scalars(select(db.PlanetGas.gas_name)).all()) == planets * 2
+        assert len(session.scalars(select(db.PlanetRing.name)).all()) == planets
+
+
+def test_statements_do_not_grow_with_bodies(queries: list[str]) -> None:
+    apply(edsm_system('Batch Small', 2))
+    small = len(queries)
+    queries.clear()
+    apply(edsm_system('Batch Large', 40))
+    assert len(queries) == small
+
+    queries.clear()
+    apply(edsm_system('Batch Large', 40))  # Existing bodies are updated in place
+    assert len(queries) <= small + 2
+
+
+def add_scanned(commander: str) -> int:
+    """ Store a system with a journal scanned planet and star, and an unscanned planet """
+
+    session = db.get_session()
+    scanner, other = db.Commander(name=commander), db.Commander(name=f'{commander} Other')
+    system = db.System(name='Batch Scanned')
+    session.add_all([scanner, other, system])
+    session.flush()
+    main = db.Star(system_id=system.id, name='A', body_id=0, type='M', subclass=2)
+    scanned = db.Planet(system_id=system.id, name='A 1', body_id=1, type='Rocky body', distance=5.0,
+                        parent_stars='A', materials='tin')
+    unscanned = db.Planet(system_id=system.id, name='A 2', body_id=2, type='Rocky body', parent_stars='A',
+                          materials='tin')
+    session.add_all([main, scanned, unscanned])
+    session.flush()
+    session.add_all([db.StarStatus(star_id=main.id, commander_id=scanner.id, scan_state=2),
+                     db.StarStatus(star_id=main.id, commander_id=other.id, scan_state=0),
+                     db.PlanetStatus(planet_id=scanned.id, commander_id=scanner.id, scan_state=1),
+                     db.PlanetStatus(planet_id=scanned.id, commander_id=other.id, scan_state=0),
+                     db.PlanetStatus(planet_id=unscanned.id, commander_id=other.id, scan_state=0)])
+    session.commit()
+    system_id = system.id
+    session.close()
+    return system_id
+
+
+def test_scanned_bodies_are_left_alone(database: Path) -> None:
+    system_id = add_scanned('Batch CMDR')
+    assert apply(edsm_system('Batch Scanned', 2))
+
+    with db.get_session() as session:
+        planets = {planet.name: planet for planet in session.scalars(select(db.Planet)
+                                                                     .where(db.Planet.system_id == system_id))}
+        assert (planets['A 1'].type, planets['A 1'].distance, planets['A 1'].materials) == ('Rocky body', 5.0, 'tin')
+        assert planets['A 1'].gasses == [] and planets['A 1'].rings == []
+        assert planets['A 2'].type == 'Icy body' and planets['A 2'].materials == 'iron,nickel,tin'
+        assert sorted(gas.gas_name for gas in planets['A 2'].gasses) == ['Argon', 'Nitrogen']
+        main = session.scalar(select(db.Star).where(db.Star.system_id == system_id))
+        assert (main.type, main.subclass, main.rings) == ('M', 2, [])
+
+
+def test_overwrite_replaces_scanned_bodies(database: Path) -> None:
+    system_id = add_scanned('Batch CMDR')
+    batch = BodyBatch('Batch Scanned')
+    batch.add_planet('A 1', 7, type='Icy body', distance=50.0, materials='iron')
+    batch.add_star('A', 9, type='K', subclass=5)
+    session = db.get_session()
+    apply_body_batch(session, system_id, batch, overwrite=True)
+    session.commit()
+
+    planet = session.scalar(select(db.Planet).where(db.Planet.system_id == system_id).where(db.Planet.name == 'A 1'))
+    assert (planet.type, planet.distance, planet.body_id, planet.materials) == ('Icy body', 50.0, 1, 'iron,tin')
+    main = session.scalar(select(db.Star).where(db.Star.system_id == system_id))
+    assert (main.type, main.subclass, main.body_id) == ('K', 5, 0)
+    session.close()
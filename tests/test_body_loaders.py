@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+# ExploData module plugin for EDMC
+# Source: https://github.com/Silarn/EDMC-ExploData
+# Licensed under the [GNU Public License (GPL)](http://www.gnu.org/licenses/gpl-2.0.html) version 2 or later.
+
+from sqlalchemy import func, select
+
+from ExploData.explo_data import db
+from ExploData.explo_data.body_data.struct import load_planets, load_stars, load_non_bodies
+
+
+def add_system(name: str, planets: int) -> tuple[int, int, int]:
+    """ Write a system with a star, a non-body and a number of fully populated planets, for two commanders """
+
+    session = db.get_session()
+    commanders = [db.Commander(name=f'{name} CMDR 1'), db.Commander(name=f'{name} CMDR 2')]
+    system = db.System(name=name)
+    session.add_all([*commanders, system])
+    session.flush()
+    star = db.Star(system_id=system.id, name=f'{name} A', body_id=0, type='K')
+    star.rings = [db.StarRing(name=f'{name} A Belt', type='Rocky')]
+    star.statuses = [db.StarStatus(commander_id=commanders[0].id)]
+    non_body = db.NonBody(system_id=system.id, name=f'{name} Cluster', body_id=1)
+    non_body.statuses = [db.NonBodyStatus(commander_id=commanders[0].id)]
+    session.add_all([star, non_body])
+    for number in range(planets):
+        planet = db.Planet(system_id=system.id, name=f'{name} A {number + 1}', body_id=number + 2)
+        planet.statuses = [db.PlanetStatus(commander_id=commanders[0].id)]
+        planet.gasses = [db.PlanetGas(gas_name='Nitrogen', percent=90.0)]
+        planet.geos = [db.PlanetGeo(type='Geysers')]
+        planet.rings = [db.PlanetRing(name=f'{planet.name} A Ring', type='Icy')]
+        flora = db.PlanetFlora(genus='$Codex_Ent_Bacterial_Genus_Name;')
+        flora.scans = [db.FloraScans(commander_id=commanders[0].id, count=1)]
+        flora.waypoints = [db.Waypoint(commander_id=commanders[0].id, type='scan', latitude=0.0, longitude=0.0)]
+        planet.floras = [flora]
+        session.add(planet)
+    session.commit()
+    ids = system.id, commanders[0].id, commanders[1].id
+    session.close()
+    return ids
+
+
+def read_system(system_id: int, commander_id: int, queries: list[str]) -> int:
+    """ Load a system's bodies and read every collection, returning the number of statements run """
+
+    session = db.get_session()
+    system = session.get(db.System, system_id)
+    queries.clear()
+    for planet in load_planets(system, session, commander_id).values():
+        planet.get_status(commander_id)
+        planet.get_gas('Nitrogen')
+        planet.get_geo('Geysers')
+        planet.get_rings()
+        for flora in planet.get_flora():
+            list(flora.scans), list(flora.waypoints)
+    for star in load_stars(system, session, commander_id).values():
+        star.get_status(commander_id)
+        star.get_rings()
+    for non_body in load_non_bodies(system, session, commander_id).values():
+        non_body.get_status(commander_id)
+    count = len(queries)
+    session.close()
+    return count
+
+
+def test_statement_count_does_not_grow_with_bodies(queries: list[str]) -> None:
+    small = add_system('Small', 3)
+    large = add_system('Large', 20)
+    small_count = read_system(small[0], small[1], queries)
+    large_count = read_system(large[0], large[1], queries)
+    assert small_count == large_count
+    assert large_count == 13  # One per table: 8 for planets, 3 for stars, 2 for non-bodies
+
+
+def test_reload_refreshes_objects_in_session(database) -> None:
+    system_id, commander_id, _ = add_system('Reload', 1)
+    session = db.get_session()
+    system = session.get(db.System, system_id)
+    planet = load_planets(system, session, commander_id)['Reload A 1']
+    assert planet.get_gas('Nitrogen') == 90.0
+
+    with db.get_engine().connect() as connection:
+        connection.exec_driver_sql("UPDATE planet_gasses SET percent = 75.0 WHERE gas_name = 'Nitrogen'")
+        connection.exec_driver_sql("UPDATE planets SET type = 'Icy body' WHERE name = 'Reload A 1'")
+        connection.commit()
+
+    planet = load_planets(system, session, commander_id)['Reload A 1']
+    assert planet.get_gas('Nitrogen') == 75.0
+    assert planet.get_type() == 'Icy body'
+    session.close()
+
+
+def test_filtered_statuses_do_not_duplicate_rows(database) -> None:
+    system_id, first, second = add_system('Filtered', 2)
+    session = db.get_session()
+    system = session.get(db.System, system_id)
+    with db.batch_session() as writer:
+        planet_id = writer.scalar(select(db.Planet.id).where(db.Planet.name == 'Filtered A 1'))
+        writer.add(db.PlanetStatus(planet_id=planet_id, commander_id=second))
+
+    planets = load_planets(system, session, first)
+    stars = load_stars(system, session, first)
+    non_bodies = load_non_bodies(system, session, first)
+    planets['Filtered A 1'].get_status(second)
+    planets['Filtered A 1'].get_status(second)
+    stars['Filtered A'].get_status(second)
+    non_bodies['Filtered Cluster'].get_status(second)
+    stars['Filtered A'].get_status(second)
+    session.close()
+
+    for status, key in ((db.PlanetStatus, db.PlanetStatus.planet_id), (db.StarStatus, db.StarStatus.star_id),
+                        (db.NonBodyStatus, db.NonBodyStatus.non_body_id)):
+        duplicates = db.get_session().execute(
+            select(key, status.commander_id).group_by(key, status.commander_id).having(func.count() > 1)
+        ).all()
+        assert duplicates == []
+    db.get_session().close()
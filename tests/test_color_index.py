@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+# ExploData module plugin for EDMC
+# Source: https://github.com/Silarn/EDMC-ExploData
+# Licensed under the [GNU Public License (GPL)](http://www.gnu.org/licenses/gpl-2.0.html) version 2 or later.
+
+from ExploData.explo_data import db
+from ExploData.explo_data.bio_data.codex import bio_codex_map, bio_color_suffix_map, bio_types, parse_variant, \
+    predict_colors
+from ExploData.explo_data.body_data.struct import PlanetData
+
+
+def test_index_matches_parse_variant() -> None:
+    checked = 0
+    mismatches = []
+    for genus, search_set in bio_codex_map.items():
+        for search in sorted(search_set):
+            species = next(species for species in sorted(bio_types[genus]) if species.startswith(search))
+            for suffix, kind in bio_color_suffix_map.items():
+                try:
+                    color = parse_variant(f'{search}{suffix}_Name;')[2]
+                except KeyError:  # Species with their own genus entry have no fallback for missing star classes
+                    color = ''
+                colors = predict_colors([suffix], []) if kind == 'star' else predict_colors([], [suffix.lower()])
+                if colors.get(genus, {}).get(species, set()) != ({color} if color else set()):
+                    mismatches.append((genus, species, suffix, color, colors.get(genus, {}).get(species)))
+                checked += 1
+    assert checked > 1000
+    assert mismatches == []
+
+
+def test_star_types_reduce_to_color_classes() -> None:
+    assert predict_colors(['K_OrangeGiant'], []) == predict_colors(['K'], [])
+    assert predict_colors(['DAV'], []) == predict_colors(['D'], [])
+    assert predict_colors(['WNC'], []) == predict_colors(['W'], [])
+
+
+def test_planet_colors_use_loaded_system_stars(queries: list[str]) -> None:
+    session = db.get_session()
+    system = db.System(name='Test System')
+    system.stars = [db.Star(name='Test System A', body_id=0, type='K'),
+                    db.Star(name='Test System B', body_id=1, type='DAV'),
+                    db.Star(name='Test System C', body_id=2, type='M')]
+    session.add(system)
+    session.commit()
+    planet = PlanetData.from_journal(system, 'Test System A 1', 5, session)
+    planet.add_parent_star('Test System A').add_parent_star('Test System B').add_material('antimony')
+    assert sorted(planet.get_parent_star_types()) == ['DAV', 'K']
+
+    queries.clear()
+    for _ in range(10):
+        colors = planet.predicted_colors()
+    assert queries == []
+    assert colors == predict_colors(['K', 'DAV'], ['antimony'])
+    session.close()
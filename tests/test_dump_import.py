@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+# ExploData module plugin for EDMC
+# Source: https://github.com/Silarn/EDMC-ExploData
+# Licensed under the [GNU Public License (GPL)](http://www.gnu.org/licenses/gpl-2.0.html) version 2 or later.
+
+import gzip
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from ExploData.explo_data import db, dump_import
+
+SOL_ID64 = 10477373803
+
+
+def edsm_bodies(system: str) -> list[dict[str, Any]]:
+    """ EDSM records for a system with a star and a ringed planet """
+
+    return [
+        {'name': system, 'type': 'Star', 'bodyId': 0, 'subType': 'K (Yellow-Orange) Star', 'spectralClass': 'K5',
+         'luminosity': 'V', 'distanceToArrival': 0, 'solarMasses': 0.7, 'orbitalPeriod': None,
+         'rotationalPeriod': 1.5},
+        {'name': f'{system} 1', 'type': 'Planet', 'bodyId': 1, 'subType': 'High metal content world',
+         'terraformingState': 'Not terraformable', 'distanceToArrival': 100, 'atmosphereType': 'Thin Carbon dioxide',
+         'gravity': 0.2, 'surfaceTemperature': 180, 'earthMasses': 0.05, 'isLandable': True, 'orbitalPeriod': 10,
+         'rotationalPeriod': 1, 'volcanismType': 'No volcanism', 'materials': {'Iron': 20, 'Tin': 1},
+         'atmosphereComposition': {'Carbon dioxide': 99.0, 'Sulphur dioxide': 1.0},
+         'rings': [{'name': f'{system} 1 A Ring', 'type': 'Icy'}]},
+    ]
+
+
+@pytest.fixture
+def body_dump(tmp_path: Path) -> Path:
+    """
+    A gzipped EDSM body dump of 2000 systems, one body per line in a JSON array. Even systems use the Sol ID64, so
+    their boxel is in the Inner Orion Spur; odd systems are placed elsewhere.
+    """
+
+    path = tmp_path / 'bodies.json.gz'
+    with gzip.open(path, 'wt') as dump:
+        dump.write('[\n')
+        lines = []
+        for number in range(2000):
+            name = f'Dump {number}'
+            id64 = SOL_ID64 if number % 2 == 0 else 1 + (number << 12)
+            for body in edsm_bodies(name):
+                lines.append('    ' + json.dumps({**body, 'systemName': name, 'systemId64': id64}))
+        dump.write(',\n'.join(lines))
+        dump.write('\n]\n')
+    return path
+
+
+@pytest.fixture
+def galaxy_dump(tmp_path: Path) -> Path:
+    """ A plain Spansh galaxy dump with nested bodies """
+
+    path = tmp_path / 'galaxy.json'
+    systems = [
+        {'name': 'Galaxy A', 'coords': {'x': 0.0, 'y': 0.0, 'z': 0.0}, 'bodyCount': 3,
+         'bodies': edsm_bodies('Galaxy A')},
+        {'name': 'Galaxy B', 'coords': {'x': 25000.0, 'y': 0.0, 'z': 25000.0}, 'bodies': []},
+    ]
+    path.write_text('[\n' + ',\n'.join(json.dumps(system) for system in systems) + '\n]\n')
+    return path
+
+
+def count(table: str) -> int:
+    return db.run_query(db.get_engine(), f'SELECT COUNT(*) FROM {table}').scalar()
+
+
+def test_body_dump_region_filter(database, body_dump: Path) -> None:
+    assert dump_import.import_dump(body_dump, region='Inner Orion Spur') == (1000, 2000)
+    assert dump_import.get_counts() == (1000, 2000)
+    assert dump_import.get_progress()[0] == dump_import.get_progress()[1] == body_dump.stat().st_size
+    assert count('systems') == 1000
+    assert (count('stars'), count('planets'), count('planet_rings'), count('planet_gasses')) == (1000, 1000, 1000, 2000)
+    assert db.run_query(db.get_engine(), "SELECT COUNT(*) FROM systems WHERE name = 'Dump 1'").scalar() == 0
+
+
+def test_galaxy_dump_bounding_box(database, galaxy_dump: Path) -> None:
+    assert dump_import.import_dump(galaxy_dump, bbox=((-100, -100, -100), (100, 100, 100))) == (1, 2)
+    assert dump_import.import_dump(galaxy_dump) == (2, 2)
+    rows = db.run_query(db.get_engine(), 'SELECT name, x, z, body_count FROM systems ORDER BY name').all()
+    assert [tuple(row) for row in rows] == [('Galaxy A', 0.0, 0.0, 3), ('Galaxy B', 25000.0, 25000.0, 1)]
+
+
+def test_failed_chunks_are_not_counted(database, body_dump: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    write_systems = dump_import.write_systems
+
+    def failing_write(session, systems):
+        if any(system.name == 'Dump 500' for system in systems):
+            raise RuntimeError('Simulated write failure')
+        return write_systems(session, systems)
+
+    monkeypatch.setattr(dump_import, 'write_systems', failing_write)
+    assert dump_import.import_dump(body_dump, chunk_size=100) == (1900, 3800)
+    assert dump_import.get_counts() == (1900, 3800)
+    assert count('systems') == 1900
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+# ExploData module plugin for EDMC
+# Source: https://github.com/Silarn/EDMC-ExploData
+# Licensed under the [GNU Public License (GPL)](http://www.gnu.org/licenses/gpl-2.0.html) version 2 or later.
+
+from pathlib import Path
+from time import time
+from typing import Iterator
+
+import pytest
+from sqlalchemy import func, select, update
+
+from conftest import StubServer
+from ExploData.explo_data import db, edsm_cache, edsm_parse
+from ExploData.explo_data.edsm_client import EDSMClient
+from ExploData.explo_data.edsm_parse import EDSMFetch
+
+
+def star(name: str) -> dict:
+    return {'name': name, 'type': 'Star', 'bodyId': 0, 'subType': 'K (Yellow-Orange) Star', 'spectralClass': 'K5',
+            'luminosity': 'V', 'distanceToArrival': 0, 'solarMasses': 0.7, 'rotationalPeriod': 1.5}
+
+
+def age(system_name: str, seconds: float) -> None:
+    with db.get_engine().begin() as connection:
+        connection.execute(update(db.EDSMCache).where(db.EDSMCache.system == system_name)
+                           .values(fetched=time() - seconds))
+
+
+def apply(client: EDSMClient, system_name: str) -> None:
+    """ Fetch a system and write it, as the EDSM response handler does """
+
+    session = db.get_session()
+    fetcher = EDSMFetch(session)
+    fetcher.set_edsm_data(client.fetch(system_name))
+    fetcher.process_cached_edsm_data(system_name)
+    session.close()
+
+
+def star_count() -> int:
+    with db.get_session() as session:
+        return session.scalar(select(func.count(db.Star.id)))
+
+
+@pytest.fixture
+def client(database: Path, server: StubServer) -> Iterator[EDSMClient]:
+    server.bodies['Cache Alpha'] = [star('Cache Alpha')]
+    edsm_client = EDSMClient(edsm_parse.handle_edsm_response, server.url, interval=0.0)
+    yield edsm_client
+    edsm_client.shutdown()
+
+
+def test_fresh_entry_skips_request(client: EDSMClient, server: StubServer) -> None:
+    first = client.fetch('Cache Alpha')
+    assert client.fetch('Cache Alpha') == first
+    assert server.names() == ['Cache Alpha']
+
+
+def test_stale_entry_is_revalidated(client: EDSMClient, server: StubServer) -> None:
+    first = client.fetch('Cache Alpha')
+    etag = edsm_cache.get_entry('Cache Alpha').etag
+    age('Cache Alpha', edsm_cache.CACHE_FRESH_TIME + 60)
+    assert not edsm_cache.get_entry('Cache Alpha').is_fresh()
+
+    assert client.fetch('Cache Alpha') == first
+    assert server.names() == ['Cache Alpha', 'Cache Alpha']
+    assert server.headers[1]['If-None-Match'] == etag
+    assert edsm_cache.get_entry('Cache Alpha').is_fresh()
+
+
+def test_evict_expired_and_oversized(database: Path) -> None:
+    for number in range(4):
+        edsm_cache.store(f'Cache {number}', b'{"name": "Cache %d", "bodies": []}' % number, None, None)
+        age(f'Cache {number}', 100 - number)
+    age('Cache 0', edsm_cache.CACHE_MAX_AGE + 60)
+    size = len(edsm_cache.get_entry('Cache 1').data)
+
+    assert edsm_cache.evict() == 1
+    assert edsm_cache.get_entry('Cache 0') is None
+    assert edsm_cache.evict(max_size=size * 2) == 1
+    assert edsm_cache.get_entry('Cache 1') is None
+    assert edsm_cache.get_entry('Cache 2') and edsm_cache.get_entry('Cache 3')
+
+
+def test_applied_payload_skips_write(client: EDSMClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    writes: list[int] = []
+    apply_body_batch = edsm_parse.apply_body_batch
+
+    def counted(*args, **kwargs) -> None:
+        writes.append(1)
+        apply_body_batch(*args, **kwargs)
+
+    monkeypatch.setattr(edsm_parse, 'apply_body_batch', counted)
+    apply(client, 'Cache Alpha')
+    assert edsm_cache.get_entry('Cache Alpha').is_applied()
+    apply(client, 'Cache Alpha')
+
+    assert len(writes) == 1
+    assert star_count() == 1
+
+
+def test_failed_write_is_not_marked_applied(client: EDSMClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    def fail(*_args, **_kwargs) -> None:
+        raise RuntimeError('Write failed')
+
+    with monkeypatch.context() as patch:
+        patch.setattr(edsm_parse, 'apply_body_batch', fail)
+        apply(client, 'Cache Alpha')
+    assert not edsm_cache.get_entry('Cache Alpha').is_applied()
+    assert star_count() == 0
+
+    apply(client, 'Cache Alpha')
+    assert edsm_cache.get_entry('Cache Alpha').is_applied()
+    assert star_count() == 1
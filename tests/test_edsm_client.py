@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+# ExploData module plugin for EDMC
+# Source: https://github.com/Silarn/EDMC-ExploData
+# Licensed under the [GNU Public License (GPL)](http://www.gnu.org/licenses/gpl-2.0.html) version 2 or later.
+
+import threading
+from typing import Mapping, Optional
+
+from conftest import StubServer
+from ExploData.explo_data.edsm_client import EDSMClient, PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_PREFETCH
+
+
+class Results:
+    """ Collects handler calls, and signals once the expected number arrived """
+
+    def __init__(self, expected: int):
+        self.responses: dict[str, Optional[Mapping]] = {}
+        self.expected = expected
+        self.done = threading.Event()
+        self._lock = threading.Lock()
+
+    def __call__(self, name: str, data: Optional[Mapping]) -> None:
+        with self._lock:
+            self.responses[name] = data
+            if len(self.responses) >= self.expected:
+                self.done.set()
+
+
+def hold_worker(server: StubServer, client: EDSMClient) -> None:
+    """ Occupy the single worker with a held request, so later submissions stay queued """
+
+    server.release.clear()
+    client.submit('Blocker', PRIORITY_NORMAL)
+    assert server.received.wait(5)
+
+
+def test_priority_order(server: StubServer) -> None:
+    results = Results(4)
+    client = EDSMClient(results, server.url, workers=1, interval=0.0, use_cache=False)
+    hold_worker(server, client)
+    client.submit('Prefetched', PRIORITY_PREFETCH)
+    client.submit('Normal', PRIORITY_NORMAL)
+    client.submit('Urgent', PRIORITY_HIGH)
+    server.release.set()
+    assert results.done.wait(5)
+    client.shutdown()
+
+    assert server.names() == ['Blocker', 'Urgent', 'Normal', 'Prefetched']
+    assert results.responses['Urgent'] == {'name': 'Urgent', 'bodies': []}
+
+
+def test_duplicate_submissions_fetch_once(server: StubServer) -> None:
+    results = Results(3)
+    client = EDSMClient(results, server.url, workers=1, interval=0.0, use_cache=False)
+    hold_worker(server, client)
+    assert not client.submit('Blocker')  # In flight
+    assert client.submit('Sol', PRIORITY_NORMAL)
+    assert not client.submit('Sol', PRIORITY_NORMAL)
+    assert not client.submit('Sol', PRIORITY_PREFETCH)
+    assert client.submit('Later', PRIORITY_NORMAL)
+    assert client.submit('Later', PRIORITY_HIGH)  # Raised, still fetched once
+    assert client.pending_count() == 3
+    server.release.set()
+    assert results.done.wait(5)
+    client.shutdown()
+
+    assert server.names() == ['Blocker', 'Later', 'Sol']
+    assert client.pending_count() == 0
+
+
+def test_request_starts_are_spaced(server: StubServer) -> None:
+    interval = 0.2
+    results = Results(5)
+    client = EDSMClient(results, server.url, workers=3, interval=interval, use_cache=False)
+    for number in range(5):
+        client.submit(f'System {number}')
+    assert results.done.wait(10)
+    client.shutdown()
+
+    starts = sorted(start for _, start in server.requests)
+    assert len(starts) == 5
+    gaps = [later - earlier for earlier, later in zip(starts, starts[1:])]
+    assert min(gaps) >= interval * 0.9
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+# ExploData module plugin for EDMC
+# Source: https://github.com/Silarn/EDMC-ExploData
+# Licensed under the [GNU Public License (GPL)](http://www.gnu.org/licenses/gpl-2.0.html) version 2 or later.
+
+import json
+from pathlib import Path
+from time import monotonic, sleep
+from typing import Any, Iterator, Optional
+
+import pytest
+
+from conftest import StubServer
+from ExploData.explo_data import db, edsm_parse, journal_parse
+from ExploData.explo_data.edsm_client import EDSMClient
+from ExploData.explo_data.journal_parse import JournalParse
+
+
+class Frame:
+    """ Stand-in for the tkinter frame events are generated on """
+
+    def __init__(self):
+        self.events: list[str] = []
+
+    def bind(self, *_args) -> None:
+        pass
+
+    def event_generate(self, name: str) -> None:
+        self.events.append(name)
+
+
+def wait_idle(client: EDSMClient) -> None:
+    deadline = monotonic() + 5
+    while client.pending_count() and monotonic() < deadline:
+        sleep(0.01)
+    assert not client.pending_count()
+
+
+@pytest.fixture
+def frame(database: Path, server: StubServer, monkeypatch: pytest.MonkeyPatch) -> Iterator[Frame]:
+    events = Frame()
+    client = EDSMClient(edsm_parse.handle_edsm_response, server.url, interval=0.0)
+    monkeypatch.setattr(edsm_parse.this, 'edsm_client', client)
+    monkeypatch.setattr(edsm_parse.this, 'edsm_fetch_callbacks', {})
+    monkeypatch.setattr(edsm_parse.this, 'started_fetches', set())
+    edsm_parse.register_edsm_callbacks(events, 'test', None, None)
+    yield events
+    client.shutdown()
+
+
+def test_prefetch_fires_no_events(frame: Frame, server: StubServer) -> None:
+    edsm_parse.prefetch_systems(['Prefetch Alpha', 'Prefetch Beta'])
+    wait_idle(edsm_parse.get_client())
+    assert sorted(server.names()) == ['Prefetch Alpha', 'Prefetch Beta']
+    assert frame.events == []
+
+    edsm_parse.edsm_fetch('Prefetch Gamma')
+    wait_idle(edsm_parse.get_client())
+    assert frame.events == ['<<test_edsm_start>>', '<<test_edsm_finish>>']
+
+    frame.events.clear()
+    edsm_parse.prefetch_systems(['Prefetch Gamma'])  # Cached and already applied
+    wait_idle(edsm_parse.get_client())
+    assert frame.events == []
+
+
+def test_raised_prefetch_fires_events(frame: Frame, server: StubServer) -> None:
+    server.release.clear()
+    edsm_parse.prefetch_systems(['Prefetch Blocker', 'Prefetch Blocker 2', 'Prefetch Alpha'])
+    assert server.received.wait(5)
+    edsm_parse.edsm_fetch('Prefetch Alpha')
+    server.release.set()
+    wait_idle(edsm_parse.get_client())
+
+    assert frame.events == ['<<test_edsm_start>>', '<<test_edsm_finish>>']
+
+
+def route(*systems: str) -> list[dict[str, Any]]:
+    return [{'StarSystem': system, 'SystemAddress': number, 'StarPos': [0.0, 0.0, 0.0], 'StarClass': 'K'}
+            for number, system in enumerate(systems)]
+
+
+@pytest.mark.parametrize('route_dir', [True, False], ids=['tail', 'hook'])
+def test_route_prefetch(database: Path, monkeypatch: pytest.MonkeyPatch, route_dir: bool) -> None:
+    prefetched: list[str] = []
+    monkeypatch.setattr(journal_parse, 'prefetch_systems', prefetched.extend)
+    monkeypatch.setattr(journal_parse.this, 'route_prefetch', 2)
+    journal_dir = database / 'journals'
+    (journal_dir / 'NavRoute.json').write_text(json.dumps({
+        'timestamp': '2026-01-01T00:00:00Z', 'event': 'NavRoute', 'Route': route('Route A', 'Route B', 'Route C')
+    }))
+    nav_route: dict[str, Any] = {'timestamp': '2026-01-01T00:00:00Z', 'event': 'NavRoute'}
+    if not route_dir:
+        nav_route['Route'] = route('Route A', 'Route D')
+    processor = JournalParse(db.get_session(), live=True, coalesce_scans=True,
+                             route_dir=str(journal_dir) if route_dir else None)
+    processor.parse_lines([json.dumps(nav_route).encode()])
+
+    assert prefetched == (['Route B', 'Route C'] if route_dir else ['Route D'])
+
+
+def test_unreadable_nav_route(app_dir: Path) -> None:
+    assert journal_parse.load_nav_route(str(app_dir / 'journals')) is None
+    (app_dir / 'journals' / 'NavRoute.json').write_text('{"event": "NavRoute", ')
+    assert journal_parse.load_nav_route(str(app_dir / 'journals')) is None
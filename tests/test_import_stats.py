@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+# ExploData module plugin for EDMC
+# Source: https://github.com/Silarn/EDMC-ExploData
+# Licensed under the [GNU Public License (GPL)](http://www.gnu.org/licenses/gpl-2.0.html) version 2 or later.
+
+import json
+from collections import Counter
+from concurrent.futures import Executor
+from pathlib import Path
+from threading import Event
+from typing import Iterator, Optional
+
+import pytest
+
+from ExploData.explo_data import db, journal_parse
+
+FIRST = 'Journal.2026-01-01T000000.01.log'
+SECOND = 'Journal.2026-01-02T000000.01.log'
+
+
+def write(journal: Path, *systems: str) -> int:
+    with open(journal, 'a') as log:
+        for entry in [{'event': 'LoadGame', 'Commander': 'Stats CMDR'},
+                      *({'event': 'FSDJump', 'StarSystem': system, 'StarPos': [1.0, 2.0, 3.0]} for system in systems)]:
+            log.write(json.dumps({'timestamp': '2026-01-01T00:00:00Z', **entry}) + '\n')
+    return journal.stat().st_size
+
+
+@pytest.fixture
+def stats() -> Iterator[None]:
+    yield
+    journal_parse.reset_import_stats(0)
+    journal_parse.this.import_start = 0.0
+    journal_parse.this.journal_progress = (0, 0)
+
+
+def test_batches_are_totalled(stats: None) -> None:
+    journal_parse.reset_import_stats(1000)
+    journal_parse.record_import_bytes(200)
+    assert journal_parse.get_import_stats().eta is None
+
+    journal_parse.record_import_batch(300, 0.5, 0.25, Counter({'FSDJump': 2, 'Scan': 3}), 0.125, 1.0)
+    journal_parse.record_import_batch(100, 0.5, 0.75, Counter({'Scan': 1}), 0.125, 1.0)
+    imported = journal_parse.get_import_stats()
+    assert (imported.bytes_done, imported.bytes_total, imported.events) == (600, 1000, 6)
+    assert imported.event_counts == {'FSDJump': 2, 'Scan': 4}
+    assert (imported.commits, imported.commit_time, imported.max_commit_latency) == (2, 1.0, 0.75)
+    assert (imported.lock_wait, imported.decode_time, imported.process_time) == (1.0, 0.25, 2.0)
+    # Only bytes read in this import count toward the rate, so the ETA is 400 bytes at 400 bytes per elapsed time
+    assert imported.eta == pytest.approx(imported.elapsed, rel=0.1)
+
+    journal_parse.reset_import_stats(50)
+    reset = journal_parse.get_import_stats()
+    assert (reset.bytes_done, reset.bytes_total, reset.events, reset.commits, reset.event_counts, reset.eta) == \
+           (0, 50, 0, 0, {}, None)
+
+
+def test_import_reaches_total(database: Path, stats: None) -> None:
+    journal_dir = database / 'journals'
+    size = write(journal_dir / FIRST, 'Stats Alpha') + write(journal_dir / SECOND, 'Stats Beta', 'Stats Gamma')
+    journal_parse.journal_worker()
+
+    imported = journal_parse.get_import_stats()
+    assert (imported.bytes_done, imported.bytes_total) == (size, size)
+    assert imported.event_counts['FSDJump'] == 3 and imported.commits >= 2
+    assert imported.eta == 0 and imported.files_done == imported.files_total == 2
+
+
+def test_resumed_import_reaches_total(database: Path, stats: None) -> None:
+    journal_dir = database / 'journals'
+    offset = write(journal_dir / FIRST, 'Stats Alpha')
+    size = write(journal_dir / FIRST, 'Stats Beta')
+    with db.get_session() as session:
+        session.add(db.JournalCheckpoint(journal=FIRST, offset=offset, commander='Stats CMDR'))
+        session.commit()
+    journal_parse.journal_worker()
+
+    imported = journal_parse.get_import_stats()
+    assert (imported.bytes_done, imported.bytes_total) == (size, size)
+    assert imported.event_counts['FSDJump'] == 1 and imported.eta == 0
+
+
+def test_skipped_files_count_as_done(database: Path, stats: None, monkeypatch: pytest.MonkeyPatch) -> None:
+    journal_dir = database / 'journals'
+    size = write(journal_dir / FIRST, 'Stats Alpha') + write(journal_dir / SECOND, 'Stats Beta')
+    parse_journal = journal_parse.parse_journal
+
+    def logged_first(journal: Path, event: Event, decoder: Optional[Executor] = None,
+                     status: Optional[int] = None) -> int:
+        if journal.name == FIRST:
+            return 2  # Logged by another import after the manifest was read
+        return parse_journal(journal, event, decoder, status)
+
+    monkeypatch.setattr(journal_parse, 'parse_journal', logged_first)
+    journal_parse.journal_worker()
+
+    imported = journal_parse.get_import_stats()
+    assert (imported.bytes_done, imported.bytes_total) == (size, size)
+    assert imported.event_counts['FSDJump'] == 1 and imported.eta == 0
+    assert (imported.files_done, imported.files_total) == (1, 1)
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+# ExploData module plugin for EDMC
+# Source: https://github.com/Silarn/EDMC-ExploData
+# Licensed under the [GNU Public License (GPL)](http://www.gnu.org/licenses/gpl-2.0.html) version 2 or later.
+
+import json
+from pathlib import Path
+from threading import Event
+
+from sqlalchemy import func, select
+
+from ExploData.explo_data import db, journal_parse
+from ExploData.explo_data.db import JOURNAL_IMPORTED, JOURNAL_PARTIAL, JOURNAL_PENDING
+from ExploData.explo_data.journal_parse import JournalFile, refresh_manifest
+
+FIRST = 'Journal.2026-01-01T000000.01.log'
+SECOND = 'Journal.2026-01-02T000000.01.log'
+THIRD = 'Journal.2026-01-03T000000.01.log'
+
+
+def write(journal: Path, *systems: str) -> None:
+    with open(journal, 'a') as log:
+        for entry in [{'event': 'LoadGame', 'Commander': 'Manifest CMDR'},
+                      *({'event': 'FSDJump', 'StarSystem': system, 'StarPos': [1.0, 2.0, 3.0]} for system in systems)]:
+            log.write(json.dumps({'timestamp': '2026-01-01T00:00:00Z', **entry}) + '\n')
+
+
+def statuses() -> dict[str, int]:
+    with db.get_session() as session:
+        return {row.journal: row.status for row in session.execute(select(db.JournalManifest.journal,
+                                                                          db.JournalManifest.status))}
+
+
+def pending(journal_dir: Path) -> list[tuple[str, int, int]]:
+    return [(journal.path.name, journal.size, journal.status) for journal in refresh_manifest(str(journal_dir))]
+
+
+def test_new_and_grown_files(database: Path) -> None:
+    journal_dir = database / 'journals'
+    write(journal_dir / SECOND, 'Manifest Beta')
+    write(journal_dir / FIRST, 'Manifest Alpha')
+    (journal_dir / 'Status.json').write_text('{}')
+
+    first_size = (journal_dir / FIRST).stat().st_size
+    second_size = (journal_dir / SECOND).stat().st_size
+    assert pending(journal_dir) == [(FIRST, first_size, JOURNAL_PENDING), (SECOND, second_size, JOURNAL_PENDING)]
+    assert pending(journal_dir) == [(FIRST, first_size, JOURNAL_PENDING), (SECOND, second_size, JOURNAL_PENDING)]
+
+    write(journal_dir / SECOND, 'Manifest Gamma')
+    grown = (journal_dir / SECOND).stat().st_size
+    assert pending(journal_dir) == [(FIRST, first_size, JOURNAL_PENDING), (SECOND, grown, JOURNAL_PENDING)]
+
+    (journal_dir / FIRST).unlink()
+    assert pending(journal_dir) == [(SECOND, grown, JOURNAL_PENDING)]
+    assert statuses() == {SECOND: JOURNAL_PENDING}
+
+
+def test_logged_and_checkpointed_files(database: Path) -> None:
+    journal_dir = database / 'journals'
+    for name in (FIRST, SECOND, THIRD):
+        write(journal_dir / name, 'Manifest Alpha')
+    session = db.get_session()
+    session.add_all([db.JournalLog(journal=FIRST),
+                     db.JournalCheckpoint(journal=SECOND, offset=10, commander='Manifest CMDR')])
+    session.commit()
+    session.close()
+
+    assert [(name, status) for name, _, status in pending(journal_dir)] == \
+           [(SECOND, JOURNAL_PARTIAL), (THIRD, JOURNAL_PENDING)]
+    assert statuses() == {FIRST: JOURNAL_IMPORTED, SECOND: JOURNAL_PARTIAL, THIRD: JOURNAL_PENDING}
+
+
+def test_import_updates_manifest(database: Path) -> None:
+    journal_dir = database / 'journals'
+    write(journal_dir / FIRST, 'Manifest Alpha')
+    write(journal_dir / SECOND, 'Manifest Beta')
+    journal_parse.journal_worker()
+
+    assert statuses() == {FIRST: JOURNAL_IMPORTED, SECOND: JOURNAL_IMPORTED}
+    assert pending(journal_dir) == []
+    write(journal_dir / THIRD, 'Manifest Gamma')
+    assert [name for name, _, _ in pending(journal_dir)] == [THIRD]
+
+
+def test_parse_uses_manifest_status(database: Path, queries: list[str]) -> None:
+    journal_dir = database / 'journals'
+    write(journal_dir / FIRST, 'Manifest Alpha')
+    write(journal_dir / SECOND, 'Manifest Beta')
+    journals: list[JournalFile] = refresh_manifest(str(journal_dir))
+    queries.clear()
+
+    for journal in journals:
+        assert journal_parse.parse_journal(journal.path, Event(), status=journal.status) == 0
+    lookups = [query for query in queries if query.lstrip().startswith('SELECT')]
+    assert not any('journal_log' in query or 'journal_checkpoints' in query for query in lookups)
+    assert journal_parse.parse_journal(journal_dir / FIRST, Event(), status=JOURNAL_IMPORTED) == 2
+    with db.get_session() as session:
+        assert session.scalar(select(func.count(db.System.id))) == 2
+
+
+def test_partial_file_resumes(database: Path) -> None:
+    journal_dir = database / 'journals'
+    write(journal_dir / FIRST, 'Manifest Alpha')
+    offset = (journal_dir / FIRST).stat().st_size
+    with open(journal_dir / FIRST, 'a') as log:
+        log.write(json.dumps({'timestamp': '2026-01-01T00:00:00Z', 'event': 'FSDJump', 'StarSystem': 'Manifest Beta',
+                              'StarPos': [1.0, 2.0, 3.0]}) + '\n')
+    session = db.get_session()
+    session.add(db.JournalCheckpoint(journal=FIRST, offset=offset, commander='Manifest CMDR'))
+    session.commit()
+    session.close()
+
+    journal, = refresh_manifest(str(journal_dir))
+    assert journal.status == JOURNAL_PARTIAL
+    assert journal_parse.parse_journal(journal.path, Event(), status=journal.status) == 0
+    with db.get_session() as session:
+        assert list(session.scalars(select(db.System.name))) == ['Manifest Beta']
+    assert statuses() == {FIRST: JOURNAL_IMPORTED}
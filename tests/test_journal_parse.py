@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+# ExploData module plugin for EDMC
+# Source: https://github.com/Silarn/EDMC-ExploData
+# Licensed under the [GNU Public License (GPL)](http://www.gnu.org/licenses/gpl-2.0.html) version 2 or later.
+
+import json
+import sys
+from pathlib import Path
+from threading import Event
+from typing import Any
+
+import pytest
+from sqlalchemy import func, select
+
+from ExploData.explo_data import db, journal_parse
+from ExploData.explo_data.journal_parse import JournalParse
+
+SYSTEM = 'Parse Alpha'
+
+
+def event(name: str, **data: Any) -> dict[str, Any]:
+    return {'timestamp': '2026-01-01T00:00:00Z', 'event': name, **data}
+
+
+def jump(system: str = SYSTEM) -> dict[str, Any]:
+    return event('FSDJump', StarSystem=system, StarPos=[1.0, 2.0, 3.0], SystemAddress=1)
+
+
+def planet_scan(number: int) -> dict[str, Any]:
+    return event('Scan', ScanType='Detailed', BodyName=f'{SYSTEM} {number}', BodyID=number, StarSystem=SYSTEM,
+                 SystemAddress=1, DistanceFromArrivalLS=100.0, PlanetClass='Icy body', MassEM=0.1,
+                 SurfaceGravity=1.0, Radius=1000000.0, RotationPeriod=100000.0, WasDiscovered=False,
+                 WasMapped=False)
+
+
+def count(model: type[db.Base]) -> int:
+    with db.get_session() as session:
+        return session.scalar(select(func.count()).select_from(model))
+
+
+@pytest.mark.parametrize('encode', [True, False], ids=['lines', 'entries'])
+def test_failed_line_keeps_queued_scans(database: Path, encode: bool) -> None:
+    entries = [event('Commander', Name='Parse CMDR'), jump(), planet_scan(1),
+               event('SAAScanComplete', SystemAddress=1, BodyID=1, ProbesUsed=5, EfficiencyTarget=6)]
+    processor = JournalParse(db.get_session(), coalesce_scans=True)
+    failed = processor.parse_lines([json.dumps(entry).encode() if encode else entry for entry in entries])
+
+    assert len(failed) == 1
+    assert count(db.Planet) == 1
+
+
+def test_failed_line_continues_import(database: Path) -> None:
+    journal = database / 'journals' / 'Journal.2026-01-01T000000.01.log'
+    journal.write_text(''.join(json.dumps(entry) + '\n' for entry in [
+        event('LoadGame', Commander='Parse CMDR'), jump(), event('FSDJump', StarPos=[1.0, 2.0, 3.0]),
+        jump('Parse Beta')
+    ]))
+    processor = JournalParse(db.get_session(), coalesce_scans=True)
+
+    assert processor.parse_journal(journal, Event()) == 0
+    assert count(db.System) == 2
+    assert count(db.JournalLog) == 1
+    assert count(db.JournalCheckpoint) == 0
+
+
+def test_frozen_build_skips_decode_processes(database: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    def no_processes(*_args, **_kwargs) -> None:
+        raise AssertionError('Decode processes started in a frozen build')
+
+    (database / 'journals' / 'Journal.2026-01-01T000000.01.log').write_text(''.join(
+        json.dumps(entry) + '\n' for entry in [event('LoadGame', Commander='Parse CMDR'), jump()]
+    ))
+    monkeypatch.setattr(sys, 'frozen', True, raising=False)
+    monkeypatch.setattr(journal_parse, 'ProcessPoolExecutor', no_processes)
+    monkeypatch.setattr(journal_parse.this, 'decode_processes', 2)
+    journal_parse.journal_worker()
+
+    assert not journal_parse.has_error()
+    assert count(db.System) == 1
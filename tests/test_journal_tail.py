@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+# ExploData module plugin for EDMC
+# Source: https://github.com/Silarn/EDMC-ExploData
+# Licensed under the [GNU Public License (GPL)](http://www.gnu.org/licenses/gpl-2.0.html) version 2 or later.
+
+import json
+import threading
+from pathlib import Path
+from typing import Any, Iterator, Mapping
+
+import pytest
+from sqlalchemy import select
+
+from ExploData.explo_data import db, journal_parse, journal_tail
+
+
+def write_journal(journal: Path, events: list[dict[str, Any]]) -> None:
+    with open(journal, 'a', encoding='utf-8') as journal_file:
+        for event in events:
+            journal_file.write(json.dumps({'timestamp': '2026-01-01T00:00:00Z', **event}) + '\n')
+
+
+def jump(system: str) -> dict[str, Any]:
+    return {'event': 'FSDJump', 'StarSystem': system, 'StarPos': [1.0, 2.0, 3.0], 'SystemAddress': 1}
+
+
+@pytest.fixture
+def tail(database: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[Path]:
+    """ The journal directory, followed by the tail with callbacks running on the tail thread """
+
+    monkeypatch.setattr(journal_parse.this, 'event_callbacks', {})
+    yield database / 'journals'
+    journal_tail.shutdown()
+    journal_tail.this.tail_thread = None
+    journal_tail.this.journal = None
+    journal_tail.this.offset = 0
+
+
+def test_callbacks_fire_after_commit(tail: Path) -> None:
+    seen: list[tuple[str, bool]] = []
+    done = threading.Event()
+
+    def on_jump(entry: Mapping[str, Any]) -> None:
+        with db.get_engine().connect() as connection:
+            found = connection.scalar(select(db.System.id).where(db.System.name == entry['StarSystem']))
+        seen.append((entry['StarSystem'], found is not None))
+        if entry['StarSystem'] == 'Tail Beta':
+            done.set()
+
+    journal_parse.register_event_callbacks({'FSDJump'}, on_jump)
+    journal = tail / 'Journal.2026-01-01T000000.01.log'
+    write_journal(journal, [{'event': 'Commander', 'Name': 'Tail CMDR'},
+                            {'event': 'LoadGame', 'Commander': 'Tail CMDR'}, jump('Tail Alpha')])
+    assert journal_tail.start_tail(str(tail))
+    write_journal(journal, [jump('Tail Beta')])
+    journal_tail.notify()
+
+    assert done.wait(10)
+    assert seen == [('Tail Alpha', True), ('Tail Beta', True)]
+
+
+def test_failed_lines_do_not_fire(tail: Path) -> None:
+    seen: list[str] = []
+    done = threading.Event()
+
+    def on_event(entry: Mapping[str, Any]) -> None:
+        seen.append(entry['event'])
+        if entry['event'] == 'FSSAllBodiesFound':
+            done.set()
+
+    journal_parse.register_event_callbacks({'FSDJump', 'FSSDiscoveryScan', 'FSSAllBodiesFound'}, on_event)
+    write_journal(tail / 'Journal.2026-01-01T000000.01.log', [
+        {'event': 'Commander', 'Name': 'Tail CMDR'}, jump('Tail Alpha'), {'event': 'FSSDiscoveryScan'},
+        {'event': 'FSSAllBodiesFound', 'SystemName': 'Tail Alpha', 'Count': 1}
+    ])
+    assert journal_tail.start_tail(str(tail))
+
+    assert done.wait(10)
+    assert seen == ['FSDJump', 'FSSAllBodiesFound']
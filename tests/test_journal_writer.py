@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+# ExploData module plugin for EDMC
+# Source: https://github.com/Silarn/EDMC-ExploData
+# Licensed under the [GNU Public License (GPL)](http://www.gnu.org/licenses/gpl-2.0.html) version 2 or later.
+
+from pathlib import Path
+from time import monotonic
+from typing import Any, Mapping
+
+import pytest
+from sqlalchemy import func, select
+
+from ExploData.explo_data import db, journal_parse, journal_writer
+from ExploData.explo_data.journal_parse import JournalParse
+from ExploData.explo_data.journal_writer import QueuedEvent
+
+
+def queued(entry: dict[str, Any]) -> QueuedEvent:
+    return QueuedEvent('Writer CMDR', 'Writer Alpha', [1.0, 2.0, 3.0], entry, monotonic())
+
+
+@pytest.fixture
+def seen(database: Path, monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    """ The events passed to callbacks, which run on the writing thread """
+
+    events: list[str] = []
+
+    def record(entry: Mapping[str, Any]) -> None:
+        events.append(entry['event'])
+
+    monkeypatch.setattr(journal_parse.this, 'event_callbacks', {})
+    monkeypatch.setattr(journal_writer.this, 'dispatch_frame', None)
+    journal_parse.register_event_callbacks({'FSDJump', 'FSSDiscoveryScan', 'FSSAllBodiesFound'}, record)
+    return events
+
+
+def test_failed_events_are_not_dispatched(seen: list[str]) -> None:
+    processor = JournalParse(db.get_session(), live=True, coalesce_scans=True)
+    journal_writer.write_events(processor, [
+        queued({'event': 'FSDJump', 'StarSystem': 'Writer Alpha'}), queued({'event': 'FSSDiscoveryScan'}),
+        queued({'event': 'FSSAllBodiesFound', 'SystemName': 'Writer Alpha', 'Count': 1})
+    ])
+
+    assert seen == ['FSDJump', 'FSSAllBodiesFound']
+
+
+def test_failed_batch_is_not_dispatched(seen: list[str], monkeypatch: pytest.MonkeyPatch) -> None:
+    processor = JournalParse(db.get_session(), live=True, coalesce_scans=True)
+
+    def fail() -> None:
+        raise RuntimeError('Commit failed')
+
+    monkeypatch.setattr(processor, 'flush_scans', fail)
+    journal_writer.write_events(processor, [queued({'event': 'FSDJump', 'StarSystem': 'Writer Alpha'})])
+
+    assert seen == []
+    with db.get_session() as session:
+        assert session.scalar(select(func.count(db.System.id))) == 0
+
+
+def test_failed_event_keeps_queued_scans(seen: list[str]) -> None:
+    processor = JournalParse(db.get_session(), live=True, coalesce_scans=True)
+    journal_writer.write_events(processor, [
+        queued({'event': 'Scan', 'ScanType': 'Detailed', 'BodyName': 'Writer Alpha 1', 'BodyID': 1,
+                'StarSystem': 'Writer Alpha', 'SystemAddress': 1, 'DistanceFromArrivalLS': 100.0,
+                'PlanetClass': 'Icy body', 'MassEM': 0.1, 'SurfaceGravity': 1.0, 'Radius': 1000000.0,
+                'RotationPeriod': 100000.0}),
+        queued({'event': 'SAAScanComplete', 'SystemAddress': 1, 'BodyID': 1})
+    ])
+
+    with db.get_session() as session:
+        assert session.scalar(select(func.count(db.Planet.id))) == 1
+
+
+@pytest.mark.parametrize('coalesce_scans', [True, False])
+def test_coalesce_scans_option(seen: list[str], monkeypatch: pytest.MonkeyPatch, coalesce_scans: bool) -> None:
+    processors: list[JournalParse] = []
+
+    class RecordedParse(JournalParse):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            processors.append(self)
+
+    monkeypatch.setattr(journal_writer, 'JournalParse', RecordedParse)
+    assert journal_writer.start_writer(max_delay=0.0, coalesce_scans=coalesce_scans)
+    try:
+        journal_writer.enqueue('Writer CMDR', 'Writer Alpha', [1.0, 2.0, 3.0],
+                               {'event': 'FSDJump', 'StarSystem': 'Writer Alpha'})
+        assert journal_writer.flush(5)
+    finally:
+        journal_writer.shutdown()
+
+    assert [processor._coalesce_scans for processor in processors] == [coalesce_scans]
+    assert seen == ['FSDJump']
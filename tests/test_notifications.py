@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+# ExploData module plugin for EDMC
+# Source: https://github.com/Silarn/EDMC-ExploData
+# Licensed under the [GNU Public License (GPL)](http://www.gnu.org/licenses/gpl-2.0.html) version 2 or later.
+
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from ExploData.explo_data import db, notifications
+from ExploData.explo_data.notifications import BodiesChanged, BodyStatusChanged, Notification, SystemChanged
+
+
+class Received:
+    """ Subscriber which records each delivery """
+
+    def __init__(self):
+        self.deliveries: list[list[Notification]] = []
+
+    def __call__(self, delivered: list[Notification]) -> None:
+        self.deliveries.append(delivered)
+
+    def take(self) -> list[list[Notification]]:
+        assert notifications.flush(5)
+        deliveries = self.deliveries
+        self.deliveries = []
+        return deliveries
+
+
+@pytest.fixture
+def received(database: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[Received]:
+    monkeypatch.setattr(notifications.this, 'dispatch_frame', None)
+    monkeypatch.setattr(notifications.this, 'body_systems', {})
+    subscriber = Received()
+    notifications.subscribe(subscriber)
+    yield subscriber
+    notifications.unsubscribe(subscriber)
+
+
+def add_system(name: str) -> tuple[int, int, int]:
+    session = db.get_session()
+    commander = db.Commander(name=f'{name} CMDR')
+    system = db.System(name=name)
+    session.add_all([commander, system])
+    session.flush()
+    planet = db.Planet(system_id=system.id, name=f'{name} 1', body_id=1)
+    session.add(planet)
+    session.commit()
+    ids = system.id, planet.id, commander.id
+    session.close()
+    return ids
+
+
+def test_coalesced_after_outer_commit(received: Received) -> None:
+    system_id, planet_id, commander_id = add_system('Notify Alpha')
+    received.take()
+
+    session = db.get_session()
+    planet = session.get(db.Planet, planet_id)
+    planet.radius = 1000.0
+    session.flush()
+    planet.mass = 1.0
+    with session.begin_nested():
+        session.add(db.PlanetStatus(planet_id=planet_id, commander_id=commander_id))
+        session.get(db.System, system_id).x = 5.0
+    assert received.take() == []
+
+    session.commit()
+    session.close()
+    deliveries = received.take()
+    assert len(deliveries) == 1
+    assert sorted(deliveries[0], key=lambda notification: type(notification).__name__) == [
+        BodiesChanged(system_id, 'planet', frozenset({planet_id}), frozenset({'radius', 'mass'})),
+        BodyStatusChanged(system_id, commander_id, 'planet', frozenset({planet_id}), frozenset({'created'})),
+        SystemChanged(system_id, frozenset({'x'})),
+    ]
+
+
+def test_rolled_back_changes_are_dropped(received: Received) -> None:
+    system_id, planet_id, _ = add_system('Notify Alpha')
+    received.take()
+
+    session = db.get_session()
+    savepoint = session.begin_nested()
+    session.get(db.Planet, planet_id).radius = 1000.0
+    session.flush()
+    savepoint.rollback()
+    session.get(db.System, system_id).x = 5.0
+    session.commit()
+    assert received.take() == [[SystemChanged(system_id, frozenset({'x'}))]]
+
+    session.get(db.System, system_id).y = 5.0
+    session.flush()
+    session.rollback()
+    session.close()
+    assert received.take() == []
+
+
+def test_type_filter_and_unsubscribe(received: Received) -> None:
+    system_id, planet_id, _ = add_system('Notify Alpha')
+    received.take()
+    planets = Received()
+    notifications.subscribe(planets, [BodiesChanged])
+
+    session = db.get_session()
+    session.get(db.Planet, planet_id).radius = 1000.0
+    session.get(db.System, system_id).x = 5.0
+    session.commit()
+    assert planets.take() == [[BodiesChanged(system_id, 'planet', frozenset({planet_id}), frozenset({'radius'}))]]
+    assert len(received.take()[0]) == 2
+
+    notifications.unsubscribe(planets)
+    notifications.unsubscribe(received)
+    session.get(db.Planet, planet_id).radius = 2000.0
+    session.commit()
+    session.close()
+    assert planets.take() == [] and received.take() == []
+
+
+def test_body_system_cache(received: Received) -> None:
+    system_id, planet_id, _ = add_system('Notify Alpha')
+    assert notifications.this.body_systems == {('planet', planet_id): system_id}
+    received.take()
+
+    notifications.this.body_systems.update({('star', number): 1 for number in range(100001)})
+    session = db.get_session()
+    session.add(db.Planet(system_id=system_id, name='Notify Alpha 2', body_id=2))
+    session.commit()
+    session.close()
+    assert len(notifications.this.body_systems) == 1
+    bodies = [notification for notification in received.take()[-1] if isinstance(notification, BodiesChanged)]
+    assert bodies == [BodiesChanged(system_id, 'planet', frozenset({planet_id + 1}), frozenset({'created'}))]
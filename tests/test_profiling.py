@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+# ExploData module plugin for EDMC
+# Source: https://github.com/Silarn/EDMC-ExploData
+# Licensed under the [GNU Public License (GPL)](http://www.gnu.org/licenses/gpl-2.0.html) version 2 or later.
+
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from ExploData.explo_data import db, profiling
+from ExploData.explo_data.body_data.struct import PlanetData
+from ExploData.explo_data.journal_parse import JournalParse
+from ExploData.explo_data.profiling import CallProfile
+
+
+@pytest.fixture
+def profiled(database: Path) -> Iterator[None]:
+    profiling.reset_profile()
+    profiling.enable_profiling()
+    yield
+    profiling.disable_profiling()
+    profiling.reset_profile()
+
+
+def test_disable_restores_methods_and_listeners(database: Path) -> None:
+    process_entry = vars(JournalParse)['process_entry']
+    set_mapped = vars(PlanetData)['set_mapped']
+
+    profiling.enable_profiling()
+    assert vars(JournalParse)['process_entry'] is not process_entry
+    assert vars(PlanetData)['set_mapped'] is not set_mapped
+    assert event.contains(db.get_engine(), 'before_cursor_execute', profiling._count_statement)
+    assert event.contains(Session, 'after_flush', profiling._count_flush)
+
+    profiling.disable_profiling()
+    assert vars(JournalParse)['process_entry'] is process_entry
+    assert vars(PlanetData)['set_mapped'] is set_mapped
+    assert not event.contains(db.get_engine(), 'before_cursor_execute', profiling._count_statement)
+    assert not event.contains(db.get_engine(), 'commit', profiling._count_commit)
+    assert not event.contains(Session, 'after_flush', profiling._count_flush)
+    assert profiling.this.originals == []
+
+
+def test_events_are_profiled(profiled: None) -> None:
+    processor = JournalParse(db.get_session())
+    processor.process_entry({'timestamp': '2026-01-01T00:00:00Z', 'event': 'Commander', 'Name': 'Profile CMDR'})
+    processor.process_entry({'timestamp': '2026-01-01T00:00:00Z', 'event': 'FSDJump', 'StarSystem': 'Profile Alpha',
+                             'StarPos': [1.0, 2.0, 3.0]})
+
+    stats = profiling.get_profile()['event.FSDJump']
+    assert stats.calls == 1 and stats.statements > 0 and stats.commits >= 1
+    assert sum(stats.histogram) == 1
+    assert 'event.FSDJump' in profiling.dump_profile(reset=True)
+    assert profiling.get_profile() == {}
+
+
+def test_histogram_is_a_rolling_window(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(profiling, 'HISTOGRAM_WINDOW', 3)
+    profile = CallProfile()
+    for duration in (2.0, 2.0, 0.00001, 0.00001, 0.00001):
+        profile.add(duration, [1, 0, 0])
+
+    stats = profile.to_stats()
+    assert stats.calls == 5 and stats.statements == 5 and stats.max_time == 2.0
+    assert stats.histogram[0] == 3 and sum(stats.histogram) == 3
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+# ExploData module plugin for EDMC
+# Source: https://github.com/Silarn/EDMC-ExploData
+# Licensed under the [GNU Public License (GPL)](http://www.gnu.org/licenses/gpl-2.0.html) version 2 or later.
+
+from pathlib import Path
+from typing import Optional
+
+import pytest
+from sqlalchemy import delete, select, update
+
+from ExploData.explo_data import db
+
+
+def add_system(name: str, region: Optional[int], commanders: list[int], planets: int) -> int:
+    """ Write a system whose planets were all discovered, and the first mapped, by each commander """
+
+    session = db.get_session()
+    system = db.System(name=name, region=region)
+    session.add(system)
+    session.flush()
+    for number in range(1, planets + 1):
+        planet = db.Planet(system_id=system.id, name=str(number), body_id=number)
+        session.add(planet)
+        session.flush()
+        for commander_id in commanders:
+            session.add(db.PlanetStatus(planet_id=planet.id, commander_id=commander_id, discovered=True,
+                                        mapped=number == 1))
+    session.add_all([db.SystemStatus(system_id=system.id, commander_id=commander_id) for commander_id in commanders])
+    session.commit()
+    system_id = system.id
+    session.close()
+    return system_id
+
+
+def add_codex(commander_id: int, region: int, biological: str) -> None:
+    session = db.get_session()
+    session.add(db.CodexScans(commander_id=commander_id, region=region, biological=biological))
+    session.commit()
+    session.close()
+
+
+def execute(statement) -> None:
+    with db.get_engine().begin() as connection:
+        connection.execute(statement)
+
+
+def totals(commander_id: int) -> dict[int, tuple[int, int, int, int]]:
+    """ The region summaries of a commander, as systems, planets, planets mapped and codex entries """
+
+    return {summary.region: (summary.systems, summary.planet_count, summary.planets_mapped, summary.codex_entries)
+            for summary in db.get_region_summaries(commander_id)}
+
+
+def region_summaries() -> list[tuple]:
+    columns = [column for column in db.RegionSummary.__table__.columns if column.name != 'id']
+    with db.get_session() as session:
+        return [tuple(row) for row in session.execute(
+            select(*columns).where((db.RegionSummary.systems > 0) | (db.RegionSummary.codex_entries > 0))
+            .order_by(db.RegionSummary.region, db.RegionSummary.commander_id)
+        )]
+
+
+def assert_matches_rebuild() -> None:
+    maintained = region_summaries()
+    db.rebuild_summaries()
+    assert region_summaries() == maintained
+
+
+@pytest.fixture
+def commanders(database: Path) -> tuple[int, int]:
+    session = db.get_session()
+    alpha, beta = db.Commander(name='Region CMDR'), db.Commander(name='Region Other')
+    session.add_all([alpha, beta])
+    session.commit()
+    ids = alpha.id, beta.id
+    session.close()
+    return ids
+
+
+def test_region_totals(commanders: tuple[int, int]) -> None:
+    alpha, beta = commanders
+    add_system('Region Alpha', 1, [alpha, beta], 3)
+    add_system('Region Beta', 1, [alpha], 2)
+    add_system('Region Gamma', None, [alpha], 1)
+
+    assert totals(alpha) == {0: (1, 1, 1, 0), 1: (2, 5, 2, 0)}
+    assert totals(beta) == {1: (1, 3, 1, 0)}
+    assert db.get_region_summary(1, alpha).planets_discovered == 5
+    assert db.get_region_summary(2, alpha) is None
+
+    commander_totals = db.get_commander_totals(alpha)
+    assert (commander_totals['systems'], commander_totals['planet_count'], commander_totals['planets_mapped']) == \
+           (3, 6, 3)
+    assert db.get_commander_totals(-1)['systems'] == 0
+    assert_matches_rebuild()
+
+
+def test_system_moves_region(commanders: tuple[int, int]) -> None:
+    alpha, beta = commanders
+    system_id = add_system('Region Alpha', None, [alpha, beta], 2)
+    add_system('Region Beta', 1, [alpha], 1)
+
+    execute(update(db.System).where(db.System.id == system_id).values(region=1))
+    assert totals(alpha) == {1: (2, 3, 2, 0)}
+    assert totals(beta) == {1: (1, 2, 1, 0)}
+    assert_matches_rebuild()
+
+    execute(update(db.System).where(db.System.id == system_id).values(region=2))
+    assert totals(alpha) == {1: (1, 1, 1, 0), 2: (1, 2, 1, 0)}
+    assert totals(beta) == {2: (1, 2, 1, 0)}
+    assert db.get_region_summary(1, beta).systems == 0
+    assert_matches_rebuild()
+
+
+def test_system_delete(commanders: tuple[int, int]) -> None:
+    alpha, beta = commanders
+    system_id = add_system('Region Alpha', 1, [alpha, beta], 3)
+    add_system('Region Beta', 1, [alpha], 2)
+
+    execute(delete(db.System).where(db.System.id == system_id))
+    assert totals(alpha) == {1: (1, 2, 1, 0)}
+    assert totals(beta) == {}
+    assert_matches_rebuild()
+
+
+def test_codex_counts(commanders: tuple[int, int]) -> None:
+    alpha, beta = commanders
+    add_system('Region Alpha', 1, [alpha], 1)
+    add_codex(alpha, 1, '$Codex_Ent_Bacterial_01_Name;')
+    add_codex(alpha, 1, '$Codex_Ent_Aleoids_01_Name;')
+    add_codex(alpha, 2, '$Codex_Ent_Bacterial_01_Name;')
+    add_codex(beta, 1, '$Codex_Ent_Bacterial_01_Name;')
+
+    assert totals(alpha) == {1: (1, 1, 1, 2), 2: (0, 0, 0, 1)}
+    assert totals(beta) == {1: (0, 0, 0, 1)}
+    assert db.get_region_codex(1, alpha) == ['$Codex_Ent_Aleoids_01_Name;', '$Codex_Ent_Bacterial_01_Name;']
+    assert db.get_commander_totals(alpha)['codex_entries'] == 3
+    assert_matches_rebuild()
+
+    execute(update(db.CodexScans).where(db.CodexScans.commander_id == beta).values(region=2))
+    assert totals(beta) == {2: (0, 0, 0, 1)}
+    execute(delete(db.CodexScans).where(db.CodexScans.commander_id == alpha).where(db.CodexScans.region == 1)
+            .where(db.CodexScans.biological == '$Codex_Ent_Aleoids_01_Name;'))
+    execute(delete(db.CodexScans).where(db.CodexScans.commander_id == alpha).where(db.CodexScans.region == 2))
+    assert totals(alpha) == {1: (1, 1, 1, 1)}
+    assert db.get_region_codex(1, alpha) == ['$Codex_Ent_Bacterial_01_Name;']
+    assert_matches_rebuild()
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+# ExploData module plugin for EDMC
+# Source: https://github.com/Silarn/EDMC-ExploData
+# Licensed under the [GNU Public License (GPL)](http://www.gnu.org/licenses/gpl-2.0.html) version 2 or later.
+
+import gzip
+from pathlib import Path
+from typing import Any, Optional
+
+import pytest
+from sqlalchemy import select
+
+from ExploData.explo_data import db, journal_recorder, journal_writer
+from ExploData.explo_data.journal_recorder import read_recording
+from replay import replay
+
+SYSTEM = 'Replay Alpha'
+CMDR = 'Replay CMDR'
+STAR_POS = [1.0, 2.0, 3.0]
+
+
+def event(name: str, **data: Any) -> dict[str, Any]:
+    return {'timestamp': '2026-01-01T00:00:00Z', 'event': name, **data}
+
+
+def planet_scan(number: int) -> dict[str, Any]:
+    return event('Scan', ScanType='Detailed', BodyName=f'{SYSTEM} {number}', BodyID=number, StarSystem=SYSTEM,
+                 SystemAddress=1, DistanceFromArrivalLS=100.0, PlanetClass='Icy body', MassEM=0.1,
+                 SurfaceGravity=1.0, Radius=1000000.0, RotationPeriod=100000.0, WasDiscovered=False,
+                 WasMapped=False)
+
+
+def session_calls() -> list[tuple[str, str, Optional[list[float]], dict[str, Any]]]:
+    """ Journal hook calls for a short session: loading in, jumping, and scanning two planets """
+
+    return [
+        (CMDR, '', None, event('LoadGame', Commander=CMDR)),
+        (CMDR, SYSTEM, STAR_POS, event('FSDJump', StarSystem=SYSTEM, StarPos=STAR_POS, SystemAddress=1)),
+        (CMDR, SYSTEM, STAR_POS, planet_scan(1)),
+        (CMDR, SYSTEM, STAR_POS, planet_scan(2)),
+    ]
+
+
+def recorded(path: Path) -> list[tuple[str, str, Optional[list[float]], dict[str, Any]]]:
+    return [(call.cmdr, call.system, call.star_pos, call.entry) for call in read_recording(path)]
+
+
+@pytest.fixture
+def recording(database: Path) -> Path:
+    path = journal_recorder.start_recording(database / 'recordings' / 'session.jsonl.gz')
+    for call in session_calls():
+        journal_recorder.record(*call)
+    assert journal_recorder.stop_recording() == path
+    return path
+
+
+def test_recording_round_trips(recording: Path) -> None:
+    assert recorded(recording) == session_calls()
+    offsets = [call.offset for call in read_recording(recording)]
+    assert offsets == sorted(offsets)
+    assert not journal_recorder.is_recording()
+
+
+@pytest.mark.parametrize('write_behind', [False, True], ids=['hook', 'write_behind'])
+def test_recording_replays(recording: Path, database: Path, write_behind: bool,
+                           monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(journal_writer.this, 'stopping', False)  # Set by the writer shutdown in the stop hook
+    # The replayed hook calls are recorded again, and the recording is finished by the plugin stop hook
+    rerecording = journal_recorder.start_recording(database / 'recordings' / 'replayed.jsonl.gz')
+    results = replay(recording, database, write_behind=write_behind)
+
+    assert not journal_recorder.is_recording()
+    assert recorded(rerecording) == session_calls()
+    assert results['events'] == 4
+    assert {name: stats['count'] for name, stats in results['by_event'].items()} == \
+           {'LoadGame': 1, 'FSDJump': 1, 'Scan': 2}
+    with db.get_session() as session:
+        system = session.scalar(select(db.System).where(db.System.name == SYSTEM))
+        assert (system.x, system.y, system.z) == tuple(STAR_POS)
+        assert sorted(planet.name for planet in system.planets) == ['1', '2']
+
+
+def test_unknown_recording_format(app_dir: Path) -> None:
+    path = app_dir / 'other.jsonl.gz'
+    with gzip.open(path, 'wt', encoding='utf-8') as other:
+        other.write('{"format": "other", "version": 1}\n')
+    with pytest.raises(ValueError):
+        list(read_recording(path))
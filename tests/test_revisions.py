@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+# ExploData module plugin for EDMC
+# Source: https://github.com/Silarn/EDMC-ExploData
+# Licensed under the [GNU Public License (GPL)](http://www.gnu.org/licenses/gpl-2.0.html) version 2 or later.
+
+from pathlib import Path
+
+from sqlalchemy import delete, update
+
+from ExploData.explo_data import db
+
+
+def add_system(name: str) -> tuple[int, int]:
+    """ Write a system with a planet, which has a gas and a flora, in one transaction """
+
+    session = db.get_session()
+    system = db.System(name=name)
+    session.add(system)
+    session.flush()
+    planet = db.Planet(system_id=system.id, name=f'{name} 1', body_id=1)
+    planet.gasses = [db.PlanetGas(gas_name='Nitrogen', percent=90.0)]
+    planet.floras = [db.PlanetFlora(genus='$Codex_Ent_Bacterial_Genus_Name;')]
+    session.add(planet)
+    session.commit()
+    ids = system.id, planet.id
+    session.close()
+    return ids
+
+
+def execute(*statements) -> None:
+    with db.get_engine().begin() as connection:
+        for statement in statements:
+            connection.execute(statement)
+
+
+def test_insert_stamps_one_revision_per_transaction(database: Path) -> None:
+    start = db.get_revision()
+    system_id, planet_id = add_system('Revision Alpha')
+
+    assert db.get_revision() == start + 1
+    changes = db.get_changes_since(start)
+    assert changes.revision == start + 1
+    assert changes.rows == {'systems': [system_id], 'planets': [planet_id], 'planet_flora': [1]}
+    assert db.get_changes_since(changes.revision).rows == {}
+
+
+def test_update_stamps_only_changed_rows(database: Path) -> None:
+    system_id, planet_id = add_system('Revision Alpha')
+    start = db.get_revision()
+
+    execute(update(db.Planet).where(db.Planet.id == planet_id).values(name='Revision Alpha 1'),
+            update(db.System).where(db.System.id == system_id).values(x=0.0))
+    assert db.get_revision() == start
+    assert db.get_changes_since(start).rows == {}
+
+    execute(update(db.Planet).where(db.Planet.id == planet_id).values(radius=1000.0),
+            update(db.Planet).where(db.Planet.id == planet_id).values(mass=1.0))
+    assert db.get_revision() == start + 1
+    assert db.get_changes_since(start).rows == {'planets': [planet_id]}
+
+
+def test_child_writes_stamp_parent(database: Path) -> None:
+    _, planet_id = add_system('Revision Alpha')
+    start = db.get_revision()
+
+    execute(delete(db.PlanetGas).where(db.PlanetGas.planet_id == planet_id))
+    assert db.get_changes_since(start).rows == {'planets': [planet_id]}
+
+    start = db.get_revision()
+    execute(delete(db.PlanetFlora).where(db.PlanetFlora.planet_id == planet_id))
+    assert db.get_changes_since(start).rows == {'planets': [planet_id]}
+
+
+def test_rolled_back_savepoint_keeps_revision(database: Path) -> None:
+    system_id, planet_id = add_system('Revision Alpha')
+    start = db.get_revision()
+
+    with db.get_engine().begin() as connection:
+        savepoint = connection.begin_nested()
+        connection.execute(update(db.System).where(db.System.id == system_id).values(x=1.0))
+        savepoint.rollback()
+        connection.execute(update(db.Planet).where(db.Planet.id == planet_id).values(radius=1000.0))
+
+    assert db.get_revision() == start + 1
+    assert db.get_changes_since(start).rows == {'planets': [planet_id]}
+
+
+def test_changes_filtered_by_system(database: Path) -> None:
+    alpha_id, alpha_planet_id = add_system('Revision Alpha')
+    beta_id, beta_planet_id = add_system('Revision Beta')
+    session = db.get_session()
+    commander = db.Commander(name='Revision CMDR')
+    session.add(commander)
+    session.flush()
+    session.add_all([db.PlanetStatus(planet_id=alpha_planet_id, commander_id=commander.id),
+                     db.PlanetStatus(planet_id=beta_planet_id, commander_id=commander.id),
+                     db.SystemStatus(system_id=beta_id, commander_id=commander.id)])
+    session.commit()
+    session.close()
+
+    alpha = db.get_changes_since(0, alpha_id).rows
+    beta = db.get_changes_since(0, beta_id).rows
+    assert alpha['systems'] == [alpha_id] and beta['systems'] == [beta_id]
+    assert alpha['planets'] == [alpha_planet_id] and beta['planets'] == [beta_planet_id]
+    assert len(alpha['planet_status']) == 1 and len(beta['planet_status']) == 1
+    assert alpha['planet_status'] != beta['planet_status']
+    assert 'system_status' not in alpha and len(beta['system_status']) == 1
+
+
+def test_batch_transactions_take_new_revisions(database: Path) -> None:
+    start = db.get_revision()
+    for name in ('Revision Alpha', 'Revision Beta'):
+        with db.batch_session() as session:
+            session.add(db.System(name=name))
+
+    assert db.get_revision() == start + 2
+    assert len(db.get_changes_since(start + 1).rows['systems']) == 1
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+# ExploData module plugin for EDMC
+# Source: https://github.com/Silarn/EDMC-ExploData
+# Licensed under the [GNU Public License (GPL)](http://www.gnu.org/licenses/gpl-2.0.html) version 2 or later.
+
+from pathlib import Path
+from typing import Any, Optional
+
+import pytest
+
+from ExploData.explo_data import db, snapshot
+from ExploData.explo_data.snapshot import SystemSnapshot
+
+
+@pytest.fixture
+def system(database: Path) -> tuple[int, int, int]:
+    """ A system with a star, planets and a ring, explored by two commanders """
+
+    session = db.get_session()
+    alpha, beta = db.Commander(name='Snapshot CMDR'), db.Commander(name='Snapshot Other')
+    system = db.System(name='Snapshot Alpha', x=1.0, y=2.0, z=3.0, region=18, body_count=4, non_body_count=1)
+    session.add_all([alpha, beta, system])
+    session.flush()
+    star = db.Star(system_id=system.id, name='A', body_id=0, distance=0.0, mass=0.8, type='K', subclass=5,
+                   luminosity='V')
+    star.rings = [db.StarRing(name='A A Belt', type='Metallic')]
+    icy = db.Planet(system_id=system.id, name='2', body_id=2, type='Icy body', parent_stars='A',
+                    materials='iron,nickel', bio_signals=1, landable=True, temp=80.0)
+    rocky = db.Planet(system_id=system.id, name='1', body_id=1, type='Rocky body', atmosphere='Thin Nitrogen',
+                      parent_stars='A,B', geo_signals=1)
+    rocky.gasses = [db.PlanetGas(gas_name='Nitrogen', percent=90.0), db.PlanetGas(gas_name='Argon', percent=10.0)]
+    rocky.geos = [db.PlanetGeo(type='$Codex_Ent_IceFumarole_Name;')]
+    rocky.rings = [db.PlanetRing(name='1 A Ring', type='Icy')]
+    flora = db.PlanetFlora(genus='$Codex_Ent_Bacterial_Genus_Name;', species='$Codex_Ent_Bacterial_01_Name;',
+                           color='$Codex_Ent_Bacterial_01_Red_Name;')
+    rocky.floras = [flora, db.PlanetFlora(genus='$Codex_Ent_Stratum_Genus_Name;')]
+    ring = db.NonBody(system_id=system.id, name='1 A Ring', body_id=3)
+    session.add_all([star, icy, rocky, ring])
+    session.flush()
+    session.add_all([
+        db.SystemStatus(system_id=system.id, commander_id=alpha.id, fully_scanned=True),
+        db.StarStatus(star_id=star.id, commander_id=alpha.id, discovered=True, scan_state=2),
+        db.PlanetStatus(planet_id=rocky.id, commander_id=alpha.id, discovered=True, mapped=True, efficient=True),
+        db.PlanetStatus(planet_id=rocky.id, commander_id=beta.id, was_discovered=True),
+        db.NonBodyStatus(non_body_id=ring.id, commander_id=beta.id, mapped=True),
+        db.FloraScans(flora_id=flora.id, commander_id=alpha.id, count=2, was_logged=True),
+        db.Waypoint(flora_id=flora.id, commander_id=alpha.id, latitude=1.5, longitude=-2.5),
+        db.Waypoint(flora_id=flora.id, commander_id=beta.id, type='scan', latitude=3.0, longitude=4.0),
+    ])
+    session.commit()
+    ids = system.id, alpha.id, beta.id
+    session.close()
+    return ids
+
+
+def status(statuses: list[Any], commander_id: Optional[int], *fields: str) -> Optional[tuple]:
+    found = [row for row in statuses if row.commander_id == commander_id]
+    return tuple(getattr(found[0], field) for field in fields) if found else None
+
+
+def expected(system_id: int, commander_id: Optional[int]) -> dict[str, Any]:
+    """ The snapshot data, read through the ORM relationships """
+
+    session = db.get_session()
+    system = session.get(db.System, system_id)
+    data = {
+        'status': status(system.statuses, commander_id, 'honked', 'fully_scanned', 'fully_mapped'),
+        'stars': [(star.name, status(star.statuses, commander_id, 'discovered', 'was_discovered', 'scan_state'),
+                   [(ring.name, ring.type) for ring in star.rings])
+                  for star in sorted(system.stars, key=lambda star: star.body_id)],
+        'planets': [(planet.name, planet.type, tuple(planet.parent_stars.split(',')) if planet.parent_stars else (),
+                     frozenset(planet.materials.split(',')) if planet.materials else frozenset(), planet.landable,
+                     status(planet.statuses, commander_id, 'discovered', 'was_discovered', 'mapped', 'was_mapped',
+                            'footfall', 'was_footfalled', 'efficient', 'scan_state'),
+                     sorted((gas.gas_name, gas.percent) for gas in planet.gasses),
+                     sorted(geo.type for geo in planet.geos),
+                     [(ring.name, ring.type) for ring in planet.rings],
+                     sorted((flora.genus, flora.species, flora.color,
+                             status(flora.scans, commander_id, 'count', 'was_logged') or (0, None),
+                             sorted((waypoint.type, waypoint.latitude, waypoint.longitude)
+                                    for waypoint in flora.waypoints if waypoint.commander_id == commander_id))
+                            for flora in planet.floras))
+                    for planet in sorted(system.planets, key=lambda planet: planet.body_id)],
+        'non_bodies': [(non_body.name, status(non_body.statuses, commander_id, 'discovered', 'was_discovered',
+                                              'mapped', 'was_mapped', 'efficient'))
+                       for non_body in sorted(system.non_bodies, key=lambda non_body: non_body.body_id)],
+    }
+    session.close()
+    return data
+
+
+def actual(system: SystemSnapshot) -> dict[str, Any]:
+    return {
+        'status': tuple(system.status) if system.status else None,
+        'stars': [(star.name, tuple(star.status) if star.status else None, [tuple(ring) for ring in star.rings])
+                  for star in system.stars],
+        'planets': [(planet.name, planet.type, planet.parent_stars, planet.materials, planet.landable,
+                     tuple(planet.status) if planet.status else None, sorted(tuple(gas) for gas in planet.gasses),
+                     sorted(planet.geos), [tuple(ring) for ring in planet.rings],
+                     sorted((flora.genus, flora.species, flora.color, (flora.scan_count, flora.was_logged),
+                             sorted(tuple(waypoint) for waypoint in flora.waypoints))
+                            for flora in planet.floras))
+                    for planet in system.planets],
+        'non_bodies': [(non_body.name, tuple(non_body.status) if non_body.status else None)
+                       for non_body in system.non_bodies],
+    }
+
+
+def test_snapshot_is_one_query(system: tuple[int, int, int], queries: list[str]) -> None:
+    system_id, alpha, _ = system
+    snapshot.get_system_snapshot(system_id, alpha)
+    assert len(queries) == 1
+
+    queries.clear()
+    snapshot.get_system_snapshot(system_id)
+    assert len(queries) == 1
+
+
+@pytest.mark.parametrize('commander', ['alpha', 'beta', 'none'])
+def test_snapshot_matches_orm(system: tuple[int, int, int], commander: str) -> None:
+    system_id, alpha, beta = system
+    commander_id = {'alpha': alpha, 'beta': beta, 'none': None}[commander]
+    loaded = snapshot.get_system_snapshot(system_id, commander_id)
+
+    assert (loaded.name, loaded.x, loaded.region, loaded.body_count, loaded.non_body_count) == \
+           ('Snapshot Alpha', 1.0, 18, 4, 1)
+    assert actual(loaded) == expected(system_id, commander_id)
+    assert [planet.body_id for planet in loaded.planets] == [1, 2]
+
+
+def test_snapshot_types(system: tuple[int, int, int]) -> None:
+    system_id, alpha, beta = system
+    rocky = snapshot.get_system_snapshot(system_id, alpha).get_planet('1')
+    assert rocky.status.mapped is True and rocky.status.footfall is False
+    assert rocky.floras[0].was_logged is True and rocky.floras[1].was_logged is None
+    assert snapshot.get_system_snapshot(system_id, beta).get_planet('1').status.was_discovered is True
+    assert snapshot.get_system_snapshot(system_id).get_star('A').status is None
+    assert snapshot.get_system_snapshot(-1) is None
+
+
+def test_snapshot_reads_without_sql(system: tuple[int, int, int], queries: list[str]) -> None:
+    system_id, alpha, _ = system
+    loaded = snapshot.get_system_snapshot(system_id, alpha)
+    db.shutdown()
+    queries.clear()
+
+    actual(loaded)
+    assert loaded.get_planet('1').floras[0].waypoints[0].latitude == 1.5
+    assert loaded.get_non_body('1 A Ring').status is None
+    assert queries == []
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+# ExploData module plugin for EDMC
+# Source: https://github.com/Silarn/EDMC-ExploData
+# Licensed under the [GNU Public License (GPL)](http://www.gnu.org/licenses/gpl-2.0.html) version 2 or later.
+
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import pytest
+from sqlalchemy import select
+
+from ExploData.explo_data import db, statements
+from ExploData.explo_data.db import CodexScans, Commander, FloraScans, NonBody, NonBodyStatus, Planet, \
+    PlanetStatus, Star, StarStatus, System
+
+# The selects built per call before the prebuilt statements, as they read in struct.py, codex.py and journal_parse.py.
+# Each maps a parameter set to the row the lookup returned, or the value the caller read from it.
+REPLACED: dict[str, Callable[[Any, dict[str, Any]], Any]] = {
+    'PLANET_BY_NAME': lambda session, p: session.scalar(
+        select(Planet).where(Planet.name == p['name']).where(Planet.system_id == p['system_id'])),
+    'PLANET_BY_BODY_ID': lambda session, p: session.scalar(
+        select(Planet).where(Planet.system_id == p['system_id']).where(Planet.body_id == p['body_id'])),
+    'STAR_BY_NAME': lambda session, p: session.scalar(
+        select(Star).where(Star.name == p['name']).where(Star.system_id == p['system_id'])),
+    'NON_BODY_BY_NAME': lambda session, p: session.scalar(
+        select(NonBody).where(NonBody.name == p['name']).where(NonBody.system_id == p['system_id'])),
+    'PLANET_STATUS': lambda session, p: session.scalar(
+        select(PlanetStatus).where(PlanetStatus.planet_id == p['body_id'])
+        .where(PlanetStatus.commander_id == p['commander_id'])),
+    'STAR_STATUS': lambda session, p: session.scalar(
+        select(StarStatus).where(StarStatus.star_id == p['body_id'])
+        .where(StarStatus.commander_id == p['commander_id'])),
+    'NON_BODY_STATUS': lambda session, p: session.scalar(
+        select(NonBodyStatus).where(NonBodyStatus.non_body_id == p['body_id'])
+        .where(NonBodyStatus.commander_id == p['commander_id'])),
+    'COMMANDER_BY_NAME': lambda session, p: session.scalar(select(Commander).where(Commander.name == p['name'])),
+    'SYSTEM_BY_NAME': lambda session, p: session.scalar(select(System).where(System.name == p['name'])),
+    'FLORA_SCAN': lambda session, p: session.scalar(
+        select(FloraScans).where(FloraScans.flora_id == p['flora_id'])
+        .where(FloraScans.commander_id == p['commander_id'])),
+    'FLORA_SCAN_COUNT': lambda session, p: getattr(session.scalar(
+        select(FloraScans).where(FloraScans.flora_id == p['flora_id'])
+        .where(FloraScans.commander_id == p['commander_id'])), 'count', None),
+    'CODEX_SCAN_ID': lambda session, p: getattr(session.scalar(
+        select(CodexScans).where(CodexScans.commander_id == p['commander_id'])
+        .where(CodexScans.biological == p['biological']).where(CodexScans.region == p['region'])), 'id', None),
+}
+
+# Parameter sets per statement, as queries over the stored rows. Each list also gets a set which finds nothing.
+KEYS: dict[str, str] = {
+    'PLANET_BY_NAME': 'SELECT system_id, name FROM planets',
+    'PLANET_BY_BODY_ID': 'SELECT system_id, body_id FROM planets',
+    'STAR_BY_NAME': 'SELECT system_id, name FROM stars',
+    'NON_BODY_BY_NAME': 'SELECT system_id, name FROM non_bodies',
+    'PLANET_STATUS': 'SELECT planets.id AS body_id, commanders.id AS commander_id FROM planets, commanders',
+    'STAR_STATUS': 'SELECT stars.id AS body_id, commanders.id AS commander_id FROM stars, commanders',
+    'NON_BODY_STATUS': 'SELECT non_bodies.id AS body_id, commanders.id AS commander_id FROM non_bodies, commanders',
+    'COMMANDER_BY_NAME': 'SELECT name FROM commanders',
+    'SYSTEM_BY_NAME': 'SELECT name FROM systems',
+    'FLORA_SCAN': 'SELECT planet_flora.id AS flora_id, commanders.id AS commander_id FROM planet_flora, commanders',
+    'FLORA_SCAN_COUNT': 'SELECT planet_flora.id AS flora_id, commanders.id AS commander_id '
+                        'FROM planet_flora, commanders',
+    'CODEX_SCAN_ID': 'SELECT commanders.id AS commander_id, biological, region FROM commanders, '
+                     '(SELECT DISTINCT biological, region FROM codex_scans)',
+}
+MISSING: dict[str, Any] = {'name': 'Missing', 'system_id': -1, 'body_id': -1, 'commander_id': -1, 'flora_id': -1,
+                           'biological': 'Missing', 'region': -1}
+
+BACTERIUM = '$Codex_Ent_Bacterial_01_Name;'
+STRATUM = '$Codex_Ent_Stratum_02_Name;'
+
+
+@pytest.fixture
+def stored(database: Path) -> None:
+    """ Two systems with the same body names and IDs, explored in part by each of two commanders """
+
+    session = db.get_session()
+    alpha, beta = Commander(name='Statement CMDR'), Commander(name='Statement Other')
+    systems = [System(name='Statement Alpha'), System(name='Statement Beta')]
+    session.add_all([alpha, beta, *systems])
+    session.flush()
+    for number, system in enumerate(systems):
+        star = Star(system_id=system.id, name='A', body_id=0, type='K')
+        planets = [Planet(system_id=system.id, name=f'A {body_id}', body_id=body_id) for body_id in (1, 2)]
+        planets[0].floras = [db.PlanetFlora(genus='$Codex_Ent_Bacterial_Genus_Name;', species=BACTERIUM),
+                             db.PlanetFlora(genus='$Codex_Ent_Stratum_Genus_Name;')]
+        non_body = NonBody(system_id=system.id, name='A A Ring', body_id=3)
+        session.add_all([star, *planets, non_body])
+        session.flush()
+        commander = (alpha, beta)[number]
+        session.add_all([StarStatus(star_id=star.id, commander_id=commander.id, scan_state=2),
+                         PlanetStatus(planet_id=planets[number].id, commander_id=commander.id, mapped=True),
+                         NonBodyStatus(non_body_id=non_body.id, commander_id=alpha.id),
+                         FloraScans(flora_id=planets[0].floras[0].id, commander_id=commander.id, count=number + 2)])
+    session.add_all([CodexScans(commander_id=alpha.id, biological=BACTERIUM, region=18),
+                     CodexScans(commander_id=alpha.id, biological=STRATUM, region=18),
+                     CodexScans(commander_id=beta.id, biological=BACTERIUM, region=7)])
+    session.commit()
+    session.close()
+
+
+def parameters(name: str) -> list[dict[str, Any]]:
+    keys = [dict(row) for row in db.run_query(db.get_engine(), KEYS[name]).mappings()]
+    return keys + [{key: MISSING[key] for key in keys[0]}]
+
+
+def row(value: Any) -> Optional[tuple]:
+    """ Compare ORM rows by their column values, as the two lookups may run in different sessions """
+
+    if value is None or not isinstance(value, db.Base):
+        return value
+    return tuple(getattr(value, column.key) for column in value.__table__.columns)
+
+
+def test_every_statement_is_covered() -> None:
+    prebuilt = {name for name in vars(statements) if name.isupper()}
+    assert prebuilt == REPLACED.keys() == KEYS.keys()
+
+
+@pytest.mark.parametrize('name', REPLACED.keys())
+def test_same_rows_as_replaced_select(stored: None, name: str) -> None:
+    keys = parameters(name)
+    found = 0
+    session = db.get_session()
+    for key in keys:
+        expected = row(REPLACED[name](session, key))
+        assert row(session.scalar(getattr(statements, name), key)) == expected, key
+        found += expected is not None
+    session.close()
+
+    assert found and found < len(keys)
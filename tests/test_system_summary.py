@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+# ExploData module plugin for EDMC
+# Source: https://github.com/Silarn/EDMC-ExploData
+# Licensed under the [GNU Public License (GPL)](http://www.gnu.org/licenses/gpl-2.0.html) version 2 or later.
+
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import delete, select
+
+from ExploData.explo_data import db
+from ExploData.explo_data.journal_parse import JournalParse
+
+SYSTEM = 'Summary Alpha'
+
+
+def event(name: str, **data: Any) -> dict[str, Any]:
+    return {'timestamp': '2026-01-01T00:00:00Z', 'event': name, **data}
+
+
+def planet_scan(number: int) -> dict[str, Any]:
+    return event('Scan', ScanType='Detailed', BodyName=f'{SYSTEM} {number}', BodyID=number, StarSystem=SYSTEM,
+                 SystemAddress=1, DistanceFromArrivalLS=100.0, PlanetClass='Icy body', MassEM=0.1,
+                 SurfaceGravity=1.0, Radius=1000000.0, RotationPeriod=100000.0, WasDiscovered=False,
+                 WasMapped=False)
+
+
+def mapped(body_name: str, body_id: int) -> dict[str, Any]:
+    return event('SAAScanComplete', BodyName=f'{SYSTEM} {body_name}', BodyID=body_id, SystemAddress=1,
+                 ProbesUsed=5, EfficiencyTarget=6)
+
+
+def arrive(commander: str) -> list[dict[str, Any]]:
+    return [event('Commander', Name=commander),
+            event('FSDJump', StarSystem=SYSTEM, StarPos=[1.0, 2.0, 3.0], SystemAddress=1)]
+
+
+def explore(commander: str, planets: int) -> list[dict[str, Any]]:
+    """ The events for a commander arriving in the system, scanning every planet and finding all bodies """
+
+    return [*arrive(commander), *(planet_scan(number) for number in range(1, planets + 1)),
+            event('FSSAllBodiesFound', SystemName=SYSTEM, SystemAddress=1, Count=planets)]
+
+
+def parse(*entries: dict[str, Any]) -> None:
+    assert JournalParse(db.get_session()).parse_lines(entries) == []
+
+
+def commander_id(name: str) -> int:
+    with db.get_session() as session:
+        return session.scalar(select(db.Commander.id).where(db.Commander.name == name))
+
+
+def system_id() -> int:
+    with db.get_session() as session:
+        return session.scalar(select(db.System.id).where(db.System.name == SYSTEM))
+
+
+def fully_mapped(commander: str) -> bool:
+    with db.get_session() as session:
+        return session.scalar(select(db.SystemStatus.fully_mapped).where(db.SystemStatus.system_id == system_id())
+                              .where(db.SystemStatus.commander_id == commander_id(commander)))
+
+
+def summaries() -> list[tuple]:
+    columns = [column for column in db.SystemSummary.__table__.columns if column.name != 'id']
+    with db.get_session() as session:
+        return [tuple(row) for row in session.execute(select(*columns).order_by(db.SystemSummary.system_id,
+                                                                                db.SystemSummary.commander_id))]
+
+
+def test_fully_mapped_after_last_planet(database: Path) -> None:
+    parse(*explore('Summary CMDR', 3), mapped('1', 1), mapped('2', 2))
+    summary = db.get_system_summary(system_id(), commander_id('Summary CMDR'))
+    assert (summary.planet_count, summary.planets_mapped, summary.planets_efficient) == (3, 2, 2)
+    assert not fully_mapped('Summary CMDR')
+
+    parse(*arrive('Summary CMDR'), mapped('3', 3))
+    assert db.get_system_summary(system_id(), commander_id('Summary CMDR')).planets_mapped == 3
+    assert fully_mapped('Summary CMDR')
+
+
+def test_fully_mapped_per_commander(database: Path) -> None:
+    parse(*explore('Summary CMDR', 2), mapped('1', 1), mapped('2', 2),
+          *explore('Summary Other', 2), mapped('1', 1))
+
+    other = db.get_system_summary(system_id(), commander_id('Summary Other'))
+    assert (other.planet_count, other.planets_mapped) == (2, 1)
+    assert fully_mapped('Summary CMDR') and not fully_mapped('Summary Other')
+
+    parse(*arrive('Summary Other'), mapped('2', 2))
+    assert fully_mapped('Summary Other')
+    assert db.get_system_summary(system_id(), commander_id('Summary CMDR')).planets_mapped == 2
+
+
+def test_non_body_map_is_not_a_planet(database: Path) -> None:
+    parse(*explore('Summary CMDR', 1), mapped('1 A Ring', 10))
+
+    summary = db.get_system_summary(system_id(), commander_id('Summary CMDR'))
+    assert (summary.planet_count, summary.planets_mapped, summary.non_bodies_mapped) == (1, 0, 1)
+    assert not fully_mapped('Summary CMDR')
+
+    parse(*arrive('Summary CMDR'), mapped('1', 1))
+    assert fully_mapped('Summary CMDR')
+
+
+def test_triggers_match_rebuild(database: Path) -> None:
+    parse(*explore('Summary CMDR', 3), mapped('1', 1), mapped('1 A Ring', 10),
+          *explore('Summary Other', 3), mapped('2', 2), mapped('3', 3))
+    maintained = summaries()
+    assert len(maintained) == 2
+
+    db.rebuild_summaries()
+    assert summaries() == maintained
+
+
+def test_deletes_update_summary(database: Path) -> None:
+    parse(*explore('Summary CMDR', 3), mapped('1', 1), mapped('2', 2))
+    cmdr_id = commander_id('Summary CMDR')
+    session = db.get_session()
+    flora = db.PlanetFlora(planet_id=session.scalar(select(db.Planet.id).where(db.Planet.name == '3')),
+                           genus='$Codex_Ent_Bacterial_Genus_Name;')
+    session.add(flora)
+    session.flush()
+    session.add(db.FloraScans(commander_id=cmdr_id, flora_id=flora.id, count=3))
+    session.commit()
+    session.close()
+    summary = db.get_system_summary(system_id(), cmdr_id)
+    assert (summary.planets_discovered, summary.species_confirmed) == (3, 1)
+
+    with db.get_engine().begin() as connection:
+        connection.execute(delete(db.Planet).where(db.Planet.name == '3'))
+    summary = db.get_system_summary(system_id(), cmdr_id)
+    assert (summary.planet_count, summary.planets_discovered, summary.planets_mapped) == (2, 2, 2)
+    assert summary.species_confirmed == 0
+
+    with db.get_engine().begin() as connection:
+        connection.execute(delete(db.PlanetStatus).where(db.PlanetStatus.commander_id == cmdr_id)
+                           .where(db.PlanetStatus.planet_id.in_(select(db.Planet.id).where(db.Planet.name == '1'))))
+    summary = db.get_system_summary(system_id(), cmdr_id)
+    assert (summary.planet_count, summary.planets_mapped, summary.planets_efficient) == (2, 1, 1)
+
+    maintained = summaries()
+    db.rebuild_summaries()
+    assert summaries() == maintained
@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+# ExploData module plugin for EDMC
+# Source: https://github.com/Silarn/EDMC-ExploData
+# Licensed under the [GNU Public License (GPL)](http://www.gnu.org/licenses/gpl-2.0.html) version 2 or later.
+
+"""
+End-to-end import benchmark. Generates a synthetic journal corpus, then measures:
+
+- cold import: the threaded journal import into an empty database
+- warm re-import: the same import again, where every journal is already logged
+- migration check: db.migrate against the populated database
+- live hook latency: each event passed through the EDMC journal_entry hook, into a separate empty database
+- the resulting database size
+
+Each phase runs in its own process against a temporary EDMC data directory, so phases don't share engines or caches.
+
+Usage: python tools/benchmark.py [--systems N] [--commanders N] [--sessions N] [--seed N] [--decode-processes N]
+                                 [--json FILE]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Iterable, Mapping
+
+import edmc_env
+from journal_corpus import generate_corpus, iter_events
+
+
+def percentiles(values: Iterable[float], points: Iterable[float] = (50, 90, 99, 99.9)) -> dict[str, float]:
+    """
+    Nearest-rank percentiles of a set of measurements
+
+    :param values: The measurements
+    :param points: The percentiles to compute
+    :return: Dict of 'p50' style keys to values, plus 'max'. Empty if there are no values.
+    """
+
+    ordered = sorted(values)
+    if not ordered:
+        return {}
+    result = {}
+    for point in points:
+        rank = max(1, -(-len(ordered) * point // 100))
+        result[f'p{point:g}'] = ordered[int(rank) - 1]
+    result['max'] = ordered[-1]
+    return result
+
+
+def database_size(app_dir: Path) -> int:
+    return sum(path.stat().st_size for path in app_dir.glob('explodata.db*'))
+
+
+def run_import_phase(app_dir: Path, journal_dir: Path, decode_processes: int) -> dict[str, Any]:
+    edmc_env.setup(app_dir, {'journaldir': str(journal_dir)})
+    from ExploData.explo_data import db, journal_parse
+
+    db.init()
+    journal_parse.set_decode_processes(decode_processes)
+    start = perf_counter()
+    journal_parse.journal_worker()
+    cold = perf_counter() - start
+    cold_stats = journal_parse.get_import_stats()
+    error = journal_parse.has_error()
+
+    start = perf_counter()
+    journal_parse.journal_worker()
+    warm = perf_counter() - start
+
+    start = perf_counter()
+    db.migrate(db.get_engine())
+    migrate = perf_counter() - start
+
+    with db.get_engine().connect() as connection:
+        connection.exec_driver_sql('PRAGMA wal_checkpoint(TRUNCATE)')
+    db.shutdown()
+    return {
+        'cold_seconds': cold, 'warm_seconds': warm, 'migrate_seconds': migrate, 'import_error': error,
+        'events': cold_stats.events, 'bytes': cold_stats.bytes_total,
+        'events_per_second': cold_stats.events / cold if cold else 0.0,
+        'decode_seconds': cold_stats.decode_time, 'process_seconds': cold_stats.process_time,
+        'commit_seconds': cold_stats.commit_time, 'lock_wait_seconds': cold_stats.lock_wait,
+        'db_bytes': database_size(app_dir),
+    }
+
+
+def run_live_phase(app_dir: Path, journal_dir: Path, limit: int) -> dict[str, Any]:
+    edmc_env.setup(app_dir)
+    import load
+
+    load.plugin_start3(str(edmc_env.PLUGIN_DIR))
+    cmdr, system, state = '', '', {'StarPos': None}
+    latencies: list[float] = []
+    by_event: dict[str, list[float]] = {}
+    for entry in iter_events(sorted(journal_dir.glob('Journal.*.log'))):
+        if limit and len(latencies) >= limit:
+            break
+        match entry['event']:
+            case 'Commander':
+                cmdr = entry['Name']
+            case 'LoadGame':
+                cmdr = entry['Commander']
+            case 'Location' | 'FSDJump' | 'CarrierJump':
+                system, state['StarPos'] = entry['StarSystem'], entry['StarPos']
+        start = perf_counter()
+        load.journal_entry(cmdr, False, system, '', entry, state)
+        latency = perf_counter() - start
+        latencies.append(latency)
+        by_event.setdefault(entry['event'], []).append(latency)
+    load.plugin_stop()
+    return {
+        'events': len(latencies), 'total_seconds': sum(latencies), 'latency': percentiles(latencies),
+        'by_event': {event: {'count': len(values), 'total_seconds': sum(values), **percentiles(values, (50, 99))}
+                     for event, values in by_event.items()},
+        'db_bytes': database_size(app_dir),
+    }
+
+
+def run_phase(phase: str, app_dir: Path, journal_dir: Path, limit: int, decode_processes: int = 0) -> dict[str, Any]:
+    """ Run a benchmark phase in a child process, so every phase starts cold """
+
+    app_dir.mkdir(parents=True, exist_ok=True)
+    for path in app_dir.glob('explodata.db*'):
+        path.unlink()
+    result = subprocess.run([sys.executable, __file__, '--phase', phase, '--app-dir', str(app_dir),
+                             '--journal-dir', str(journal_dir), '--live-events', str(limit),
+                             '--decode-processes', str(decode_processes)],
+                            check=True, stdout=subprocess.PIPE, text=True)
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def print_report(corpus: Mapping[str, Any], results: Mapping[str, Any]) -> None:
+    imported = results['import']
+    live = results['live']
+    print(f'Corpus: {corpus["journals"]} journals, {corpus["bytes"] / 1024:.0f} KiB, {imported["events"]} events')
+    print(f'Cold import:   {imported["cold_seconds"]:8.2f}s  ({imported["events_per_second"]:.0f} events/s, '
+          f'decode {imported["decode_seconds"]:.2f}s, process {imported["process_seconds"]:.2f}s, '
+          f'commit {imported["commit_seconds"]:.2f}s, lock wait {imported["lock_wait_seconds"]:.2f}s)')
+    print(f'Warm import:   {imported["warm_seconds"]:8.2f}s')
+    print(f'Migrate check: {imported["migrate_seconds"]:8.2f}s')
+    print(f'Database size: {imported["db_bytes"] / 1024:8.0f} KiB')
+    latency = live['latency']
+    print(f'Live hook:     {live["total_seconds"]:8.2f}s for {live["events"]} events  '
+          + '  '.join(f'{key} {value * 1000:.2f}ms' for key, value in latency.items()))
+    slowest = sorted(live['by_event'].items(), key=lambda item: item[1]['total_seconds'], reverse=True)[:8]
+    for event, stats in slowest:
+        print(f'  {event:<20} {stats["count"]:>7} events  {stats["total_seconds"]:8.2f}s  '
+              f'p50 {stats["p50"] * 1000:.2f}ms  p99 {stats["p99"] * 1000:.2f}ms  max {stats["max"] * 1000:.2f}ms')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark ExploData journal imports and the live journal hook')
+    parser.add_argument('--systems', type=int, default=200, help='number of systems in the galaxy')
+    parser.add_argument('--commanders', type=int, default=1)
+    parser.add_argument('--sessions', type=int, default=4, help='journal files per commander')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--live-events', type=int, default=0, help='limit the live hook phase to N events')
+    parser.add_argument('--decode-processes', type=int, default=0,
+                        help='decode journals in N worker processes during the import phase')
+    parser.add_argument('--work-dir', type=Path, help='keep the corpus and databases here instead of a temp dir')
+    parser.add_argument('--json', type=Path, help='also write the results to a JSON file')
+    parser.add_argument('--phase', choices=['import', 'live'], help=argparse.SUPPRESS)
+    parser.add_argument('--app-dir', type=Path, help=argparse.SUPPRESS)
+    parser.add_argument('--journal-dir', type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.phase == 'import':
+        print(json.dumps(run_import_phase(args.app_dir, args.journal_dir, args.decode_processes)))
+        return
+    if args.phase == 'live':
+        print(json.dumps(run_live_phase(args.app_dir, args.journal_dir, args.live_events)))
+        return
+
+    with tempfile.TemporaryDirectory(prefix='explodata-bench-') as temp_dir:
+        work_dir = args.work_dir or Path(temp_dir)
+        journal_dir = work_dir / 'journals'
+        for path in journal_dir.glob('Journal.*.log'):
+            path.unlink()
+        files = generate_corpus(journal_dir, args.systems, args.commanders, args.sessions, args.seed)
+        corpus = {'journals': len(files), 'bytes': sum(path.stat().st_size for path in files),
+                  'systems': args.systems, 'commanders': args.commanders, 'sessions': args.sessions,
+                  'seed': args.seed, 'decode_processes': args.decode_processes}
+        results = {
+            'corpus': corpus,
+            'import': run_phase('import', work_dir / 'import', journal_dir, args.live_events, args.decode_processes),
+            'live': run_phase('live', work_dir / 'live', journal_dir, args.live_events),
+        }
+
+    print_report(corpus, results)
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+# ExploData module plugin for EDMC
+# Source: https://github.com/Silarn/EDMC-ExploData
+# Licensed under the [GNU Public License (GPL)](http://www.gnu.org/licenses/gpl-2.0.html) version 2 or later.
+
+"""
+Environment setup for running ExploData outside EDMC. Stand-ins for the EDMC `config` and `EDMCLogging` modules
+are installed when the real ones can't be imported, and the plugin sources are added to the import path.
+"""
+
+import logging
+import sys
+import types
+from pathlib import Path
+from typing import Any, Optional
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+PLUGIN_DIR = REPO_DIR / 'src' / 'ExploData'
+
+
+class StandaloneConfig:
+    """ Minimal replacement for the EDMC config object. Settings are read from a plain dict. """
+
+    def __init__(self, app_dir: Path, settings: Optional[dict[str, Any]] = None):
+        self.app_dir_path: Path = app_dir
+        self.default_journal_dir: str = str(app_dir / 'journals')
+        self.settings: dict[str, Any] = settings or {}
+
+    def get_str(self, key: str, *, default: Optional[str] = None) -> Optional[str]:
+        return self.settings.get(key, default)
+
+    def get_int(self, key: str, *, default: int = 0) -> int:
+        return self.settings.get(key, default)
+
+    def get_bool(self, key: str, *, default: Optional[bool] = None) -> Optional[bool]:
+        return self.settings.get(key, default)
+
+    def set(self, key: str, value: Any) -> None:
+        self.settings[key] = value
+
+
+def add_plugin_path() -> None:
+    """
+    Make the ExploData package (and the plugin's own `explo_data` imports) importable
+    """
+
+    for path in (str(PLUGIN_DIR.parent), str(PLUGIN_DIR)):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+
+def setup(app_dir: Path, settings: Optional[dict[str, Any]] = None, log_level: int = logging.WARNING) -> None:
+    """
+    Prepare the import path and EDMC modules. Must run before any ExploData module is imported.
+
+    :param app_dir: The directory used as the EDMC app data directory, which holds explodata.db
+    :param settings: Optional EDMC config settings, such as 'journaldir'
+    :param log_level: Log level of the stand-in plugin logger
+    """
+
+    add_plugin_path()
+    try:
+        import config  # noqa: F401
+    except ImportError:
+        module = types.ModuleType('config')
+        module.config = StandaloneConfig(app_dir, settings)
+        sys.modules['config'] = module
+
+    try:
+        import EDMCLogging  # noqa: F401
+    except ImportError:
+        logging.basicConfig(format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+        def get_plugin_logger(name: str) -> logging.Logger:
+            logger = logging.getLogger(name)
+            logger.setLevel(log_level)
+            return logger
+
+        module = types.ModuleType('EDMCLogging')
+        module.get_plugin_logger = get_plugin_logger
+        sys.modules['EDMCLogging'] = module
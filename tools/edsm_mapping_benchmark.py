@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+# ExploData module plugin for EDMC
+# Source: https://github.com/Silarn/EDMC-ExploData
+# Licensed under the [GNU Public License (GPL)](http://www.gnu.org/licenses/gpl-2.0.html) version 2 or later.
+
+"""
+Measure the EDSM type, star class and atmosphere mapping at dump scale: the lookup tables in
+ExploData.explo_data.body_data.edsm against the match and endswith chains they replaced, which are kept as reference
+implementations in tests/test_edsm_mapping.py. Inputs cycle through a mix of table keys and values which fall through.
+
+Usage: python tools/edsm_mapping_benchmark.py [--calls N] [--json FILE]
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable
+
+import edmc_env
+
+TESTS_DIR = Path(__file__).resolve().parent.parent / 'tests'
+
+
+def get_inputs() -> dict[str, list[str]]:
+    """ Inputs per mapping, as found in EDSM bodies: mostly known values with some unknown ones """
+
+    from ExploData.explo_data.body_data.edsm import EDSM_ATMOSPHERES, EDSM_STAR_CLASSES, EDSM_TYPES
+
+    prefixes = ['', 'Thin ', 'Thick ', 'Hot thick ', 'Hot thin ']
+    return {
+        'type': [*EDSM_TYPES, 'Icy body', 'Rocky body', 'Water world', 'Ammonia world'],
+        'star class': [*EDSM_STAR_CLASSES, 'K (Yellow-Orange) Star', 'M (Red dwarf) Star', 'F (White) Star'],
+        'atmosphere': [prefix + suffix for suffix in EDSM_ATMOSPHERES for prefix in prefixes] + ['No atmosphere'],
+    }
+
+
+def time_calls(func: Callable[[str], Any], inputs: list[str], calls: int) -> float:
+    """ Total seconds for the calls, cycling through the inputs """
+
+    start = perf_counter()
+    for index in range(calls):
+        func(inputs[index % len(inputs)])
+    return perf_counter() - start
+
+
+def run(calls: int) -> dict[str, Any]:
+    """
+    Time every mapping against its reference chain
+
+    :param calls: Calls per measurement
+    :return: Seconds per mapping for the reference chain and the current lookup
+    """
+
+    from ExploData.explo_data.body_data import edsm
+    sys.path.insert(0, str(TESTS_DIR))
+    from test_edsm_mapping import endswith_chain, star_class_match_chain, type_match_chain
+
+    mappings = {
+        'type': (type_match_chain, edsm.map_edsm_type),
+        'star class': (star_class_match_chain, edsm.parse_edsm_star_class),
+        'atmosphere': (endswith_chain, edsm.map_edsm_atmosphere),
+    }
+    results = {}
+    for name, inputs in get_inputs().items():
+        chain, lookup = mappings[name]
+        edsm._atmosphere_cache.clear()
+        results[name] = {'inputs': len(inputs), 'chain_s': time_calls(chain, inputs, calls),
+                         'lookup_s': time_calls(lookup, inputs, calls)}
+    return results
+
+
+def print_report(results: dict[str, Any], calls: int) -> None:
+    print(f'{calls} calls per mapping')
+    print(f'{"mapping":<12} {"chain":>9} {"lookup":>9} {"speedup":>8}')
+    for name, result in results.items():
+        print(f'{name:<12} {result["chain_s"]:8.3f}s {result["lookup_s"]:8.3f}s '
+              f'{result["chain_s"] / result["lookup_s"]:7.1f}x')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark the EDSM body mapping lookups')
+    parser.add_argument('--calls', type=int, default=1000000, help='calls per measurement')
+    parser.add_argument('--json', type=Path, help='also write the results to a JSON file')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='explodata-mapping-') as temp_dir:
+        edmc_env.setup(Path(temp_dir))
+        results = run(args.calls)
+    print_report(results, args.calls)
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
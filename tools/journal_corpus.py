@@ -0,0 +1,357 @@
+# -*- coding: utf-8 -*-
+# ExploData module plugin for EDMC
+# Source: https://github.com/Silarn/EDMC-ExploData
+# Licensed under the [GNU Public License (GPL)](http://www.gnu.org/licenses/gpl-2.0.html) version 2 or later.
+
+"""
+Deterministic synthetic journal corpus generator. Builds a galaxy of systems with stars, belts, planets, moons, rings,
+and biological signals, then writes Journal.*.log files of commanders exploring it. The same arguments always
+produce the same files.
+
+Usage: python tools/journal_corpus.py OUT_DIR [--systems N] [--commanders N] [--sessions N] [--seed N]
+"""
+
+import argparse
+import json
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from edmc_env import add_plugin_path
+
+add_plugin_path()
+
+from ExploData.explo_data.bio_data.species import data as bio_species  # noqa: E402
+
+START_TIME = datetime(2024, 1, 1, 12, 0, 0)
+STAR_TYPES = [('M', 'Va'), ('K', 'V'), ('G', 'V'), ('F', 'V'), ('A', 'Vab'), ('B', 'IV'), ('L', 'V'), ('T', 'V'),
+              ('TTS', 'VI'), ('DA', 'VII'), ('N', 'VII'), ('Y', 'V')]
+STAR_WEIGHTS = [40, 18, 10, 8, 5, 2, 6, 4, 3, 2, 1, 1]
+PLANET_CLASSES = [('Icy body', 30), ('Rocky body', 25), ('High metal content body', 20), ('Rocky ice body', 10),
+                  ('Sudarsky class I gas giant', 6), ('Sudarsky class II gas giant', 3), ('Water world', 2),
+                  ('Metal rich body', 2), ('Earthlike body', 1), ('Ammonia world', 1)]
+ATMOSPHERES = [('', '', []), ('thin carbon dioxide atmosphere', 'CarbonDioxide', [('CarbonDioxide', 99.0)]),
+               ('thin sulphur dioxide atmosphere', 'SulphurDioxide', [('SulphurDioxide', 100.0)]),
+               ('thin ammonia atmosphere', 'Ammonia', [('Ammonia', 100.0)]),
+               ('thin argon atmosphere', 'Argon', [('Argon', 95.0), ('Nitrogen', 5.0)]),
+               ('thin neon-rich atmosphere', 'NeonRich', [('Neon', 80.0), ('Argon', 20.0)]),
+               ('thin methane atmosphere', 'Methane', [('Methane', 97.0), ('Nitrogen', 3.0)])]
+VOLCANISM = ['', '', '', 'minor water geysers volcanism', 'minor metallic magma volcanism',
+             'major rocky magma volcanism', 'minor carbon dioxide geysers volcanism']
+MATERIALS = ['iron', 'nickel', 'sulphur', 'carbon', 'chromium', 'manganese', 'phosphorus', 'zinc', 'germanium',
+             'vanadium', 'zirconium', 'cadmium', 'niobium', 'arsenic', 'selenium', 'molybdenum', 'tin', 'tungsten',
+             'mercury', 'yttrium', 'technetium', 'ruthenium', 'antimony', 'tellurium', 'polonium']
+RING_CLASSES = ['eRingClass_Rocky', 'eRingClass_Metalic', 'eRingClass_MetalRich', 'eRingClass_Icy']
+GEO_CODEX = ['$Codex_Ent_Fumarole_SulphurDioxideGeysers_Name;', '$Codex_Ent_IceGeysers_WaterGeysers_Name;',
+             '$Codex_Ent_Gas_Vents_CarbonDioxideGeysers_Name;']
+NOISE_EVENTS = ['Music', 'ReceiveText', 'FuelScoop', 'ReservoirReplenished', 'Cargo', 'Materials', 'Status']
+# Genera with distinct species, as their variants can be parsed from the species name
+BIO_SPECIES = {genus: sorted(species) for genus, species in sorted(bio_species.items())
+               if not any(name == genus for name in species)}
+
+
+@dataclass
+class Body:
+    name: str
+    body_id: int
+    scan: dict[str, Any]
+    bio: list[tuple[str, str]] = field(default_factory=list)
+    geo: int = 0
+
+
+@dataclass
+class GalaxySystem:
+    name: str
+    address: int
+    pos: list[float]
+    stars: list[Body]
+    planets: list[Body]
+    clusters: list[Body]
+
+    @property
+    def body_count(self) -> int:
+        return len(self.stars) + len(self.planets)
+
+
+def build_galaxy(rng: random.Random, size: int) -> list[GalaxySystem]:
+    """
+    Build the systems of the synthetic galaxy
+
+    :param rng: The seeded random generator
+    :param size: The number of systems
+    :return: The generated systems
+    """
+
+    systems = []
+    for index in range(size):
+        name = f'Synthetic {chr(65 + index % 26)}{chr(65 + index // 26 % 26)}-{index // 676} d{index}'
+        pos = [round(rng.uniform(-20000, 20000), 5), round(rng.uniform(-800, 800), 5),
+               round(rng.uniform(-5000, 45000), 5)]
+        systems.append(build_system(rng, name, 10_000_000 + index, pos))
+    return systems
+
+
+def build_system(rng: random.Random, name: str, address: int, pos: list[float]) -> GalaxySystem:
+    body_id = 0
+    stars: list[Body] = []
+    planets: list[Body] = []
+    clusters: list[Body] = []
+    star_count = rng.choices([1, 2, 3], [70, 25, 5])[0]
+    for star_index in range(star_count):
+        letter = chr(65 + star_index)
+        star_name = name if star_count == 1 else f'{name} {letter}'
+        star_type, luminosity = rng.choices(STAR_TYPES, STAR_WEIGHTS)[0]
+        scan: dict[str, Any] = {
+            'StarType': star_type, 'Subclass': rng.randint(0, 9), 'StellarMass': round(rng.uniform(0.1, 8.0), 6),
+            'Radius': round(rng.uniform(1e8, 1e9), 3), 'AbsoluteMagnitude': round(rng.uniform(-2, 15), 6),
+            'Age_MY': rng.randint(10, 13000), 'SurfaceTemperature': round(rng.uniform(700, 30000), 1),
+            'Luminosity': luminosity, 'RotationPeriod': round(rng.uniform(1e4, 1e7), 3),
+            'AxialTilt': 0.0, 'DistanceFromArrivalLS': 0.0 if star_index == 0 else round(rng.uniform(100, 9e4), 6),
+        }
+        if star_index:
+            scan['OrbitalPeriod'] = round(rng.uniform(1e7, 1e10), 3)
+        star = Body(star_name, body_id, scan)
+        body_id += 1
+        if rng.random() < 0.4:
+            belt_name = f'{star_name} A Belt'
+            scan['Rings'] = [{'Name': belt_name, 'RingClass': rng.choice(RING_CLASSES),
+                              'MassMT': round(rng.uniform(1e9, 1e13), 1), 'InnerRad': 1e9, 'OuterRad': 2e9}]
+            for cluster in range(rng.randint(0, 3)):
+                clusters.append(Body(f'{belt_name} Cluster {cluster + 1}', body_id, {}))
+                body_id += 1
+        stars.append(star)
+
+        prefix = f'{name} ' if star_count == 1 else f'{name} {letter} '
+        for planet_index in range(rng.choices([0, 2, 5, 10, 20], [10, 30, 30, 20, 10])[0]):
+            planet_name = f'{prefix}{planet_index + 1}'
+            planets.append(build_planet(rng, planet_name, body_id, star_index))
+            body_id += 1
+            for moon in range(rng.choices([0, 1, 3], [60, 25, 15])[0]):
+                planets.append(build_planet(rng, f'{planet_name} {chr(97 + moon)}', body_id, star_index))
+                body_id += 1
+
+    return GalaxySystem(name, address, pos, stars, planets, clusters)
+
+
+def build_planet(rng: random.Random, name: str, body_id: int, parent: int) -> Body:
+    planet_class = rng.choices([item[0] for item in PLANET_CLASSES], [item[1] for item in PLANET_CLASSES])[0]
+    gas_giant = 'giant' in planet_class
+    landable = not gas_giant and rng.random() < 0.55
+    atmosphere, atmosphere_type, composition = rng.choice(ATMOSPHERES) if not gas_giant else ('', '', [])
+    scan: dict[str, Any] = {
+        'DistanceFromArrivalLS': round(rng.uniform(5, 2e5), 6), 'TidalLock': rng.random() < 0.5,
+        'TerraformState': 'Terraformable' if not gas_giant and rng.random() < 0.05 else '',
+        'PlanetClass': planet_class, 'Atmosphere': atmosphere, 'AtmosphereType': atmosphere_type or 'None',
+        'Volcanism': rng.choice(VOLCANISM), 'MassEM': round(rng.uniform(0.001, 300 if gas_giant else 3), 6),
+        'Radius': round(rng.uniform(2e5, 7e7 if gas_giant else 7e6), 3),
+        'SurfaceGravity': round(rng.uniform(0.2, 30.0), 6), 'SurfaceTemperature': round(rng.uniform(20, 900), 6),
+        'SurfacePressure': round(rng.uniform(0, 1e5), 6) if atmosphere else 0.0, 'Landable': landable,
+        'Parents': [{'Star': parent}], 'SemiMajorAxis': round(rng.uniform(1e9, 1e13), 3),
+        'OrbitalPeriod': round(rng.uniform(1e5, 1e9), 3), 'RotationPeriod': round(rng.uniform(1e4, 1e7), 3),
+        'AxialTilt': round(rng.uniform(-3, 3), 6),
+    }
+    if composition:
+        scan['AtmosphereComposition'] = [{'Name': gas, 'Percent': percent} for gas, percent in composition]
+    if landable:
+        chosen = rng.sample(MATERIALS, 8)
+        scan['Materials'] = [{'Name': material, 'Percent': round(rng.uniform(0.1, 20), 6)} for material in chosen]
+    if gas_giant and rng.random() < 0.5:
+        scan['Rings'] = [{'Name': f'{name} A Ring', 'RingClass': rng.choice(RING_CLASSES),
+                          'MassMT': round(rng.uniform(1e9, 1e12), 1), 'InnerRad': 1e8, 'OuterRad': 2e8}]
+    body = Body(name, body_id, scan)
+    if landable and atmosphere and rng.random() < 0.3:
+        body.bio = [(genus, rng.choice(BIO_SPECIES[genus]))
+                    for genus in rng.sample(sorted(BIO_SPECIES), rng.randint(1, 4))]
+    if landable and scan['Volcanism'] and rng.random() < 0.5:
+        body.geo = rng.randint(1, 5)
+    return body
+
+
+class JournalWriter:
+    """ Builds the events of a game session with increasing timestamps """
+
+    def __init__(self, rng: random.Random, start: datetime, noise: float):
+        self.rng = rng
+        self.time = start
+        self.noise = noise
+        self.events: list[dict[str, Any]] = []
+
+    def add(self, event: str, **data: Any) -> None:
+        self.time += timedelta(seconds=self.rng.randint(1, 20))
+        self.events.append({'timestamp': self.time.strftime('%Y-%m-%dT%H:%M:%SZ'), 'event': event, **data})
+        if self.rng.random() < self.noise:
+            self.time += timedelta(seconds=1)
+            noise = self.rng.choice(NOISE_EVENTS)
+            self.events.append({'timestamp': self.time.strftime('%Y-%m-%dT%H:%M:%SZ'), 'event': noise})
+
+
+def visit_system(journal: JournalWriter, system: GalaxySystem, rng: random.Random, first: bool) -> None:
+    """
+    Add the events of a commander exploring a system: jump, honk, FSS, mapping, and surface bio scans
+
+    :param journal: The session being written
+    :param system: The visited system
+    :param rng: The seeded random generator
+    :param first: Whether this session starts in the system (Location) or jumps to it (FSDJump)
+    """
+
+    location = {'StarSystem': system.name, 'SystemAddress': system.address, 'StarPos': system.pos,
+                'Body': system.stars[0].name, 'BodyID': 0, 'BodyType': 'Star'}
+    if first:
+        journal.add('Location', Docked=False, **location)
+    else:
+        journal.add('StartJump', JumpType='Hyperspace', StarSystem=system.name, SystemAddress=system.address,
+                    StarClass=system.stars[0].scan['StarType'])
+        journal.add('FSDJump', JumpDist=round(rng.uniform(5, 80), 3), FuelUsed=round(rng.uniform(0.5, 5), 6),
+                    FuelLevel=round(rng.uniform(5, 32), 6), **location)
+
+    def scan(body: Body, scan_type: str) -> dict[str, Any]:
+        return {'ScanType': scan_type, 'BodyName': body.name, 'BodyID': body.body_id, 'StarSystem': system.name,
+                'SystemAddress': system.address, **body.scan,
+                'WasDiscovered': rng.random() < 0.2, 'WasMapped': rng.random() < 0.05}
+
+    journal.add('Scan', **scan(system.stars[0], 'AutoScan'))
+    journal.add('FSSDiscoveryScan', Progress=round(rng.uniform(0.1, 0.9), 6), BodyCount=system.body_count,
+                NonBodyCount=len(system.clusters), SystemName=system.name, SystemAddress=system.address)
+    for body in system.stars[1:] + system.planets:
+        if rng.random() < 0.1:
+            journal.add('Scan', **scan(body, 'NavBeaconDetail'))
+        journal.add('Scan', **scan(body, 'Detailed'))
+        signals = []
+        if body.bio:
+            signals.append({'Type': '$SAA_SignalType_Biological;', 'Count': len(body.bio)})
+        if body.geo:
+            signals.append({'Type': '$SAA_SignalType_Geological;', 'Count': body.geo})
+        if signals:
+            journal.add('FSSBodySignals', BodyName=body.name, BodyID=body.body_id, SystemAddress=system.address,
+                        Signals=signals)
+    for cluster in system.clusters:
+        journal.add('Scan', ScanType='Detailed', BodyName=cluster.name, BodyID=cluster.body_id,
+                    StarSystem=system.name, SystemAddress=system.address, WasDiscovered=False, WasMapped=False,
+                    DistanceFromArrivalLS=0.0)
+    journal.add('FSSAllBodiesFound', SystemName=system.name, SystemAddress=system.address, Count=system.body_count)
+
+    for body in system.planets:
+        if not (body.bio or body.geo or rng.random() < 0.05):
+            continue
+        target = rng.randint(3, 12)
+        journal.add('SAAScanComplete', BodyName=body.name, SystemAddress=system.address, BodyID=body.body_id,
+                    ProbesUsed=target + rng.choice([-1, 0, 0, 2]), EfficiencyTarget=target)
+        signals = []
+        if body.bio:
+            signals.append({'Type': '$SAA_SignalType_Biological;', 'Count': len(body.bio)})
+        if body.geo:
+            signals.append({'Type': '$SAA_SignalType_Geological;', 'Count': body.geo})
+        journal.add('SAASignalsFound', BodyName=body.name, SystemAddress=system.address, BodyID=body.body_id,
+                    Signals=signals, Genuses=[{'Genus': genus} for genus, _ in body.bio])
+        if body.bio and rng.random() < 0.3:
+            land_on_body(journal, system, body, rng)
+
+
+def land_on_body(journal: JournalWriter, system: GalaxySystem, body: Body, rng: random.Random) -> None:
+    star_class = system.stars[0].scan['StarType'][0]
+    location = {'SystemAddress': system.address, 'Body': body.name, 'BodyID': body.body_id}
+    journal.add('Touchdown', PlayerControlled=True, Latitude=round(rng.uniform(-80, 80), 6),
+                Longitude=round(rng.uniform(-180, 180), 6), NearestDestination='', StarSystem=system.name, **location)
+    journal.add('Disembark', SRV=False, Taxi=False, Multicrew=False, OnStation=False, OnPlanet=True,
+                StarSystem=system.name, **location)
+    for genus, species in body.bio:
+        variant = f'{species[:-len("Name;")]}{star_class}_Name;'
+        codex = {'EntryID': rng.randint(2_000_000, 2_500_000), 'Name': variant, 'Category': '$Codex_Category_Biology;',
+                 'SubCategory': '$Codex_SubCategory_Organic_Structures;', 'Region': '$Codex_RegionName_18;',
+                 'System': system.name, 'SystemAddress': system.address, 'BodyID': body.body_id,
+                 'IsNewEntry': rng.random() < 0.1}
+        journal.add('CodexEntry', **codex)
+        for scan_type in ('Log', 'Sample', 'Sample', 'Analyse'):
+            journal.add('ScanOrganic', ScanType=scan_type, Genus=genus, Species=species, Variant=variant,
+                        WasLogged=False, SystemAddress=system.address, Body=body.body_id)
+    if body.geo:
+        journal.add('CodexEntry', EntryID=rng.randint(1_000_000, 1_500_000), Name=rng.choice(GEO_CODEX),
+                    Category='$Codex_Category_Geology;', SubCategory='$Codex_SubCategory_Geology_and_Anomalies;',
+                    Region='$Codex_RegionName_18;', System=system.name, SystemAddress=system.address,
+                    BodyID=body.body_id, IsNewEntry=False)
+    journal.add('Embark', SRV=False, Taxi=False, Multicrew=False, OnStation=False, OnPlanet=True,
+                StarSystem=system.name, **location)
+    journal.add('Liftoff', PlayerControlled=True, StarSystem=system.name, **location)
+
+
+def session_events(rng: random.Random, commander: str, fid: str, start: datetime, route: list[GalaxySystem],
+                   noise: float) -> list[dict[str, Any]]:
+    journal = JournalWriter(rng, start, noise)
+    journal.add('Fileheader', part=1, language='English/UK', Odyssey=True, gameversion='4.0.0.1900',
+                build='r300000/r0 ')
+    journal.add('Commander', FID=fid, Name=commander)
+    journal.add('LoadGame', FID=fid, Commander=commander, Horizons=True, Odyssey=True, Ship='DiamondBackXL',
+                ShipID=1, GameMode='Solo', Credits=rng.randint(1_000_000, 1_000_000_000), Loan=0)
+    for index, system in enumerate(route):
+        visit_system(journal, system, rng, index == 0)
+    journal.add('Shutdown')
+    return journal.events
+
+
+def generate_corpus(out_dir: Path, systems: int = 200, commanders: int = 1, sessions: int = 4, seed: int = 1,
+                    noise: float = 0.1, visits: Optional[int] = None) -> list[Path]:
+    """
+    Write a synthetic journal corpus. Each commander explores a random route through the galaxy, split into
+    sessions, with one journal file per session.
+
+    :param out_dir: The output directory, created if needed
+    :param systems: The number of systems in the galaxy
+    :param commanders: The number of commanders
+    :param sessions: The number of journal files per commander
+    :param seed: The random seed
+    :param noise: The probability of a noise event after each event
+    :param visits: Systems visited per commander. Defaults to the galaxy size.
+    :return: The written journal files
+    """
+
+    rng = random.Random(seed)
+    galaxy = build_galaxy(rng, systems)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    files = []
+    start = START_TIME
+    for commander in range(commanders):
+        route = rng.sample(galaxy, min(visits or systems, systems))
+        per_session = max(1, -(-len(route) // sessions))
+        for session in range(sessions):
+            legs = route[session * per_session:(session + 1) * per_session]
+            if not legs:
+                break
+            events = session_events(rng, f'Synthetic Cmdr {commander + 1}', f'F{1000 + commander}', start, legs,
+                                    noise)
+            path = out_dir / f'Journal.{start.strftime("%Y-%m-%dT%H%M%S")}.01.log'
+            with open(path, 'w', encoding='utf-8') as journal_file:
+                for event in events:
+                    journal_file.write(json.dumps(event, separators=(', ', ':')) + '\n')
+            files.append(path)
+            start = datetime.strptime(events[-1]['timestamp'], '%Y-%m-%dT%H:%M:%SZ') + timedelta(hours=1)
+    return files
+
+
+def iter_events(files: list[Path]) -> Iterator[dict[str, Any]]:
+    for path in files:
+        with open(path, 'rb') as journal_file:
+            for line in journal_file:
+                yield json.loads(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Write a deterministic synthetic journal corpus')
+    parser.add_argument('out_dir', type=Path)
+    parser.add_argument('--systems', type=int, default=200, help='number of systems in the galaxy')
+    parser.add_argument('--commanders', type=int, default=1)
+    parser.add_argument('--sessions', type=int, default=4, help='journal files per commander')
+    parser.add_argument('--visits', type=int, default=None, help='systems visited per commander')
+    parser.add_argument('--noise', type=float, default=0.1, help='probability of a noise event after each event')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    files = generate_corpus(args.out_dir, args.systems, args.commanders, args.sessions, args.seed, args.noise,
+                            args.visits)
+    size = sum(path.stat().st_size for path in files)
+    print(f'Wrote {len(files)} journals ({size / 1024:.0f} KiB) to {args.out_dir}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+# ExploData module plugin for EDMC
+# Source: https://github.com/Silarn/EDMC-ExploData
+# Licensed under the [GNU Public License (GPL)](http://www.gnu.org/licenses/gpl-2.0.html) version 2 or later.
+
+"""
+Replay a recorded EDMC session through the ExploData journal hook outside EDMC, and report per-event latency.
+Recordings are made in EDMC with ExploData.explo_data.journal_recorder.start_recording().
+
+The replay writes into an empty database in a temporary EDMC data directory, unless --app-dir points elsewhere.
+
+Usage: python tools/replay.py RECORDING [--speed N] [--write-behind] [--json FILE]
+"""
+
+import argparse
+import json
+import tempfile
+from pathlib import Path
+from time import perf_counter, sleep
+from typing import Any, Optional
+
+import edmc_env
+from benchmark import percentiles
+
+
+def replay(recording: Path, app_dir: Path, speed: float = 0.0, write_behind: bool = False,
+           limit: Optional[int] = None) -> dict[str, Any]:
+    """
+    Drive the EDMC journal hook with recorded calls
+
+    :param recording: The recording file
+    :param app_dir: The EDMC data directory used for the database
+    :param speed: Playback speed relative to the recording. 0 replays as fast as possible.
+    :param write_behind: Use the write-behind journal writer, as a plugin enabling it would
+    :param limit: Optional maximum number of events to replay
+    :return: Latency results, overall and by event type
+    """
+
+    edmc_env.setup(app_dir)
+    import load
+    from ExploData.explo_data import db, journal_writer
+    from ExploData.explo_data.journal_recorder import read_recording
+
+    load.plugin_start3(str(edmc_env.PLUGIN_DIR))
+    if write_behind:
+        db.init()
+        journal_writer.start_writer()
+
+    latencies: list[float] = []
+    by_event: dict[str, list[float]] = {}
+    lag: list[float] = []
+    state: dict[str, Any] = {}
+    start = perf_counter()
+    for event in read_recording(recording):
+        if limit and len(latencies) >= limit:
+            break
+        if speed:
+            delay = event.offset / speed - (perf_counter() - start)
+            if delay > 0:
+                sleep(delay)
+            else:
+                lag.append(-delay)
+        state['StarPos'] = event.star_pos
+        call_start = perf_counter()
+        load.journal_entry(event.cmdr, False, event.system, '', event.entry, state)
+        latency = perf_counter() - call_start
+        latencies.append(latency)
+        by_event.setdefault(event.entry.get('event', ''), []).append(latency)
+
+    flush_time = 0.0
+    if write_behind:
+        flush_start = perf_counter()
+        journal_writer.flush()
+        flush_time = perf_counter() - flush_start
+    total = perf_counter() - start
+    load.plugin_stop()
+    return {
+        'events': len(latencies), 'wall_seconds': total, 'hook_seconds': sum(latencies),
+        'writer_flush_seconds': flush_time, 'latency': percentiles(latencies),
+        'max_lag_seconds': max(lag, default=0.0),
+        'by_event': {name: {'count': len(values), 'total_seconds': sum(values), **percentiles(values, (50, 99))}
+                     for name, values in by_event.items()},
+    }
+
+
+def print_report(results: dict[str, Any]) -> None:
+    print(f'Replayed {results["events"]} events in {results["wall_seconds"]:.2f}s '
+          f'({results["hook_seconds"]:.2f}s in the journal hook)')
+    if results['writer_flush_seconds']:
+        print(f'Write-behind queue drained in {results["writer_flush_seconds"]:.2f}s after the last event')
+    if results['max_lag_seconds']:
+        print(f'Fell behind the recorded timing by up to {results["max_lag_seconds"]:.2f}s')
+    print('Hook latency: ' + '  '.join(f'{key} {value * 1000:.2f}ms' for key, value in results['latency'].items()))
+    slowest = sorted(results['by_event'].items(), key=lambda item: item[1]['max'], reverse=True)[:10]
+    for name, stats in slowest:
+        print(f'  {name:<24} {stats["count"]:>7} events  {stats["total_seconds"]:8.2f}s  '
+              f'p50 {stats["p50"] * 1000:.2f}ms  p99 {stats["p99"] * 1000:.2f}ms  max {stats["max"] * 1000:.2f}ms')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Replay a recorded EDMC session through the ExploData journal hook')
+    parser.add_argument('recording', type=Path)
+    parser.add_argument('--speed', type=float, default=0.0,
+                        help='playback speed relative to the recording, 1 for real time. Default: as fast as possible')
+    parser.add_argument('--write-behind', action='store_true', help='replay with the write-behind journal writer')
+    parser.add_argument('--limit', type=int, default=None, help='replay only the first N events')
+    parser.add_argument('--app-dir', type=Path, help='EDMC data directory for the database. Default: a temp dir')
+    parser.add_argument('--json', type=Path, help='also write the results to a JSON file')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='explodata-replay-') as temp_dir:
+        results = replay(args.recording, args.app_dir or Path(temp_dir), args.speed, args.write_behind, args.limit)
+    print_report(results)
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+# ExploData module plugin for EDMC
+# Source: https://github.com/Silarn/EDMC-ExploData
+# Licensed under the [GNU Public License (GPL)](http://www.gnu.org/licenses/gpl-2.0.html) version 2 or later.
+
+"""
+Measure the per-event lookup statements: a select built on every call, as the journal parser used to, against the
+prebuilt statements in ExploData.explo_data.statements. Lookups run against a database imported from a synthetic
+journal corpus, cycling through keys found in it.
+
+Usage: python tools/statement_benchmark.py [--systems N] [--iterations N] [--json FILE]
+"""
+
+import argparse
+import json
+import tempfile
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable, NamedTuple
+
+import edmc_env
+from journal_corpus import generate_corpus
+
+
+class Lookup(NamedTuple):
+    """ A lookup run per event. The key query finds parameter sets to cycle through. """
+    name: str
+    build: Callable[[dict[str, Any]], Any]
+    prebuilt: Any
+    keys: str
+
+
+def get_lookups() -> list[Lookup]:
+    from sqlalchemy import select
+    from ExploData.explo_data import statements
+    from ExploData.explo_data.db import Commander, System, Planet, Star, NonBody, FloraScans, CodexScans
+
+    return [
+        Lookup('planet by name',
+               lambda p: select(Planet).where(Planet.name == p['name']).where(Planet.system_id == p['system_id']),
+               statements.PLANET_BY_NAME, 'SELECT system_id, name FROM planets'),
+        Lookup('planet by body id',
+               lambda p: select(Planet).where(Planet.system_id == p['system_id']).where(Planet.body_id == p['body_id']),
+               statements.PLANET_BY_BODY_ID, 'SELECT system_id, body_id FROM planets'),
+        Lookup('star by name',
+               lambda p: select(Star).where(Star.name == p['name']).where(Star.system_id == p['system_id']),
+               statements.STAR_BY_NAME, 'SELECT system_id, name FROM stars'),
+        Lookup('non-body by name',
+               lambda p: select(NonBody).where(NonBody.name == p['name']).where(NonBody.system_id == p['system_id']),
+               statements.NON_BODY_BY_NAME, 'SELECT system_id, name FROM non_bodies'),
+        Lookup('commander by name', lambda p: select(Commander).where(Commander.name == p['name']),
+               statements.COMMANDER_BY_NAME, 'SELECT name FROM commanders'),
+        Lookup('system by name', lambda p: select(System).where(System.name == p['name']),
+               statements.SYSTEM_BY_NAME, 'SELECT name FROM systems'),
+        Lookup('flora scan',
+               lambda p: select(FloraScans).where(FloraScans.flora_id == p['flora_id'])
+               .where(FloraScans.commander_id == p['commander_id']),
+               statements.FLORA_SCAN, 'SELECT flora_id, commander_id FROM flora_scans'),
+        Lookup('flora scan count',
+               lambda p: select(FloraScans).where(FloraScans.flora_id == p['flora_id'])
+               .where(FloraScans.commander_id == p['commander_id']),
+               statements.FLORA_SCAN_COUNT, 'SELECT flora_id, commander_id FROM flora_scans'),
+        Lookup('codex scan',
+               lambda p: select(CodexScans).where(CodexScans.commander_id == p['commander_id'])
+               .where(CodexScans.biological == p['biological']).where(CodexScans.region == p['region']),
+               statements.CODEX_SCAN_ID, 'SELECT commander_id, biological, region FROM codex_scans'),
+    ]
+
+
+def time_calls(func: Callable[[dict[str, Any]], Any], keys: list[dict[str, Any]], iterations: int) -> float:
+    """ Average seconds per call, cycling through the parameter sets """
+
+    start = perf_counter()
+    for index in range(iterations):
+        func(keys[index % len(keys)])
+    return (perf_counter() - start) / iterations
+
+
+def run(app_dir: Path, journal_dir: Path, iterations: int) -> dict[str, Any]:
+    """
+    Import the corpus, then time every lookup
+
+    :param app_dir: The EDMC data directory used for the database
+    :param journal_dir: The corpus directory
+    :param iterations: Calls per measurement
+    :return: Per-lookup microseconds for building a select, a built-per-call lookup, and a prebuilt lookup
+    """
+
+    app_dir.mkdir(parents=True, exist_ok=True)
+    edmc_env.setup(app_dir, {'journaldir': str(journal_dir)})
+    from ExploData.explo_data import db, journal_parse
+
+    db.init()
+    journal_parse.journal_worker()
+    session = db.get_session()
+    results = {}
+    for lookup in get_lookups():
+        keys = [dict(row) for row in db.run_query(db.get_engine(), lookup.keys).mappings()]
+        if not keys:
+            continue
+        time_calls(lambda p: session.scalar(lookup.prebuilt, p), keys, min(iterations, 100))  # Warm the caches
+        build = time_calls(lambda p: lookup.build(p)._generate_cache_key(), keys, iterations)
+        fresh = time_calls(lambda p: session.scalar(lookup.build(p)), keys, iterations)
+        prebuilt = time_calls(lambda p: session.scalar(lookup.prebuilt, p), keys, iterations)
+        results[lookup.name] = {'keys': len(keys), 'build_us': build * 1e6, 'fresh_us': fresh * 1e6,
+                                'prebuilt_us': prebuilt * 1e6}
+    session.close()
+    db.shutdown()
+    return results
+
+
+def print_report(results: dict[str, Any]) -> None:
+    print(f'{"lookup":<20} {"build":>9} {"per call":>9} {"prebuilt":>9} {"saved":>7}')
+    for name, result in results.items():
+        saved = 1 - result['prebuilt_us'] / result['fresh_us']
+        print(f'{name:<20} {result["build_us"]:7.1f}us {result["fresh_us"]:7.1f}us {result["prebuilt_us"]:7.1f}us '
+              f'{saved:7.0%}')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark the per-event lookup statements')
+    parser.add_argument('--systems', type=int, default=100, help='number of systems in the galaxy')
+    parser.add_argument('--commanders', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--iterations', type=int, default=5000, help='calls per measurement')
+    parser.add_argument('--json', type=Path, help='also write the results to a JSON file')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='explodata-statements-') as temp_dir:
+        journal_dir = Path(temp_dir) / 'journals'
+        generate_corpus(journal_dir, args.systems, args.commanders, 2, args.seed)
+        results = run(Path(temp_dir) / 'app', journal_dir, args.iterations)
+    print_report(results)
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()